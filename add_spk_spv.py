@@ -1,9 +1,12 @@
 import streamlit as st
-import requests
-import json
+import uuid
 import pandas as pd
-from datetime import datetime, time
-import time as tm
+from datetime import datetime
+import api_client
+import option_index
+import bulk_import
+import profiling
+import write_queue
 
 def run():
     st.markdown(
@@ -16,50 +19,27 @@ def run():
     )
 
     # apps script
-    APPS_SCRIPT_URL = "https://script.google.com/macros/s/AKfycbz53Wl4Rkl6Z0QmUQh_Fo8r-TvRA4Gp8GcqrvLGSgK7ETAEIicdzW-IR5HEZuJdrTQ/exec"
+    backend = api_client.get_backend("add_spk")
 
-    def get_all_data():
-        try:
-            response = requests.get(APPS_SCRIPT_URL, params={"action": "get_data"}, timeout=30)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Terjadi kesalahan saat mengambil data: {e}")
-            return []
+    # opsi dropdown dari snapshot bersama (tidak disalin ke setiap sesi)
+    try:
+        raw_options = backend.get_options()
+    except api_client.BackendError as e:
+        raw_options = {}
+        st.error(f"Terjadi kesalahan saat mengambil data: {e}")
 
-        
-    # untuk mendapatkan opsi dari gsheets
-    def get_options():
-        try:
-            response = requests.get(APPS_SCRIPT_URL, params={"action": "get_options"}, timeout=10)
-            response.raise_for_status()
-            options = response.json()
-            
-            # menambahkan opsi kosong "" sebagai default di setiap kategori
-            for key in options:
-                options[key].insert(0, "")
-            return options
-        except requests.exceptions.RequestException as e:
-            st.error(f"Terjadi kesalahan saat mengambil data: {e}")
-            return {}
-
-    # mengambil data hanya saat pertama kali
-    if "all_data" not in st.session_state:
-        st.session_state.all_data = get_all_data()
-    if "options" not in st.session_state:
-        st.session_state.options = get_options()
-
-    # untuk mengirim data ke gsheets
-    def add_data(form_data):
-        try:
-            response = requests.post(APPS_SCRIPT_URL, json=form_data, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            return {"status": "error", "error": str(e)}
-
-    # mengambil data untuk select box
-    options = get_options()
+    # status SPK yang dikirim dari sesi ini (antrean lokal -> gsheets)
+    write_queue.status_panel("queue_add_spk")
+
+    # index opsi select box (dibangun ulang hanya jika sheet referensi berubah)
+    with profiling.span("frame:option_index"):
+        options = option_index.get_index(raw_options)
+
+    # import banyak SPK sekaligus dari CSV/XLSX (satu request add_data_batch)
+    mode = st.radio("Mode Input", ["Satu SPK", "Import Massal (CSV/XLSX)"], horizontal=True)
+    if mode != "Satu SPK":
+        bulk_import.run(backend, options)
+        return
 
     # cek dan set default di session_state jika belum ada
     defaults = {
@@ -84,7 +64,8 @@ def run():
 
     st.subheader("Isi Data Berikut:")
 
-    bu_options = [item[0] if isinstance(item, list) and item else item for item in options.get("BU", [""])]
+    # opsi kosong "" sebagai default
+    bu_options = [""] + options.bu
     bu = st.selectbox("BU", bu_options, key="form_bu")
 
     # reset produk jika BU berubah
@@ -94,22 +75,22 @@ def run():
         st.session_state.form_pic = ""
         st.session_state.form_line = ""
 
-    produk_options = [item[1] for item in options.get("Produk", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu] if bu else [""]
+    produk_options = options.for_bu(bu, "Produk") if bu else [""]
     produk = st.selectbox("Produk", produk_options, key="form_produk")
     
-    line_options = [item[1] for item in options.get("Line", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu] if bu else [""]
+    line_options = options.for_bu(bu, "Line") if bu else [""]
     line = st.selectbox("Line", line_options , key="form_line")
     
     nomor_mesin = st.text_input("Nomor Mesin", value=st.session_state.get("form_nomor"))
 
-    mesin_options = [item[1] for item in options.get("Mesin", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu] if bu else [""]
+    mesin_options = options.for_bu(bu, "Mesin") if bu else [""]
     mesin = st.selectbox("Mesin", mesin_options, key="form_mesin")
 
     if mesin != st.session_state.form_mesin:
         st.session_state.form_mesin = mesin
         st.session_state.form_masalah = "" 
 
-    masalah_options = [item[1] for item in options.get("Masalah", []) if isinstance(item, list) and len(item) > 1 and item[0] == mesin] if bu else [""]
+    masalah_options = options.masalah(mesin) if bu else [""]
     masalah = st.selectbox("Masalah", masalah_options, key="form_masalah")
 
     tindakan = st.text_area("Tindakan Perbaikan", value=st.session_state.get("form_tindakan"))
@@ -117,8 +98,7 @@ def run():
     tanggal = st.date_input("Tanggal Pengerjaan", value=st.session_state.get("form_date"))
 
     # daftar PIC berdasarkan BU yang dipilih
-    pic_options = [item[1] for item in options.get("PIC", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu]
-    pic_options = list(pic_options) if pic_options else []  # Pastikan tetap list, bahkan jika kosong
+    pic_options = options.for_bu(bu, "PIC")
 
     default_pic = st.session_state.get("form_pic", [])
     default_pic = [p for p in default_pic if p in pic_options]  # Hanya simpan yang valid
@@ -140,11 +120,14 @@ def run():
             "Tanggal": tanggal.strftime("%Y-%m-%d"),
             "PIC": ", ".join(pic) if pic else ""
         }
-        df_preview = pd.DataFrame([data_to_send])
-        st.dataframe(df_preview, use_container_width=True)
+        with profiling.span("render:preview"):
+            df_preview = pd.DataFrame([data_to_send])
+            st.dataframe(df_preview, use_container_width=True)
 
     if st.button("➕ Tambah Data", disabled=not all_filled):
         st.session_state.show_confirmation = True  
+        # kunci idempotensi per penambahan: klik ganda/kirim ulang tidak membuat SPK kedua
+        st.session_state.add_request_id = uuid.uuid4().hex
 
     if st.session_state.get("show_confirmation", False):
         st.warning("⚠️ Apakah Anda yakin ingin menambahkan data ini?")
@@ -156,14 +139,19 @@ def run():
             cancel = st.button("❌ Batal")
 
         if confirm:
-            response = add_data({"action": "add_data", **data_to_send})
-            if response.get("status") == "success":
-                st.toast("✅ Data berhasil ditambahkan!")
-                tm.sleep(2)
+            # disimpan ke antrean lokal dulu; worker di background yang mengirim ke gsheets (dengan retry)
+            try:
+                entry_id = write_queue.get_queue().enqueue(
+                    "add_spk", "add_data", {**data_to_send, "request_id": st.session_state.get("add_request_id")}
+                )
+            except api_client.BackendError as e:
+                st.error(f"❌ Gagal menyimpan data: {e}")
+            else:
+                write_queue.remember("queue_add_spk", entry_id)
+                st.toast("✅ Data masuk antrean pengiriman!")
                 st.session_state.show_confirmation = False  
+                st.session_state.pop("add_request_id", None)
                 st.rerun()
-            else:
-                st.error(f"❌ Gagal menambahkan data: {response.get('error', 'Tidak diketahui')}")
                 
         elif cancel:
             st.session_state.show_confirmation = False  
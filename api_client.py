@@ -0,0 +1,790 @@
+import base64
+import contextvars
+import functools
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import profiling
+import read_cache
+import replica
+import snapshot
+
+# URL dari Apps Script Web App (satu deployment per halaman)
+APPS_SCRIPT_URLS = {
+    "login": "https://script.google.com/macros/s/AKfycbxvwyWXOiVC812g2ZO-Uzr6HtYujXnx7nu75YW26KVH1kCHWUUvh_uXSA65Hc4W-zknpQ/exec",
+    "add_spk": "https://script.google.com/macros/s/AKfycbz53Wl4Rkl6Z0QmUQh_Fo8r-TvRA4Gp8GcqrvLGSgK7ETAEIicdzW-IR5HEZuJdrTQ/exec",
+    "update_spk": "https://script.google.com/macros/s/AKfycbyP8kd-8d5qDtyVMg6kaugaJDuBA3yFF27K-q_pGVksINlLRvCpfnWXeUXIzVdQL8fg/exec",
+}
+
+# timeout (connect, read) dalam detik untuk setiap action
+TIMEOUTS = {
+    "get_data": (5, 30),
+    "get_all_data": (5, 30),
+    "get_options": (5, 10),
+    # add_data/add_data_batch menunggu script lock di server (maks. 20 detik) bila ada penulis lain
+    "add_data": (5, 30),
+    "add_data_batch": (5, 60),
+    "update_data": (5, 10),
+    "approve_batch": (5, 60),
+}
+DEFAULT_TIMEOUT = (5, 30)
+
+# kolom sheet sesuai urutan di Google Sheets
+SPK_COLUMNS = [
+    "ID", "BU", "Line", "Produk", "Nomor Mesin", "Mesin",
+    "Masalah", "Tindakan Perbaikan", "Tanggal Pengerjaan", "PIC", "Last Update"
+]
+ALL_COLUMNS = [
+    "ID", "BU", "Line", "Produk", "Nomor Mesin", "Mesin", "Tanggal Pengerjaan",
+    "Mulai", "Selesai", "Masalah", "Tindakan Perbaikan", "Deskripsi",
+    "Quantity", "PIC", "Kondisi", "Alasan", "SPV", "Last Update SPV",
+    "Approve", "Reason", "SM", "Last Update SM"
+]
+OPTION_SHEETS = ["BU", "Line", "Produk", "Mesin", "Masalah", "PIC"]
+
+# kolom sheet ALL yang ditulis approval per role: keputusan, alasan, nama approver, waktu
+APPROVAL_COLUMNS = {
+    "SPV": ["Approve", "Reason", "SPV", "Last Update SPV"],
+    "SM": ["Approve", "Reason", "SM", "Last Update SM"],
+}
+APPROVAL_DECISIONS = ("Approved", "Rejected")
+
+# pemetaan header ALL yang dipakai getAllData di apps_script_add-update_spk
+SPK_SCRIPT_HEADER_MAPPING = {
+    "Tanggal Pengerjaan": "Tanggal",
+    "Tindakan Perbaikan": "Tindakan",
+    "Nomor Mesin": "Nomor",
+}
+
+# field update_data -> kolom sheet SPK; update_data hanya berisi ID dan field yang berubah
+UPDATE_FIELDS = {
+    "BU": "BU",
+    "Line": "Line",
+    "Produk": "Produk",
+    "Nomor": "Nomor Mesin",
+    "Mesin": "Mesin",
+    "Masalah": "Masalah",
+    "Tindakan": "Tindakan Perbaikan",
+    "Tanggal": "Tanggal Pengerjaan",
+    "PIC": "PIC",
+}
+
+# dataset yang dibaca oleh setiap action dan yang berubah setelah penulisan berhasil
+ACTION_DATASETS = {
+    "get_data": "SPK",
+    "get_all_data": "ALL",
+    "get_options": "OPTIONS",
+    "get_data_page": "SPK",
+    "get_all_data_page": "ALL",
+    "get_all_columns": "ALL",
+    "get_data_columns": "SPK",
+}
+WRITE_INVALIDATES = {
+    "add_data": ("SPK",),
+    "add_data_batch": ("SPK",),
+    "update_data": ("SPK",),
+    "approve_batch": ("ALL",),
+}
+
+JAKARTA_TZ = timezone(timedelta(hours=7))
+
+
+class BackendError(Exception):
+    pass
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    # satu Session untuk semua halaman agar koneksi TLS ke script.google.com dipakai ulang
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset(["GET"]),  # POST tidak diulang agar data tidak dobel
+                raise_on_status=False,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+    return _session
+
+
+class Backend:
+    # interface sumber data; setiap method mengembalikan JSON yang sama dengan Apps Script.
+    # get_data/get_all_data dengan since (yyyy-MM-dd HH:mm:ss, GMT+7) memakai mode delta:
+    # {"headers", "rows", "server_time"} berisi baris dengan Last Update > since atau ID > since_id
+
+    def get_data(self, since=None, since_id=None):
+        raise NotImplementedError
+
+    def get_all_data(self, since=None, since_id=None):
+        raise NotImplementedError
+
+    # mode query: filter PIC/tanggal (yyyy-MM-dd) dan pagination di server. Hasil:
+    # {"headers", "rows", "total", "page", "page_size", "pic_options", "min_date", "max_date"}
+    def get_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        raise NotImplementedError
+
+    def get_all_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        raise NotImplementedError
+
+    # format kolom (pengambilan penuh): {"format": "columnar", "headers", "columns", "row_count"} dengan
+    # satu array per kolom; columns memilih kolom yang dikirim (None = semua)
+    def get_data_columns(self, columns=None):
+        raise NotImplementedError
+
+    def get_all_columns(self, columns=None):
+        raise NotImplementedError
+
+    def get_options(self):
+        raise NotImplementedError
+
+    def add_data(self, form_data):
+        raise NotImplementedError
+
+    # rows: list form_data seperti add_data; hasil {"status", "first_id", "last_id"}.
+    # request_id (juga "request_id" di form_data add_data): kunci idempotensi, kiriman ulang dengan
+    # kunci yang sama mengembalikan ID yang sudah dialokasikan ("duplicate": True) tanpa menulis lagi
+    def add_data_batch(self, rows, request_id=None):
+        raise NotImplementedError
+
+    def update_data(self, form_data):
+        raise NotImplementedError
+
+    # keputusan yang sama untuk banyak ID sheet ALL dalam satu panggilan; hasil
+    # {"status", "updated", "results": [{"ID", "status", "error"?}, ...]} per ID
+    def approve_batch(self, role, approver, ids, approve, reason=""):
+        raise NotImplementedError
+
+
+def decode_columnar(payload):
+    # respons format kolom yang dikompres Apps Script: {"encoding": "gzip+base64", "data": ...}
+    if isinstance(payload, dict) and payload.get("encoding") == "gzip+base64":
+        try:
+            return json.loads(gzip.decompress(base64.b64decode(payload["data"])))
+        except (KeyError, TypeError, ValueError, OSError) as e:
+            raise BackendError(f"Respons format kolom tidak valid: {e}") from e
+    return payload
+
+
+class AppsScriptBackend(Backend):
+    def __init__(self, url, session=None):
+        self.url = url
+        self.session = session or get_session()
+
+    @staticmethod
+    def _json(response, span):
+        span["status"] = str(response.status_code)
+        span["bytes"] = len(response.content)
+        response.raise_for_status()
+        return response.json()
+
+    def _get(self, action, **params):
+        with profiling.span(f"http:{action}") as span:
+            try:
+                response = self.session.get(
+                    self.url, params={"action": action, **params}, timeout=TIMEOUTS.get(action, DEFAULT_TIMEOUT)
+                )
+                return self._json(response, span)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                raise BackendError(str(e)) from e
+
+    def _post(self, payload):
+        action = payload.get("action")
+        with profiling.span(f"http:{action}") as span:
+            try:
+                response = self.session.post(self.url, json=payload, timeout=TIMEOUTS.get(action, DEFAULT_TIMEOUT))
+                return self._json(response, span)
+            except (requests.exceptions.RequestException, ValueError) as e:
+                raise BackendError(str(e)) from e
+
+    @staticmethod
+    def _delta_params(since, since_id):
+        return {} if since is None else {"since": since, "since_id": since_id or 0}
+
+    def get_data(self, since=None, since_id=None):
+        return self._get("get_data", **self._delta_params(since, since_id))
+
+    def get_all_data(self, since=None, since_id=None):
+        return self._get("get_all_data", **self._delta_params(since, since_id))
+
+    @staticmethod
+    def _page_params(pics, start, end, page, page_size):
+        params = {"pic": list(pics), "page": page, "page_size": page_size}
+        if start:
+            params["start"] = start
+        if end:
+            params["end"] = end
+        return params
+
+    def get_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        return self._get("get_data", **self._page_params(pics, start, end, page, page_size))
+
+    def get_all_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        return self._get("get_all_data", **self._page_params(pics, start, end, page, page_size))
+
+    @staticmethod
+    def _columnar_params(columns):
+        params = {"format": "columnar", "gzip": 1}
+        if columns:
+            params["columns"] = ",".join(columns)
+        return params
+
+    def get_data_columns(self, columns=None):
+        return decode_columnar(self._get("get_data", **self._columnar_params(columns)))
+
+    def get_all_columns(self, columns=None):
+        return decode_columnar(self._get("get_all_data", **self._columnar_params(columns)))
+
+    def get_options(self):
+        return self._get("get_options")
+
+    def add_data(self, form_data):
+        return self._post({**form_data, "action": "add_data"})
+
+    def add_data_batch(self, rows, request_id=None):
+        return self._post({"action": "add_data_batch", "rows": rows, "request_id": request_id})
+
+    def update_data(self, form_data):
+        return self._post({**form_data, "action": "update_data"})
+
+    def approve_batch(self, role, approver, ids, approve, reason=""):
+        return self._post({
+            "action": "approve_batch", "role": role, "approver": approver, "ids": [int(i) for i in ids],
+            "approve": approve, "reason": reason,
+        })
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _format_tanggal(value):
+    # terima format dari halaman tambah (YYYY-MM-DD) maupun update (dd-Mon-yy)
+    for fmt in ("%Y-%m-%d", "%d-%b-%y"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%d-%b-%y")
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _date_key(value):
+    # tanggal dd-Mon-yy / YYYY-MM-DD menjadi YYYY-MM-DD agar bisa dibandingkan sebagai teks
+    for fmt in ("%d-%b-%y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(value, fmt).strftime("%Y-%m-%d")
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _timestamp():
+    return datetime.now(JAKARTA_TZ).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _split_pic(pic):
+    return [p.strip() for p in pic.split(",")] if pic else []
+
+
+class SQLiteBackend(Backend):
+    # pengganti Apps Script berbasis SQLite untuk load test tanpa kuota Google.
+    # script="login" meniru apps_script_login, script="spk" meniru apps_script_add-update_spk
+    def __init__(self, path, script="spk"):
+        self.path = path
+        self.script = script
+        with self._connect() as conn:
+            self._init_schema(conn)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.create_function("date_key", 1, _date_key, deterministic=True)
+        return conn
+
+    def _init_schema(self, conn):
+        spk_cols = ", ".join(_quote(c) + " TEXT" for c in SPK_COLUMNS[1:])
+        all_cols = ", ".join(_quote(c) + " TEXT" for c in ALL_COLUMNS[1:])
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "SPK" ("ID" INTEGER PRIMARY KEY, {spk_cols})')
+        conn.execute(f'CREATE TABLE IF NOT EXISTS "ALL" ("ID" INTEGER PRIMARY KEY, {all_cols})')
+        conn.execute('CREATE TABLE IF NOT EXISTS "PIC_ID" ("ID" INTEGER, "PIC" TEXT)')
+        conn.execute('CREATE INDEX IF NOT EXISTS "PIC_ID_ID" ON "PIC_ID" ("ID")')
+        conn.execute('CREATE TABLE IF NOT EXISTS "OPTIONS" ("sheet" TEXT, "key" TEXT, "value" TEXT)')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS "REQUEST_ID" '
+            '("request_id" TEXT PRIMARY KEY, "first_id" INTEGER, "last_id" INTEGER, "created" TEXT)'
+        )
+
+    @staticmethod
+    def _as_text(value):
+        return "" if value is None else str(value)
+
+    def get_data(self, since=None, since_id=None):
+        server_time = _timestamp()
+        where, params = [], []
+        if self.script == "spk":
+            # hanya SPK yang ID-nya belum ada di sheet ALL
+            where.append('"ID" NOT IN (SELECT "ID" FROM "ALL")')
+        if since is not None:
+            where.append('("Last Update" > ? OR "ID" > ?)')
+            params += [since, since_id or 0]
+        sql = 'SELECT * FROM "SPK"' + (" WHERE " + " AND ".join(where) if where else "") + ' ORDER BY "ID"'
+
+        with self._connect() as conn:
+            rows = conn.execute(sql, params).fetchall()
+            if self.script == "login":
+                rows = [{col: self._as_text(row[col]) for col in SPK_COLUMNS} for row in rows]
+            else:
+                rows = [[self._as_text(row[col]) for col in SPK_COLUMNS] for row in rows]
+            if since is None:
+                return rows
+
+            payload = {"headers": SPK_COLUMNS, "rows": rows, "server_time": server_time}
+            if self.script == "spk":
+                payload["ids"] = [
+                    row[0] for row in conn.execute('SELECT "ID" FROM "SPK" WHERE "ID" NOT IN (SELECT "ID" FROM "ALL")')
+                ]
+            return payload
+
+    def get_all_data(self, since=None, since_id=None):
+        server_time = _timestamp()
+        mapping = SPK_SCRIPT_HEADER_MAPPING if self.script == "spk" else {}
+        sql, params = 'SELECT * FROM "ALL"', []
+        if since is not None:
+            sql += ' WHERE "Last Update SPV" > ? OR "Last Update SM" > ? OR "ID" > ?'
+            params = [since, since, since_id or 0]
+
+        with self._connect() as conn:
+            rows = conn.execute(sql + ' ORDER BY "ID"', params).fetchall()
+        rows = [{mapping.get(col, col): self._as_text(row[col]) for col in ALL_COLUMNS} for row in rows]
+        if since is None:
+            return rows
+        return {"headers": [mapping.get(col, col) for col in ALL_COLUMNS], "rows": rows, "server_time": server_time}
+
+    def _query_page(self, table, columns, mapping, pics, start, end, page, page_size):
+        where, params = [], []
+        if pics:
+            where.append(f'"PIC" IN ({", ".join("?" * len(pics))})')
+            params += list(pics)
+        if start:
+            where.append('date_key("Tanggal Pengerjaan") >= ?')
+            params.append(start)
+        if end:
+            where.append('date_key("Tanggal Pengerjaan") <= ?')
+            params.append(end)
+        clause = " WHERE " + " AND ".join(where) if where else ""
+
+        with self._connect() as conn:
+            total = conn.execute(f'SELECT COUNT(*) FROM "{table}"{clause}', params).fetchone()[0]
+            rows = conn.execute(
+                f'SELECT * FROM "{table}"{clause} ORDER BY "ID" LIMIT ? OFFSET ?',
+                params + [page_size, (page - 1) * page_size],
+            ).fetchall()
+            pic_options = [
+                row[0] for row in conn.execute(
+                    f'SELECT "PIC" FROM "{table}" WHERE "PIC" <> ? GROUP BY "PIC" ORDER BY MIN("ID")', ("",)
+                )
+            ]
+            min_date, max_date = conn.execute(
+                f'SELECT MIN(date_key("Tanggal Pengerjaan")), MAX(date_key("Tanggal Pengerjaan")) FROM "{table}"'
+            ).fetchone()
+
+        return {
+            "headers": [mapping.get(col, col) for col in columns],
+            "rows": [{mapping.get(col, col): self._as_text(row[col]) for col in columns} for row in rows],
+            "total": total,
+            "page": page,
+            "page_size": page_size,
+            "pic_options": pic_options,
+            "min_date": min_date or "",
+            "max_date": max_date or "",
+        }
+
+    def get_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        return self._query_page("SPK", SPK_COLUMNS, {}, pics, start, end, page, page_size)
+
+    def get_all_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        mapping = SPK_SCRIPT_HEADER_MAPPING if self.script == "spk" else {}
+        return self._query_page("ALL", ALL_COLUMNS, mapping, pics, start, end, page, page_size)
+
+    def _select_columns(self, table, table_columns, mapping, columns, where=""):
+        headers = [mapping.get(col, col) for col in table_columns]
+        names = [name for name in columns if name in headers] if columns else headers
+        selected = ", ".join(_quote(table_columns[headers.index(name)]) for name in names)
+        with self._connect() as conn:
+            rows = conn.execute(f'SELECT {selected} FROM "{table}"{where} ORDER BY "ID"').fetchall() if names else []
+        values = list(zip(*rows)) if rows else [()] * len(names)
+        return {
+            "format": "columnar",
+            "headers": names,
+            "columns": [[self._as_text(value) for value in column] for column in values],
+            "row_count": len(rows),
+        }
+
+    def get_data_columns(self, columns=None):
+        where = ' WHERE "ID" NOT IN (SELECT "ID" FROM "ALL")' if self.script == "spk" else ""
+        return self._select_columns("SPK", SPK_COLUMNS, {}, columns, where)
+
+    def get_all_columns(self, columns=None):
+        mapping = SPK_SCRIPT_HEADER_MAPPING if self.script == "spk" else {}
+        return self._select_columns("ALL", ALL_COLUMNS, mapping, columns)
+
+    def get_options(self):
+        options = {}
+        with self._connect() as conn:
+            rows = conn.execute('SELECT "sheet", "key", "value" FROM "OPTIONS" ORDER BY rowid').fetchall()
+        for row in rows:
+            if row["sheet"] in OPTION_SHEETS:
+                item = [row["key"]] if row["value"] is None else [row["key"], row["value"]]
+                options.setdefault(row["sheet"], []).append(item)
+        return options
+
+    def _insert_spk(self, rows, formatted_dates, request_id=None):
+        # satu transaksi untuk semua baris; hasil (ID pertama, duplikat?). request_id yang sudah pernah
+        # tercatat tidak menulis apa pun dan mengembalikan ID dari kiriman pertama
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if request_id:
+                    existing = conn.execute(
+                        'SELECT "first_id" FROM "REQUEST_ID" WHERE "request_id" = ?', (str(request_id),)
+                    ).fetchone()
+                    if existing:
+                        return existing[0], True
+                first_id = conn.execute('SELECT COALESCE(MAX("ID"), 0) + 1 FROM "SPK"').fetchone()[0]
+                timestamp = _timestamp()
+                conn.executemany(
+                    f'INSERT INTO "SPK" VALUES ({", ".join("?" * len(SPK_COLUMNS))})',
+                    [
+                        [
+                            first_id + i, row.get("BU"), row.get("Line"), row.get("Produk"),
+                            row.get("Nomor"), row.get("Mesin"), row.get("Masalah"),
+                            row.get("Tindakan"), formatted_dates[i], row.get("PIC"), timestamp,
+                        ]
+                        for i, row in enumerate(rows)
+                    ],
+                )
+                conn.executemany(
+                    'INSERT INTO "PIC_ID" VALUES (?, ?)',
+                    [(first_id + i, pic) for i, row in enumerate(rows) for pic in _split_pic(row.get("PIC"))],
+                )
+                if request_id:
+                    conn.execute(
+                        'INSERT INTO "REQUEST_ID" VALUES (?, ?, ?, ?)',
+                        (str(request_id), first_id, first_id + len(rows) - 1, timestamp),
+                    )
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+        finally:
+            conn.close()
+        return first_id, False
+
+    def add_data(self, form_data):
+        formatted_tanggal = _format_tanggal(form_data.get("Tanggal"))
+        if not formatted_tanggal:
+            return {"error": "Invalid Data"}
+
+        new_id, duplicate = self._insert_spk([form_data], [formatted_tanggal], form_data.get("request_id"))
+        result = {"status": "success", "new_id": new_id}
+        if duplicate:
+            result["duplicate"] = True
+        return result
+
+    def add_data_batch(self, rows, request_id=None):
+        if not rows:
+            return {"error": "Tidak ada data yang dikirim"}
+
+        formatted_dates = [_format_tanggal(row.get("Tanggal")) for row in rows]
+        for i, formatted_tanggal in enumerate(formatted_dates):
+            if not formatted_tanggal:
+                return {"error": f"Invalid Data pada baris {i + 1}"}
+
+        first_id, duplicate = self._insert_spk(rows, formatted_dates, request_id)
+        result = {"status": "success", "first_id": first_id, "last_id": first_id + len(rows) - 1}
+        if duplicate:
+            result["duplicate"] = True
+        return result
+
+    def update_data(self, form_data):
+        if not form_data.get("ID"):
+            return {"error": "ID tidak ditemukan"}
+        try:
+            target_id = int(form_data["ID"])
+        except (TypeError, ValueError):
+            return {"error": "Data tidak ditemukan di SPK"}
+
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                if conn.execute('SELECT 1 FROM "ALL" WHERE "ID" = ?', (target_id,)).fetchone():
+                    return {"error": "Data tidak dapat diperbarui karena ID sudah ada di sheet ALL"}
+                updates = {UPDATE_FIELDS[field]: value for field, value in form_data.items() if field in UPDATE_FIELDS}
+                if "Tanggal Pengerjaan" in updates:
+                    updates["Tanggal Pengerjaan"] = _format_tanggal(updates["Tanggal Pengerjaan"])
+                    if updates["Tanggal Pengerjaan"] is None:
+                        return {"error": "Invalid Data"}
+                updates["Last Update"] = _timestamp()
+                updated = conn.execute(
+                    f'UPDATE "SPK" SET {", ".join(f"{_quote(col)} = ?" for col in updates)} WHERE "ID" = ?',
+                    [*updates.values(), target_id],
+                ).rowcount
+                if not updated:
+                    return {"error": "Data tidak ditemukan di SPK"}
+                if "PIC" in updates:
+                    conn.execute('DELETE FROM "PIC_ID" WHERE "ID" = ?', (target_id,))
+                    conn.executemany(
+                        'INSERT INTO "PIC_ID" VALUES (?, ?)',
+                        [(target_id, pic) for pic in _split_pic(updates["PIC"])],
+                    )
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+        finally:
+            conn.close()
+        return {"status": "success"}
+
+    def approve_batch(self, role, approver, ids, approve, reason=""):
+        columns = APPROVAL_COLUMNS.get(role)
+        if columns is None:
+            return {"error": "Role tidak valid"}
+        if approve not in APPROVAL_DECISIONS:
+            return {"error": "Keputusan tidak valid"}
+        ids = list(dict.fromkeys(int(i) for i in ids))
+        if not ids:
+            return {"error": "Tidak ada data yang dipilih"}
+
+        values = [approve, reason or "", approver or role, _timestamp()]
+        results, accepted = [], []
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")
+                spv = {}
+                for start in range(0, len(ids), 500):
+                    chunk = ids[start:start + 500]
+                    spv.update(conn.execute(
+                        f'SELECT "ID", "SPV" FROM "ALL" WHERE "ID" IN ({", ".join("?" * len(chunk))})', chunk
+                    ).fetchall())
+                for target_id in ids:
+                    if target_id not in spv:
+                        results.append(
+                            {"ID": target_id, "status": "error", "error": "ID tidak ditemukan di sheet ALL"}
+                        )
+                    elif role == "SM" and not (spv[target_id] or "").strip():
+                        results.append({"ID": target_id, "status": "error", "error": "Belum diproses SPV"})
+                    else:
+                        results.append({"ID": target_id, "status": "success"})
+                        accepted.append(target_id)
+                conn.executemany(
+                    f'UPDATE "ALL" SET {", ".join(f"{_quote(col)} = ?" for col in columns)} WHERE "ID" = ?',
+                    [(*values, target_id) for target_id in accepted],
+                )
+        except sqlite3.Error as e:
+            raise BackendError(str(e)) from e
+        finally:
+            conn.close()
+        return {"status": "success", "updated": len(accepted), "results": results}
+
+
+def _checked(payload):
+    # respons {"error": ...} tidak boleh disimpan sebagai snapshot
+    if isinstance(payload, dict) and "error" in payload:
+        raise BackendError(payload["error"])
+    return payload
+
+
+class CachedBackend(Backend):
+    # membungkus backend lain dengan read_cache; penulisan yang berhasil menghapus cache terkait.
+    # SPK dan ALL disimpan sebagai replika lokal, jadi cache yang kedaluwarsa hanya menarik delta.
+    # Dengan snapshots (snapshot.SnapshotStore), opsi dan tabel penuh SPK/ALL dibaca dari file Arrow bersama;
+    # versi baru SPK/ALL dibangun dari replika yang sama
+    def __init__(self, backend, name, cache=None, snapshots=None):
+        self.backend = backend
+        self.name = name
+        self.cache = cache or read_cache.cache
+        self.snapshots = snapshots
+        self.replicas = {
+            "get_data": replica.SheetReplica(backend.get_data),
+            "get_all_data": replica.SheetReplica(backend.get_all_data),
+        }
+
+    def _load_options(self):
+        fetch = lambda: snapshot.options_to_table(_checked(self.backend.get_options()))
+        try:
+            return self.snapshots.load(f"{self.name}-OPTIONS", "OPTIONS", fetch, snapshot.table_to_options)
+        except snapshot.SNAPSHOT_ERRORS as e:
+            raise BackendError(f"Snapshot OPTIONS gagal dibaca: {e}") from e
+
+    def _read(self, action, *args):
+        if action in self.replicas:
+            loader = self.replicas[action].sync
+        elif action == "get_options" and self.snapshots is not None:
+            loader = self._load_options
+        else:
+            loader = functools.partial(getattr(self.backend, action), *args)
+
+        with profiling.span(f"backend:{action}") as span:
+            span["status"] = "hit"
+
+            def load():
+                span["status"] = "miss"
+                return loader()
+
+            return self.cache.get_or_load((self.name, action) + args, ACTION_DATASETS[action], load)
+
+    def resync(self):
+        # sinkronisasi penuh SPK dan ALL pada pembacaan berikutnya
+        for sheet_replica in self.replicas.values():
+            sheet_replica.reset()
+        self.cache.invalidate("SPK", "ALL")
+
+    def _write(self, action, *args):
+        with profiling.span(f"backend:{action}") as span:
+            result = getattr(self.backend, action)(*args)
+            if isinstance(result, dict) and result.get("status") == "success":
+                self.cache.invalidate(*WRITE_INVALIDATES[action])
+                if self.snapshots is not None:
+                    self.snapshots.invalidate(*WRITE_INVALIDATES[action])
+            else:
+                span["status"] = "error"
+            return result
+
+    def get_data(self, since=None, since_id=None):
+        if since is not None:
+            return self.backend.get_data(since=since, since_id=since_id)
+        return self._read("get_data")
+
+    def get_all_data(self, since=None, since_id=None):
+        if since is not None:
+            return self.backend.get_all_data(since=since, since_id=since_id)
+        return self._read("get_all_data")
+
+    def get_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        return self._read("get_data_page", tuple(pics), start, end, page, page_size)
+
+    def get_all_data_page(self, pics=(), start=None, end=None, page=1, page_size=10):
+        return self._read("get_all_data_page", tuple(pics), start, end, page, page_size)
+
+    def get_data_columns(self, columns=None):
+        return self._read("get_data_columns", tuple(columns) if columns else None)
+
+    def get_all_columns(self, columns=None):
+        return self._read("get_all_columns", tuple(columns) if columns else None)
+
+    def _table(self, dataset, action, fetch_columns, cached_columns):
+        # hasil: (kunci versi, pyarrow.Table) tabel penuh; kunci berubah setiap snapshot diperbarui
+        if self.snapshots is None:
+            # tanpa snapshot: tetap lewat read_cache agar rerun dalam TTL tidak mengambil ulang
+            try:
+                return None, snapshot.columnar_to_table(_checked(cached_columns()))
+            except snapshot.SNAPSHOT_ERRORS as e:
+                raise BackendError(f"Data {dataset} tidak valid: {e}") from e
+
+        def fetch():
+            # snapshot baru dibangun dari replika delta; pengambilan penuh hanya untuk backend tanpa mode delta
+            payload = self.replicas[action].sync_columnar()
+            return snapshot.columnar_to_table(_checked(fetch_columns() if payload is None else payload))
+
+        name = f"{self.name}-{dataset}"
+        with profiling.span(f"snapshot:{dataset}"):
+            try:
+                version, table = self.snapshots.get(name, dataset, fetch)
+            except snapshot.SNAPSHOT_ERRORS as e:
+                raise BackendError(f"Snapshot {dataset} gagal dibaca: {e}") from e
+        return (name, version), table
+
+    def get_data_table(self):
+        return self._table("SPK", "get_data", self.backend.get_data_columns, self.get_data_columns)
+
+    def get_all_table(self):
+        return self._table("ALL", "get_all_data", self.backend.get_all_columns, self.get_all_columns)
+
+    def get_options(self):
+        return self._read("get_options")
+
+    def add_data(self, form_data):
+        return self._write("add_data", form_data)
+
+    def add_data_batch(self, rows, request_id=None):
+        return self._write("add_data_batch", rows, request_id)
+
+    def update_data(self, form_data):
+        return self._write("update_data", form_data)
+
+    def approve_batch(self, role, approver, ids, approve, reason=""):
+        return self._write("approve_batch", role, approver, ids, approve, reason)
+
+
+# pool thread untuk pembacaan paralel (lihat fetch_all)
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="api_client")
+
+
+def fetch_all(calls):
+    # jalankan beberapa pembacaan independen sekaligus sehingga latensi = max(), bukan jumlah.
+    # calls: {nama: fungsi tanpa argumen}; hasil: ({nama: data}, {nama: BackendError}).
+    # Error lain dari satu pembacaan (mis. data rusak) juga dibungkus BackendError agar pembacaan lain tetap tampil
+    with profiling.span("fetch_all"):
+        # context disalin agar span di thread pool tercatat pada rerun pemanggil
+        futures = {name: _executor.submit(contextvars.copy_context().run, fn) for name, fn in calls.items()}
+        results, errors = {}, {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except BackendError as e:
+                errors[name] = e
+            except Exception as e:
+                error = errors[name] = BackendError(f"{type(e).__name__}: {e}")
+                error.__cause__ = e
+        return results, errors
+
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+_snapshots = None
+
+
+def get_snapshots():
+    # snapshot bersama di SPK_SNAPSHOT_DIR (default spk_snapshots); SPK_SNAPSHOT_DIR= (kosong) mematikannya
+    global _snapshots
+    directory = os.environ.get("SPK_SNAPSHOT_DIR", "spk_snapshots")
+    if not directory:
+        return None
+    if _snapshots is None or _snapshots.directory != directory:
+        _snapshots = snapshot.SnapshotStore(directory)
+    return _snapshots
+
+
+def get_backend(page):
+    # SPK_BACKEND=sqlite memakai database lokal di SPK_SQLITE_PATH, selain itu Apps Script.
+    # SPK_APPS_SCRIPT_URL mengganti URL deployment dengan <url>/<page>/exec (mis. benchmarks/fake_apps_script.py)
+    with _backends_lock:
+        if page not in _backends:
+            if os.environ.get("SPK_BACKEND", "apps_script") == "sqlite":
+                script = "login" if page == "login" else "spk"
+                backend = SQLiteBackend(os.environ.get("SPK_SQLITE_PATH", "spk_local.db"), script=script)
+            else:
+                base_url = os.environ.get("SPK_APPS_SCRIPT_URL")
+                url = f"{base_url.rstrip('/')}/{page}/exec" if base_url else APPS_SCRIPT_URLS[page]
+                backend = AppsScriptBackend(url)
+            _backends[page] = CachedBackend(backend, page, snapshots=get_snapshots())
+        return _backends[page]
@@ -0,0 +1,128 @@
+import streamlit as st
+import pandas as pd
+import api_client
+import loader
+import profiling
+
+# kolom yang ditampilkan di tabel approval (sheet ALL)
+TABLE_COLUMNS = [
+    "ID", "BU", "Line", "Mesin", "Tanggal Pengerjaan", "Masalah", "Tindakan Perbaikan", "PIC", "Kondisi",
+    "Alasan", "SPV", "Approve", "Reason", "SM",
+]
+
+
+def _filled(values):
+    return values.astype(object).fillna("").astype(str).str.strip() != ""
+
+
+def pending(df, role):
+    # SPV: belum diproses SPV; SM: sudah diproses SPV tetapi belum diproses SM
+    spv = _filled(df["SPV"])
+    if role == "SPV":
+        return ~spv
+    return spv & ~_filled(df["SM"])
+
+
+def _result_panel():
+    # hasil kiriman terakhir sesi ini, per ID
+    result = st.session_state.get("approval_result")
+    if not result:
+        return
+    if "results" not in result:
+        st.error(f"❌ Gagal mengirim approval: {result.get('error', 'Tidak diketahui')}")
+        return
+
+    failed = [row for row in result["results"] if row["status"] != "success"]
+    st.success(f"✅ {result['updated']} Preventive Form berhasil diproses.")
+    if failed:
+        st.warning(f"⚠️ {len(failed)} Preventive Form gagal diproses:")
+        st.dataframe(pd.DataFrame(failed)[["ID", "error"]], hide_index=True, use_container_width=True)
+
+
+def run():
+    st.markdown(
+        """
+        <h1 style='text-align: center; color: white; background-color: #82E0AA; padding: 15px; border-radius: 10px;'>
+            ✅ Approval Preventive Form
+        </h1>
+        """,
+        unsafe_allow_html=True
+    )
+
+    role = st.session_state.get("role")
+    if role not in api_client.APPROVAL_COLUMNS:
+        st.error("Role ini tidak dapat melakukan approval.")
+        return
+    approver = st.session_state.get("username") or role
+
+    backend = api_client.get_backend("login")
+    try:
+        df = loader.all_frame(backend, TABLE_COLUMNS)
+    except api_client.BackendError as e:
+        st.error(f"Gagal mengambil data dari API: {e}")
+        return
+
+    _result_panel()
+
+    # === Filter ===
+    show_all = st.toggle("Tampilkan juga yang sudah diproses", key="approval_show_all")
+    col_bu, col_pic, col_date = st.columns(3)
+    with col_bu:
+        bu = st.multiselect("BU", sorted(df["BU"].dropna().unique()), key="approval_bu")
+    with col_pic:
+        pic = st.multiselect("PIC", sorted(df["PIC"].dropna().unique()), key="approval_pic")
+
+    mask = pd.Series(True, index=df.index) if show_all else pending(df, role)
+    if bu:
+        mask &= df["BU"].isin(bu)
+    if pic:
+        mask &= df["PIC"].isin(pic)
+
+    dates = df["Tanggal Pengerjaan"].dropna()
+    if len(dates):
+        min_date, max_date = dates.min().date(), dates.max().date()
+        with col_date:
+            date_range = st.date_input(
+                "Rentang Tanggal", [min_date, max_date], min_value=min_date, max_value=max_date, key="approval_dates"
+            )
+        if len(date_range) == 2:
+            mask &= df["Tanggal Pengerjaan"].between(pd.Timestamp(date_range[0]), pd.Timestamp(date_range[1]))
+
+    filtered = df[mask.to_numpy()].reset_index(drop=True)
+    if filtered.empty:
+        st.info("Tidak ada Preventive Form yang menunggu approval.")
+        return
+
+    # === Pilih baris ===
+    # key tabel diganti setelah setiap kiriman agar pilihan lama tidak menunjuk ke baris lain
+    round_number = st.session_state.get("approval_round", 0)
+    select_all = st.checkbox(f"Pilih semua ({len(filtered)} baris sesuai filter)", key=f"approval_all_{round_number}")
+    with profiling.span("render:approval", rows=len(filtered)):
+        view = filtered.assign(**{"Tanggal Pengerjaan": filtered["Tanggal Pengerjaan"].dt.date})
+        event = st.dataframe(
+            view, on_select="rerun", selection_mode="multi-row", hide_index=True, use_container_width=True,
+            key=f"approval_table_{round_number}",
+        )
+    selected = filtered if select_all else filtered.iloc[event.selection.rows]
+    ids = selected["ID"].dropna().astype(int).tolist()
+
+    # === Keputusan sekali untuk semua baris terpilih ===
+    col_decision, col_reason = st.columns([1, 2])
+    with col_decision:
+        decision = st.radio("Keputusan", api_client.APPROVAL_DECISIONS, horizontal=True, key="approval_decision")
+    with col_reason:
+        reason = st.text_input("Reason (wajib jika Rejected)", key="approval_reason").strip()
+
+    missing_reason = decision == "Rejected" and not reason
+    if st.button(f"📤 Kirim {decision} untuk {len(ids)} Preventive Form", disabled=not ids or missing_reason):
+        # satu panggilan backend untuk semua baris; hasil dilaporkan per ID
+        try:
+            result = backend.approve_batch(role, approver, ids, decision, reason)
+        except api_client.BackendError as e:
+            result = {"error": str(e)}
+        st.session_state.approval_result = result
+        st.session_state.approval_round = round_number + 1
+        st.rerun()
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,195 @@
+# Banyak penulis bersamaan menambah SPK lewat add_data ke benchmarks/fake_apps_script.py, dengan
+# respons yang hilang (POST diproses tetapi klien menerima 503) dan kiriman ganda acak. Setiap penulis
+# mengirim ulang dengan request_id yang sama sampai berhasil, seperti worker write_queue. Setelah selesai
+# isi database diperiksa: jumlah baris SPK = jumlah permintaan unik, ID unik dan berurutan, baris PIC_ID
+# sesuai, dan ID yang diterima klien konsisten. Mode "tanpa-kunci" mengirim tanpa request_id sebagai pembanding.
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_add_concurrency --writers 1 4 16 --adds 25 --lost-response-rate 0.1 --json bench_add.json
+import argparse
+import json
+import os
+import random
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import requests
+
+import api_client
+from benchmarks import synthetic
+from benchmarks.bench_pages import ROOT
+from benchmarks.fake_apps_script import seed_database
+
+MODES = ("idempoten", "tanpa-kunci")
+
+
+def start_server(db_path, args):
+    command = [
+        sys.executable, "-m", "benchmarks.fake_apps_script", "--db", db_path, "--latency", str(args.latency),
+        "--error-rate", str(args.error_rate), "--lost-response-rate", str(args.lost_response_rate),
+    ]
+    proc = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    url = proc.stdout.readline().strip()
+    if not url:
+        proc.kill()
+        raise RuntimeError("fake_apps_script gagal dijalankan")
+    return proc, url
+
+
+def make_form(rng):
+    pics = rng.sample(synthetic.PICS, rng.randint(1, 3))
+    return {
+        "BU": rng.choice(synthetic.BUS),
+        "Line": rng.choice(synthetic.LINES),
+        "Produk": rng.choice(synthetic.PRODUKS),
+        "Nomor": "NM-%04d" % rng.randrange(1, 2000),
+        "Mesin": rng.choice(synthetic.MESINS),
+        "Masalah": rng.choice(synthetic.MASALAHS),
+        "Tindakan": rng.choice(synthetic.TINDAKANS),
+        "Tanggal": "2024-%02d-%02d" % (rng.randint(1, 12), rng.randint(1, 28)),
+        "PIC": ", ".join(pics),
+    }
+
+
+def writer(url, index, args, idempotent, out):
+    # satu sesi/worker: requests.Session sendiri, kirim ulang sampai berhasil
+    backend = api_client.AppsScriptBackend(f"{url}/add_spk/exec", session=requests.Session())
+    rng = random.Random(index)
+    stats = {"requests": [], "retries": 0, "duplicates": 0, "failed": 0}
+
+    def send(form):
+        for _ in range(args.max_attempts):
+            try:
+                result = backend.add_data(form)
+            except api_client.BackendError:
+                stats["retries"] += 1
+                time.sleep(args.retry_wait)
+                continue
+            if result.get("retry"):
+                stats["retries"] += 1
+                time.sleep(args.retry_wait)
+                continue
+            return result
+        return {"error": "percobaan habis"}
+
+    for _ in range(args.adds):
+        form = make_form(rng)
+        if idempotent:
+            form["request_id"] = uuid.uuid4().hex
+        sends = 2 if rng.random() < args.double_rate else 1  # klik ganda
+        ids = []
+        for _ in range(sends):
+            result = send(form)
+            if result.get("status") != "success":
+                stats["failed"] += 1
+                continue
+            stats["duplicates"] += int(bool(result.get("duplicate")))
+            ids.append(result["new_id"])
+        stats["requests"].append({"pics": len(form["PIC"].split(",")), "ids": ids})
+    out[index] = stats
+
+
+def check_database(db_path, base_id, requests_sent):
+    conn = sqlite3.connect(db_path)
+    try:
+        ids = [row[0] for row in conn.execute('SELECT "ID" FROM "SPK" WHERE "ID" > ? ORDER BY "ID"', (base_id,))]
+        pic_rows = conn.execute('SELECT COUNT(*) FROM "PIC_ID" WHERE "ID" > ?', (base_id,)).fetchone()[0]
+    finally:
+        conn.close()
+
+    returned = [request["ids"] for request in requests_sent if request["ids"]]
+    first_ids = [request_ids[0] for request_ids in returned]
+    return {
+        "rows_added": len(ids),
+        "ids_contiguous": ids == list(range(base_id + 1, base_id + 1 + len(ids))),
+        "pic_rows_added": pic_rows,
+        "pic_rows_expected": sum(request["pics"] for request in requests_sent if request["ids"]),
+        # kiriman ganda harus menerima ID yang sama, dan tidak ada dua permintaan dengan ID yang sama
+        "ids_consistent": all(len(set(request_ids)) == 1 for request_ids in returned)
+        and len(set(first_ids)) == len(first_ids),
+    }
+
+
+def run_round(writers, idempotent, args):
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "add.db")
+        seed_database(db_path, args.rows)
+        base_id = args.rows
+        proc, url = start_server(db_path, args)
+        try:
+            out = [None] * writers
+            threads = [
+                threading.Thread(target=writer, args=(url, i, args, idempotent, out)) for i in range(writers)
+            ]
+            start = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            seconds = time.perf_counter() - start
+        finally:
+            proc.kill()
+            proc.wait()
+
+        requests_sent = [request for stats in out for request in stats["requests"]]
+        unique = sum(1 for request in requests_sent if request["ids"])
+        result = {
+            "mode": MODES[0] if idempotent else MODES[1],
+            "writers": writers,
+            "requests": len(requests_sent),
+            "committed": unique,
+            "seconds": seconds,
+            "adds_per_second": unique / seconds if seconds else None,
+            "retries": sum(stats["retries"] for stats in out),
+            "duplicates_suppressed": sum(stats["duplicates"] for stats in out),
+            "failed": sum(stats["failed"] for stats in out),
+        }
+        result.update(check_database(db_path, base_id, requests_sent))
+        result["ok"] = (
+            result["failed"] == 0 and result["rows_added"] == unique and result["ids_contiguous"]
+            and result["pic_rows_added"] == result["pic_rows_expected"] and result["ids_consistent"]
+        )
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--writers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--adds", type=int, default=25, help="add_data per penulis")
+    parser.add_argument("--rows", type=int, default=1000, help="baris awal sheet SPK")
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--error-rate", type=float, default=0.05, help="503 sebelum diproses")
+    parser.add_argument("--lost-response-rate", type=float, default=0.1, help="503 setelah diproses")
+    parser.add_argument("--double-rate", type=float, default=0.1, help="peluang permintaan dikirim dua kali")
+    parser.add_argument("--retry-wait", type=float, default=0.05)
+    parser.add_argument("--max-attempts", type=int, default=20)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = [
+        run_round(writers, mode == MODES[0], args) for mode in args.modes for writers in args.writers
+    ]
+
+    print(
+        f"{'mode':<12} {'penulis':>7} {'unik':>6} {'baris':>6} {'add/s':>7} {'retry':>6} {'duplikat':>9}"
+        f" {'PIC_ID':>11} {'ID urut':>8} {'ok':>4}"
+    )
+    for r in results:
+        print(
+            f"{r['mode']:<12} {r['writers']:>7} {r['committed']:>6} {r['rows_added']:>6} {r['adds_per_second']:7.1f}"
+            f" {r['retries']:>6} {r['duplicates_suppressed']:>9}"
+            f" {r['pic_rows_added']:>5}/{r['pic_rows_expected']:<5} {str(r['ids_contiguous']):>8} {str(r['ok']):>4}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# Skala perhitungan "SPK yang masih bisa diedit" (SPK yang ID-nya belum ada di sheet ALL):
+# pencarian list (cara lama getData/updateData + isin string di update_spk_spv) dibandingkan
+# anti-join dengan Set dan backend SQLite. Jalankan dari root repo:
+#   python -m benchmarks.bench_editable --sizes 1000 10000 50000 --json bench_editable.json
+import argparse
+import json
+import os
+import sqlite3
+import tempfile
+import time
+
+import api_client
+import loader
+from benchmarks import synthetic
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def make_ids(size):
+    # 90% SPK sudah masuk ALL, sisanya ID ALL yang bukan dari SPK
+    spk_ids = list(range(1, size + 1))
+    done = int(size * 0.9)
+    all_ids = spk_ids[:done] + list(range(size + 1, size + 1 + size - done))
+    return spk_ids, all_ids
+
+
+def server_list_scan(spk_ids, all_ids):
+    return [i for i in spk_ids if i not in all_ids]
+
+
+def server_set(spk_ids, all_ids):
+    all_set = set(all_ids)
+    return [i for i in spk_ids if i not in all_set]
+
+
+def client_old(df, all_ids):
+    return df[~df["ID"].astype(str).isin([str(i) for i in all_ids])]
+
+
+def sqlite_get_data(size, spk_rows, all_ids):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        backend = api_client.SQLiteBackend(path)
+        conn = sqlite3.connect(path)
+        conn.executemany(f'INSERT INTO "SPK" VALUES ({", ".join("?" * len(api_client.SPK_COLUMNS))})', spk_rows)
+        conn.executemany('INSERT INTO "ALL" ("ID") VALUES (?)', [(i,) for i in all_ids])
+        conn.commit()
+        conn.close()
+        return timed(backend.get_data)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument(
+        "--quadratic-limit", type=int, default=20000,
+        help="ukuran terbesar yang diukur langsung untuk cara lama; di atasnya diestimasi O(SPK x ALL)"
+    )
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    measured = None
+    for size in args.sizes:
+        spk_ids, all_ids = make_ids(size)
+        spk_rows = synthetic.spk_rows(size)
+        df = loader.load_spk_rows([[str(i)] + row[1:] for i, row in zip(spk_ids, spk_rows)])
+
+        if size <= args.quadratic_limit or measured is None:
+            old_server, editable = timed(lambda: server_list_scan(spk_ids, all_ids))
+            measured = (size, old_server)
+            estimated = False
+        else:
+            old_server = measured[1] * (size / measured[0]) ** 2
+            estimated = True
+
+        new_server, editable = timed(lambda: server_set(spk_ids, all_ids))
+        old_client = timed(lambda: client_old(df, all_ids))[0]
+
+        results.append({
+            "spk_rows": size,
+            "all_rows": len(all_ids),
+            "editable_rows": len(editable),
+            "server_list_scan_seconds": old_server,
+            "server_list_scan_estimated": estimated,
+            "server_set_seconds": new_server,
+            "client_isin_str_seconds": old_client,
+            "sqlite_get_data_seconds": sqlite_get_data(size, spk_rows, all_ids),
+        })
+
+    print(f"{'SPK x ALL':>15} {'list scan (s)':>14} {'Set (s)':>9} {'isin str klien (s)':>19} {'SQLite (s)':>11}")
+    for r in results:
+        scan = f"{r['server_list_scan_seconds']:.3f}" + ("*" if r["server_list_scan_estimated"] else "")
+        print(
+            f"{r['spk_rows']:>7} x {r['all_rows']:<5} {scan:>14} {r['server_set_seconds']:9.4f}"
+            f" {r['client_isin_str_seconds']:19.4f} {r['sqlite_get_data_seconds']:11.4f}"
+        )
+    if any(r["server_list_scan_estimated"] for r in results):
+        print("* estimasi dari ukuran terbesar yang diukur, dengan asumsi O(SPK x ALL)")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
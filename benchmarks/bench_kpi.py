@@ -0,0 +1,66 @@
+# Waktu agregasi KPI (kpi.py) atas sheet ALL: hitung penuh, pembaruan inkremental setelah sebagian baris
+# berubah/bertambah, dan drill-down (pertama kali dan dari memo). Jalankan dari root repo:
+#   python -m benchmarks.bench_kpi --rows 100000 300000 --changed 100 --json bench_kpi.json
+import argparse
+import json
+import time
+
+import kpi
+import loader
+from benchmarks import synthetic
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000, 300000])
+    parser.add_argument("--changed", type=int, default=100, help="baris yang diubah dan ditambah per pembaruan")
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.rows:
+        rows = synthetic.all_rows(n)
+        df = loader.load_all(rows)
+
+        # versi berikutnya: sebagian baris di-approve dan beberapa baris baru
+        changed = [dict(row, Approve="Approved") for row in rows[:args.changed]]
+        new_rows = synthetic.all_rows(n + args.changed, seed=1)[n:]
+        df_next = loader.load_all(changed + rows[args.changed:] + new_rows)
+
+        cube = kpi.KpiCube()
+        full, _ = timed(cube.update, 1, df)
+        incremental, _ = timed(cube.update, 2, df_next)
+        query, _ = timed(cube.summary, ["Mesin"], {"BU": ["BU1"]})
+        drill, _ = timed(cube.summary, ["PIC"], {"BU": ["BU1"], "Mesin": ["Mesin 1"]})
+        memo, _ = timed(cube.summary, ["Mesin"], {"BU": ["BU1"]})
+        results.append({
+            "rows": n,
+            "cube_cells": len(cube.summary(list(kpi.DIMENSIONS))),
+            "full_seconds": full,
+            "incremental_seconds": incremental,
+            "incremental_rows": cube.last_changed,
+            "query_seconds": query,
+            "drill_seconds": drill,
+            "memo_seconds": memo,
+        })
+
+    print(f"{'baris':>7} {'sel kubus':>10} {'penuh (s)':>10} {'inkremental (s)':>16} {'query (ms)':>11} {'drill (ms)':>11} {'memo (ms)':>10}")
+    for r in results:
+        print(
+            f"{r['rows']:>7} {r['cube_cells']:>10} {r['full_seconds']:10.3f} {r['incremental_seconds']:16.3f}"
+            f" {r['query_seconds'] * 1000:11.1f} {r['drill_seconds'] * 1000:11.1f} {r['memo_seconds'] * 1000:10.3f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Perbandingan loader.load_all dengan cara lama (pd.DataFrame + pd.to_datetime tanpa format)
+# pada sheet ALL sintetis. Jalankan dari root repo:
+#   python -m benchmarks.bench_loader --rows 100000 --json bench_loader.json
+import argparse
+import json
+import time
+import tracemalloc
+import warnings
+
+import pandas as pd
+
+import api_client
+import loader
+from benchmarks import synthetic
+
+
+def current_path(rows):
+    # salinan cara lama di login.py
+    df = pd.DataFrame(rows)
+    df = df[[col for col in api_client.ALL_COLUMNS if col in df.columns]]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        df["Tanggal Pengerjaan"] = pd.to_datetime(df["Tanggal Pengerjaan"], errors="coerce").dt.date
+    return df
+
+
+def measure(fn, rows, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn(rows)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(rows)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        "best_seconds": min(timings),
+        "frame_bytes": int(df.memory_usage(deep=True).sum()),
+        "peak_alloc_bytes": peak,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    rows = synthetic.all_rows(args.rows)
+    report = {
+        "rows": args.rows,
+        "current": measure(current_path, rows, args.repeat),
+        "loader": measure(loader.load_all, rows, args.repeat),
+    }
+
+    print(f"Sheet ALL sintetis: {args.rows} baris")
+    print(f"{'':10} {'waktu (s)':>10} {'memori frame (MB)':>18} {'puncak alokasi (MB)':>20}")
+    for name in ("current", "loader"):
+        result = report[name]
+        print(
+            f"{name:10} {result['best_seconds']:10.3f} {result['frame_bytes'] / 1e6:18.1f}"
+            f" {result['peak_alloc_bytes'] / 1e6:20.1f}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
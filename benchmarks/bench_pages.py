@@ -0,0 +1,150 @@
+# Benchmark halaman Streamlit (login.py, add_spk_spv.run(), update_spk_spv.run()) dengan AppTest
+# terhadap benchmarks/fake_apps_script.py. Setiap rerun mencatat waktu, jumlah request HTTP,
+# byte terkirim/diterima dan puncak alokasi memori (tracemalloc). Rerun pertama memakai cache kosong.
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_pages --sizes 1000 10000 100000 --latency 0.2 --json bench_pages.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import requests
+from streamlit.testing.v1 import AppTest
+
+import api_client
+import loader
+import read_cache
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGES = {
+    "login": lambda: AppTest.from_file(os.path.join(ROOT, "login.py")),
+    "add_spk": lambda: AppTest.from_string("import add_spk_spv\nadd_spk_spv.run()"),
+    "update_spk": lambda: AppTest.from_string("import update_spk_spv\nupdate_spk_spv.run()"),
+}
+
+
+def start_server(rows, args):
+    command = [
+        sys.executable, "-m", "benchmarks.fake_apps_script", "--rows", str(rows),
+        "--text-size", str(args.text_size), "--latency", str(args.latency), "--error-rate", str(args.error_rate),
+    ]
+    proc = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True)
+    url = proc.stdout.readline().strip()
+    if not url:
+        proc.kill()
+        raise RuntimeError("fake_apps_script gagal dijalankan")
+    return proc, url
+
+
+def server_stats(url):
+    return requests.get(f"{url}/__stats", params={"reset": 1}, timeout=10).json()
+
+
+def cold_start(snapshot_dir):
+    # backend, cache baca dan snapshot Arrow dibuat ulang: rerun berikutnya mengambil data dari server
+    os.environ["SPK_SNAPSHOT_DIR"] = snapshot_dir
+    api_client._backends.clear()
+    api_client._snapshots = None
+    loader._frames.clear()
+    read_cache.cache.invalidate()
+
+
+def run_page(name, url, args):
+    # setiap halaman mulai dari kondisi dingin dengan direktori snapshot kosong
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        cold_start(snapshot_dir)
+        server_stats(url)
+        return _run_reruns(name, url, args)
+
+
+def _run_reruns(name, url, args):
+    app = PAGES[name]()
+    results = []
+    for rerun in range(args.reruns):
+        if args.memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        app.run(timeout=args.timeout)
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if args.memory else None
+        if args.memory:
+            tracemalloc.stop()
+
+        stats = server_stats(url)
+        results.append({
+            "page": name,
+            "rerun": rerun,
+            "seconds": seconds,
+            "http_calls": stats["requests"],
+            "http_errors": stats["errors"],
+            "bytes_sent": stats["bytes_in"],
+            "bytes_received": stats["bytes_out"],
+            "peak_alloc_bytes": peak,
+            "actions": stats["actions"],
+            "page_errors": [str(e.value) for e in app.error] + [str(e.value) for e in app.exception],
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000], help="baris sheet SPK/ALL")
+    parser.add_argument("--pages", nargs="+", choices=list(PAGES), default=list(PAGES))
+    parser.add_argument("--reruns", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.0, help="jeda (detik) setiap request di server palsu")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="peluang respons 503 dari server palsu")
+    parser.add_argument("--text-size", type=int, default=0, help="karakter tambahan di kolom teks bebas")
+    parser.add_argument("--timeout", type=float, default=300, help="batas waktu satu rerun (detik)")
+    parser.add_argument(
+        "--no-memory", dest="memory", action="store_false",
+        help="tanpa tracemalloc (waktu lebih akurat, puncak memori tidak dicatat)"
+    )
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    os.environ.pop("SPK_BACKEND", None)
+    report = {
+        "config": {key: value for key, value in vars(args).items() if key != "json"},
+        "python": platform.python_version(),
+        "results": [],
+    }
+
+    for rows in args.sizes:
+        proc, url = start_server(rows, args)
+        os.environ["SPK_APPS_SCRIPT_URL"] = url
+        try:
+            if rows == args.sizes[0]:
+                # impor modul halaman dan komponen Streamlit tidak ikut terukur
+                with tempfile.TemporaryDirectory() as snapshot_dir:
+                    cold_start(snapshot_dir)
+                    for name in args.pages:
+                        PAGES[name]().run(timeout=args.timeout)
+            for name in args.pages:
+                for result in run_page(name, url, args):
+                    report["results"].append({"rows": rows, **result})
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{'baris':>7} {'halaman':<11} {'rerun':>5} {'detik':>8} {'HTTP':>5} {'KB terima':>10} {'puncak MB':>10}  error")
+    for r in report["results"]:
+        peak = "-" if r["peak_alloc_bytes"] is None else f"{r['peak_alloc_bytes'] / 2**20:.1f}"
+        errors = "; ".join(r["page_errors"])[:60]
+        print(
+            f"{r['rows']:>7} {r['page']:<11} {r['rerun']:>5} {r['seconds']:8.3f} {r['http_calls']:>5}"
+            f" {r['bytes_received'] / 1024:10.1f} {peak:>10}  {errors}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
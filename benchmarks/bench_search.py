@@ -0,0 +1,80 @@
+# Pencarian teks di sheet ALL: inverted index (search_index.py) dibandingkan scan str.contains per kolom
+# seperti yang dilakukan setiap rerun tanpa index. Jalankan dari root repo:
+#   python -m benchmarks.bench_search --rows 100000 --json bench_search.json
+import argparse
+import json
+import time
+
+import numpy as np
+
+import loader
+import search_index
+from benchmarks import synthetic
+
+QUERIES = ["bocor", "ganti seal", "sparepart 12", "kalib", "overheat pelumasan"]
+
+
+def scan(df, query):
+    # semua kata harus muncul di salah satu kolom teks (tanpa ranking)
+    text = df[search_index.SEARCH_COLUMNS].astype(str).agg(" ".join, axis=1).str.lower()
+    mask = np.ones(len(df), dtype=bool)
+    for term in search_index.tokenize(query):
+        mask &= text.str.contains(term, regex=False).to_numpy()
+    return int(mask.sum())
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[100000])
+    parser.add_argument("--changed", type=int, default=100, help="baris yang diubah untuk pembaruan inkremental")
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.rows:
+        rows = synthetic.all_rows(n)
+        df = loader.load_all(rows)
+        df_next = loader.load_all(
+            [dict(row, Deskripsi=row["Deskripsi"] + " revisi") for row in rows[:args.changed]] + rows[args.changed:]
+        )
+
+        index = search_index.SearchIndex()
+        build, _ = timed(index.update, 1, df)
+        incremental, _ = timed(index.update, 2, df_next)
+        for query in QUERIES:
+            index_seconds, (ids, _) = timed(index.search, query)
+            scan_seconds, scan_hits = timed(scan, df_next, query)
+            results.append({
+                "rows": n,
+                "query": query,
+                "build_seconds": build,
+                "incremental_seconds": incremental,
+                "index_ms": index_seconds * 1000,
+                "index_hits": len(ids),
+                "scan_ms": scan_seconds * 1000,
+                "scan_hits": scan_hits,
+            })
+
+    print(f"{'baris':>7} {'query':<20} {'index (ms)':>11} {'hasil':>7} {'scan (ms)':>10} {'hasil':>7}")
+    for r in results:
+        print(
+            f"{r['rows']:>7} {r['query']:<20} {r['index_ms']:11.1f} {r['index_hits']:>7}"
+            f" {r['scan_ms']:10.1f} {r['scan_hits']:>7}"
+        )
+    for n in args.rows:
+        r = next(r for r in results if r["rows"] == n)
+        print(f"{n} baris: bangun index {r['build_seconds']:.2f} s, pembaruan inkremental {r['incremental_seconds']:.3f} s")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,530 @@
+# Load test banyak sesi Streamlit bersamaan. Aplikasi dijalankan sungguhan (streamlit run login.py) dengan
+# backend benchmarks/fake_apps_script.py, lalu N klien websocket (protokol yang sama dengan browser) menjalankan
+# alur login SPV -> isi dan kirim Tambah SPK -> pilih dan kirim Update SPK dengan jeda berpikir acak.
+# AppTest tidak dipakai karena tidak bisa menjalankan beberapa sesi bersamaan dalam satu proses.
+# Setiap jumlah sesi memakai server Streamlit baru (setelah satu sesi pemanasan yang tidak diukur); dicatat
+# latensi rerun p50/p95/p99 total dan per langkah, request backend per sesi, CPU dan RSS proses server
+# (dibaca dari /proc, Linux). Laporan JSON bisa dibandingkan antar rilis. Jalankan dari root repo:
+#   python -m benchmarks.bench_sessions --sessions 1 5 10 20 --rows 10000 --latency 0.2 --json capacity.json
+#   python -m benchmarks.bench_sessions --sessions 1 5 10 20 --rows 10000 --latency 0.2 --compare capacity.json
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import requests
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+from tornado.websocket import websocket_connect
+
+from benchmarks.bench_pages import ROOT, server_stats, start_server
+
+PERCENTILES = (50, 95, 99)
+
+USERNAME = "supervisor"
+PASSWORD = "spv123"
+
+# status script_finished yang menandai rerun selesai (FINISHED_EARLY_FOR_RERUN diikuti rerun berikutnya)
+DONE = (
+    ForwardMsg.FINISHED_SUCCESSFULLY,
+    ForwardMsg.FINISHED_WITH_COMPILE_ERROR,
+    ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY,
+)
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_streamlit(env):
+    port = _free_port()
+    command = [
+        sys.executable, "-m", "streamlit", "run", "login.py", "--server.headless", "true",
+        "--server.address", "127.0.0.1", "--server.port", str(port), "--server.fileWatcherType", "none",
+        "--browser.gatherUsageStats", "false",
+    ]
+    proc = subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline and proc.poll() is None:
+        try:
+            if requests.get(f"{url}/_stcore/health", timeout=1).ok:
+                return proc, url
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError("streamlit run gagal dijalankan")
+
+
+def _pending_writes(path):
+    if not os.path.exists(path):
+        return 0
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM "queue" WHERE "status" IN (?, ?)', ("pending", "sending")).fetchone()[0]
+    except sqlite3.Error:
+        return 0
+    finally:
+        conn.close()
+
+
+class ProcessSampler:
+    # CPU (utime + stime) dan RSS proses server dari /proc/<pid>; kosong jika /proc tidak ada
+    def __init__(self, pid, interval=0.5):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _read(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(")", 1)[1].split()
+        with open(f"/proc/{self.pid}/status") as f:
+            status = dict(line.split(":", 1) for line in f if ":" in line)
+        cpu = (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+        rss = int(status["VmRSS"].split()[0]) / 1024
+        peak = int(status["VmHWM"].split()[0]) / 1024
+        return time.perf_counter(), cpu, rss, peak
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.samples.append(self._read())
+
+    def __enter__(self):
+        try:
+            self.samples.append(self._read())
+        except OSError:
+            return self
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        if self._thread.is_alive():
+            self._stop.set()
+            self._thread.join()
+            self.samples.append(self._read())
+
+    def summary(self):
+        if len(self.samples) < 2:
+            return {"cpu_seconds": None, "cpu_percent": None, "cpu_percent_peak": None, "peak_rss_mb": None}
+        (t0, cpu0, _, _), (t1, cpu1, _, peak) = self.samples[0], self.samples[-1]
+        rates = [100 * (b[1] - a[1]) / (b[0] - a[0]) for a, b in zip(self.samples, self.samples[1:]) if b[0] > a[0]]
+        return {
+            "cpu_seconds": cpu1 - cpu0,
+            "cpu_percent": 100 * (cpu1 - cpu0) / (t1 - t0),
+            "cpu_percent_peak": max(rates),
+            "peak_rss_mb": peak,
+        }
+
+
+class Client:
+    # satu tab browser: kirim BackMsg rerun_script dengan state widget, terima ForwardMsg sampai rerun selesai.
+    # Elemen halaman disimpan per delta_path (dengan fragment dan nomor run) agar widget bisa dicari dari label
+    def __init__(self, url, timeout):
+        self.url = url
+        self.timeout = timeout
+        self.ws = None
+        self.elements = {}
+        self.values = {}
+        self.cache = {}
+        self.run = 0
+
+    async def connect(self):
+        self.ws = await websocket_connect(self.url.replace("http", "ws", 1) + "/_stcore/stream")
+        return await self.rerun()
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    def _resolve(self, msg):
+        # pesan yang sudah pernah dikirim ke sesi ini hanya dikirim ulang sebagai hash
+        if msg.WhichOneof("type") != "ref_hash":
+            if msg.metadata.cacheable:
+                self.cache[msg.hash] = msg
+            return msg
+        cached = self.cache.get(msg.ref_hash)
+        if cached is None:
+            response = requests.get(f"{self.url}/_stcore/message", params={"hash": msg.ref_hash}, timeout=10)
+            cached = self.cache[msg.ref_hash] = ForwardMsg.FromString(response.content)
+        resolved = ForwardMsg()
+        resolved.CopyFrom(cached)
+        resolved.metadata.CopyFrom(msg.metadata)
+        return resolved
+
+    def _finish(self, status, fragment_id):
+        # seperti frontend: elemen yang tidak dikirim ulang pada run ini dihapus
+        if status == ForwardMsg.FINISHED_SUCCESSFULLY:
+            stale = [path for path, (_, _, run) in self.elements.items() if run != self.run]
+        elif status == ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY:
+            stale = [
+                path for path, (_, fragment, run) in self.elements.items() if fragment == fragment_id and run != self.run
+            ]
+        else:
+            stale = []
+        for path in stale:
+            del self.elements[path]
+
+    async def rerun(self, states=(), fragment_id=""):
+        # hasil: detik sampai rerun (termasuk st.rerun berantai) selesai
+        alive = {widget.id for widget in self._widgets()}
+        self.values = {widget_id: state for widget_id, state in self.values.items() if widget_id in alive}
+        triggers = []
+        for state in states:
+            if state.HasField("trigger_value"):
+                triggers.append(state)
+            else:
+                self.values[state.id] = state
+
+        back = BackMsg()
+        back.rerun_script.page_script_hash = ""
+        back.rerun_script.fragment_id = fragment_id
+        back.rerun_script.widget_states.widgets.extend(list(self.values.values()) + triggers)
+
+        start = time.perf_counter()
+        await self.ws.write_message(back.SerializeToString(), binary=True)
+        while True:
+            data = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+            if data is None:
+                raise ConnectionError("websocket ditutup server")
+            msg = self._resolve(ForwardMsg.FromString(data))
+            kind = msg.WhichOneof("type")
+            if kind == "session_status_changed" and msg.session_status_changed.script_is_running:
+                self.run += 1
+            elif kind == "delta" and msg.delta.WhichOneof("type") in ("new_element", "add_block"):
+                element = msg.delta.new_element if msg.delta.HasField("new_element") else None
+                self.elements[tuple(msg.metadata.delta_path)] = (element, msg.delta.fragment_id, self.run)
+            elif kind == "script_finished":
+                self._finish(msg.script_finished, fragment_id)
+                if msg.script_finished in DONE:
+                    return time.perf_counter() - start
+
+    def _widgets(self):
+        for element, _, _ in self.elements.values():
+            if element is not None:
+                widget = getattr(element, element.WhichOneof("type"))
+                if getattr(widget, "id", ""):
+                    yield widget
+
+    def find(self, kind, label):
+        # hasil: (proto widget, fragment_id)
+        for element, fragment_id, _ in self.elements.values():
+            if element is not None and element.WhichOneof("type") == kind and getattr(element, kind).label == label:
+                return getattr(element, kind), fragment_id
+        raise LookupError(f"{kind} {label!r} tidak ditemukan")
+
+    def options(self, kind, label):
+        return list(self.find(kind, label)[0].options)
+
+    def errors(self):
+        messages = []
+        for element, _, _ in self.elements.values():
+            if element is None:
+                continue
+            if element.WhichOneof("type") == "exception":
+                messages.append(element.exception.message)
+            elif element.WhichOneof("type") == "alert" and element.alert.format == element.alert.ERROR:
+                messages.append(element.alert.body)
+        return messages
+
+    def set(self, kind, label, state):
+        # nilai widget di dalam form: dikirim bersama tombol submit
+        widget, _ = self.find(kind, label)
+        state.id = widget.id
+        self.values[widget.id] = state
+
+    async def change(self, kind, label, state):
+        widget, fragment_id = self.find(kind, label)
+        state.id = widget.id
+        return await self.rerun([state], fragment_id)
+
+    async def click(self, label):
+        return await self.change("button", label, WidgetState(trigger_value=True))
+
+    async def select(self, label, value):
+        return await self.change("selectbox", label, WidgetState(int_value=self.options("selectbox", label).index(value)))
+
+
+class Session:
+    # satu pengguna SPV; setiap langkah = satu interaksi widget + rerun yang diukur
+    def __init__(self, index, url, args, record):
+        self.rng = random.Random(index)
+        self.client = Client(url, args.timeout)
+        self.think = args.think
+        self.record = record
+
+    async def step(self, name, action):
+        await asyncio.sleep(self.rng.uniform(0, 2 * self.think))
+        seconds = await action()
+        self.record(name, seconds, self.client.errors())
+
+    async def login(self):
+        await self.step("buka", self.client.connect)
+        await self.step("pilih_role", lambda: self.client.click("🛠 Supervisor (SPV)"))
+        self.client.set("text_input", "👤 Username", WidgetState(string_value=USERNAME))
+        self.client.set("text_input", "🔒 Password", WidgetState(string_value=PASSWORD))
+        await self.step("login", lambda: self.client.click("✅ Login"))
+
+    async def browse(self):
+        page, _ = self.client.find("number_input", "Pilih Halaman")
+        if page.has_max and page.max > 1:
+            state = WidgetState(int_value=self.rng.randint(2, min(int(page.max), 50)))
+            await self.step("tabel:halaman", lambda: self.client.change("number_input", "Pilih Halaman", state))
+
+    async def add_spk(self):
+        for label in ("BU", "Produk", "Line", "Mesin", "Masalah"):
+            options = [option for option in self.client.options("selectbox", label) if option != ""]
+            if not options:
+                return
+            value = self.rng.choice(options)
+            await self.step(f"tambah:{label.lower()}", lambda: self.client.select(label, value))
+        state = WidgetState(string_value=f"Load test {self.rng.random():.6f}")
+        await self.step("tambah:tindakan", lambda: self.client.change("text_area", "Tindakan Perbaikan", state))
+        tanggal = WidgetState()
+        tanggal.string_array_value.data.append((date(2024, 1, 1) + timedelta(days=self.rng.randrange(365))).strftime("%Y/%m/%d"))
+        await self.step("tambah:tanggal", lambda: self.client.change("date_input", "Tanggal Pengerjaan", tanggal))
+        pics = self.client.options("multiselect", "PIC")
+        if not pics:
+            return
+        pic = WidgetState()
+        pic.int_array_value.data.append(self.rng.randrange(len(pics)))
+        await self.step("tambah:pic", lambda: self.client.change("multiselect", "PIC", pic))
+        await self.step("tambah:konfirmasi", lambda: self.client.click("➕ Tambah Data"))
+        await self.step("tambah:kirim", lambda: self.client.click("✅ Ya, Tambah Data"))
+
+    async def update_spk(self):
+        await self.step("update:buka", lambda: self.client.select("📌 Pilih Halaman:", "Update SPK"))
+        ids = self.client.options("selectbox", "Pilih ID")[:200]
+        if not ids:
+            return
+        selected = self.rng.choice(ids)
+        await self.step("update:pilih_id", lambda: self.client.select("Pilih ID", selected))
+        state = WidgetState(string_value=f"Revisi {self.rng.random():.6f}")
+        await self.step("update:tindakan", lambda: self.client.change("text_area", "Tindakan Perbaikan", state))
+        await self.step("update:kirim", lambda: self.client.click("Update Data"))
+
+    async def run(self):
+        try:
+            await self.login()
+            await self.browse()
+            await self.add_spk()
+            await self.update_spk()
+        finally:
+            self.client.close()
+
+
+async def run_sessions(url, sessions, args, record):
+    # semua sesi di satu event loop; sesi dimulai bertahap selama args.ramp detik
+    failed = []
+
+    async def session(index):
+        await asyncio.sleep(index * args.ramp / sessions)
+        try:
+            await Session(index, url, args, record).run()
+        except Exception as e:
+            failed.append(f"{type(e).__name__}: {e}")
+
+    await asyncio.gather(*(session(i) for i in range(sessions)))
+    return failed
+
+
+def _percentiles(values):
+    if not values:
+        return {f"p{p}": None for p in PERCENTILES}
+    return {f"p{p}": float(np.percentile(values, p)) for p in PERCENTILES}
+
+
+def run_level(sessions, backend_url, args):
+    steps, errors = {}, []
+
+    def record(name, seconds, step_errors):
+        steps.setdefault(name, []).append(seconds)
+        errors.extend(f"{name}: {error}" for error in step_errors)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        queue_path = os.path.join(tmp, "queue.db")
+        env = dict(
+            os.environ, SPK_APPS_SCRIPT_URL=backend_url, SPK_QUEUE_PATH=queue_path,
+            SPK_SNAPSHOT_DIR=os.path.join(tmp, "snapshots"),
+        )
+        env.pop("SPK_BACKEND", None)
+        proc, url = start_streamlit(env)
+        try:
+            # pemanasan: impor halaman dan pengambilan data pertama tidak ikut terukur
+            warmup = argparse.Namespace(**{**vars(args), "think": 0, "ramp": 0})
+            asyncio.run(run_sessions(url, 1, warmup, lambda *a: None))
+            deadline = time.time() + args.drain
+            while _pending_writes(queue_path) and time.time() < deadline:
+                time.sleep(0.2)
+            server_stats(backend_url)
+
+            with ProcessSampler(proc.pid) as sampler:
+                start = time.perf_counter()
+                failed = asyncio.run(run_sessions(url, sessions, args, record))
+                seconds = time.perf_counter() - start
+                # penulisan dari antrean (Tambah/Update SPK) dikirim worker di background; tunggu sampai habis
+                deadline = time.time() + args.drain
+                while _pending_writes(queue_path) and time.time() < deadline:
+                    time.sleep(0.2)
+            pending = _pending_writes(queue_path)
+            stats = server_stats(backend_url)
+        finally:
+            proc.terminate()
+            proc.wait()
+
+    latencies = [value for values in steps.values() for value in values]
+    return {
+        "sessions": sessions,
+        "reruns": len(latencies),
+        **_percentiles(latencies),
+        "max": max(latencies) if latencies else None,
+        "reruns_per_second": len(latencies) / seconds,
+        "steps": {name: {"count": len(values), **_percentiles(values)} for name, values in steps.items()},
+        "backend_calls_per_session": stats["requests"] / sessions,
+        "backend_actions": stats["actions"],
+        "backend_errors": stats["errors"],
+        "kb_received_per_session": stats["bytes_out"] / 1024 / sessions,
+        **sampler.summary(),
+        "seconds": seconds,
+        "pending_writes": pending,
+        "errors": errors,
+        "failed_sessions": failed,
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def capacity(results, slo):
+    # jumlah sesi terbesar yang p95-nya masih di bawah SLO (semua level yang lebih kecil juga lolos)
+    passed = None
+    for r in sorted(results, key=lambda r: r["sessions"]):
+        if r["p95"] is None or r["p95"] > slo or r["failed_sessions"]:
+            break
+        passed = r["sessions"]
+    return passed
+
+
+def _number(value, fmt):
+    return "-" if value is None else format(value, fmt)
+
+
+def print_report(report):
+    print(
+        f"{'sesi':>5} {'rerun':>6} {'p50 (s)':>8} {'p95 (s)':>8} {'p99 (s)':>8} {'rerun/s':>8}"
+        f" {'HTTP/sesi':>10} {'CPU %':>6} {'RSS MB':>7} {'error':>6}"
+    )
+    for r in report["results"]:
+        print(
+            f"{r['sessions']:>5} {r['reruns']:>6} {_number(r['p50'], '8.3f')} {_number(r['p95'], '8.3f')}"
+            f" {_number(r['p99'], '8.3f')} {r['reruns_per_second']:8.1f} {r['backend_calls_per_session']:10.1f}"
+            f" {_number(r['cpu_percent'], '6.0f')} {_number(r['peak_rss_mb'], '7.0f')}"
+            f" {len(r['errors']) + len(r['failed_sessions']):>6}"
+        )
+
+    largest = max(report["results"], key=lambda r: r["sessions"])
+    print(f"\nlangkah paling lambat pada {largest['sessions']} sesi (p95):")
+    for name, step in sorted(largest["steps"].items(), key=lambda item: -item[1]["p95"])[:5]:
+        print(f"  {name:<20} {step['p95']:8.3f} s ({step['count']}x)")
+
+    for r in report["results"]:
+        for message in (r["failed_sessions"] + r["errors"])[:3]:
+            print(f"  [{r['sessions']} sesi] {message[:120]}")
+        if r["pending_writes"]:
+            print(f"  [{r['sessions']} sesi] {r['pending_writes']} penulisan masih di antrean")
+
+    limit = report["capacity_sessions"]
+    print(
+        f"\nkapasitas (p95 <= {report['config']['slo_p95']} s): "
+        + (f"{limit} sesi" if limit else "tidak ada level yang memenuhi SLO")
+    )
+
+
+def print_comparison(report, baseline):
+    # p95 dan request backend per sesi dibandingkan dengan laporan rilis sebelumnya
+    print(f"\nperbandingan dengan {baseline.get('revision') or 'baseline'} (p95 dan HTTP/sesi):")
+    old = {r["sessions"]: r for r in baseline["results"]}
+    for r in report["results"]:
+        before = old.get(r["sessions"])
+        if before is None or before["p95"] is None or r["p95"] is None:
+            continue
+        change = 100 * (r["p95"] - before["p95"]) / before["p95"] if before["p95"] else 0
+        print(
+            f"  {r['sessions']:>4} sesi: p95 {before['p95']:.3f} -> {r['p95']:.3f} s ({change:+.0f}%),"
+            f" HTTP/sesi {before['backend_calls_per_session']:.1f} -> {r['backend_calls_per_session']:.1f}"
+        )
+    print(f"  kapasitas: {baseline.get('capacity_sessions')} -> {report['capacity_sessions']} sesi")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 5, 10, 20], help="jumlah sesi bersamaan")
+    parser.add_argument("--rows", type=int, default=10000, help="baris sheet SPK/ALL di server palsu")
+    parser.add_argument("--latency", type=float, default=0.2, help="jeda (detik) setiap request di server palsu")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="peluang respons 503 dari server palsu")
+    parser.add_argument("--text-size", type=int, default=0, help="karakter tambahan di kolom teks bebas")
+    parser.add_argument("--think", type=float, default=0.5, help="rata-rata jeda berpikir antar langkah (detik)")
+    parser.add_argument("--ramp", type=float, default=5.0, help="sesi dimulai bertahap selama sekian detik")
+    parser.add_argument("--timeout", type=float, default=120, help="batas waktu satu rerun (detik)")
+    parser.add_argument("--drain", type=float, default=60, help="batas tunggu antrean penulisan selesai (detik)")
+    parser.add_argument("--slo-p95", type=float, default=1.0, help="batas p95 latensi rerun (detik)")
+    parser.add_argument("--json", help="simpan laporan kapasitas ke file JSON")
+    parser.add_argument("--compare", help="laporan JSON rilis sebelumnya untuk dibandingkan")
+    args = parser.parse_args()
+
+    import streamlit
+
+    report = {
+        "revision": _git_revision(),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "config": {key: value for key, value in vars(args).items() if key not in ("json", "compare")},
+        "results": [],
+    }
+
+    proc, backend_url = start_server(args.rows, args)
+    try:
+        for sessions in args.sessions:
+            report["results"].append(run_level(sessions, backend_url, args))
+    finally:
+        proc.terminate()
+        proc.wait()
+    report["capacity_sessions"] = capacity(report["results"], args.slo_p95)
+
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as f:
+            print_comparison(report, json.load(f))
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
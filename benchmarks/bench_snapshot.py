@@ -0,0 +1,108 @@
+# Banyak sesi (thread) di beberapa proses membaca sheet ALL lengkap (loader.all_frame) bersamaan dari
+# benchmarks/fake_apps_script.py, dengan dan tanpa snapshot Arrow bersama. Dicatat jumlah request ke
+# Apps Script, waktu dan puncak RSS per proses; putaran kedua mengukur halaman dingin dari disk.
+# Jalankan dari root repo:
+#   python -m benchmarks.bench_snapshot --rows 50000 --processes 2 --threads 8 --json bench_snapshot.json
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+import api_client
+import loader
+from benchmarks.bench_pages import ROOT, server_stats
+
+
+def worker(threads):
+    backend = api_client.get_backend("login")
+    barrier = threading.Barrier(threads)
+    frames = [None] * threads
+
+    def session(i):
+        barrier.wait()
+        frames[i] = loader.all_frame(backend)
+
+    start = time.perf_counter()
+    pool = [threading.Thread(target=session, args=(i,)) for i in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    print(json.dumps({
+        "seconds": time.perf_counter() - start,
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "distinct_frames": len({id(df) for df in frames}),
+        "rows": len(frames[0]),
+    }))
+
+
+def run_round(args, url, snapshot_dir):
+    env = {**os.environ, "SPK_APPS_SCRIPT_URL": url, "SPK_SNAPSHOT_DIR": snapshot_dir}
+    env.pop("SPK_BACKEND", None)
+    command = [sys.executable, "-m", "benchmarks.bench_snapshot", "--worker", "--threads", str(args.threads)]
+    server_stats(url)
+    procs = [
+        subprocess.Popen(command, cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+        for _ in range(args.processes)
+    ]
+    workers = [json.loads(proc.communicate()[0]) for proc in procs]
+    stats = server_stats(url)
+    return {"http_calls": stats["requests"], "bytes_received": stats["bytes_out"], "workers": workers}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8, help="sesi per proses")
+    parser.add_argument("--latency", type=float, default=0.5)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.threads)
+        return
+
+    command = [
+        sys.executable, "-m", "benchmarks.fake_apps_script", "--rows", str(args.rows), "--latency", str(args.latency)
+    ]
+    # koneksi yang diputus klien karena timeout (putaran tanpa snapshot) tidak perlu dicetak server
+    server = subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    url = server.stdout.readline().strip()
+    report = {"rows": args.rows, "processes": args.processes, "threads": args.threads, "rounds": {}}
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            report["rounds"]["tanpa snapshot"] = run_round(args, url, "")
+            report["rounds"]["snapshot (kosong)"] = run_round(args, url, tmp)
+            report["rounds"]["snapshot (di disk)"] = run_round(args, url, tmp)
+    except requests.RequestException as e:
+        print(f"server palsu tidak bisa dihubungi: {e}")
+        return
+    finally:
+        server.terminate()
+        server.wait()
+
+    print(f"{'putaran':<20} {'HTTP':>5} {'MB terima':>10} {'detik maks':>11} {'RSS maks MB':>12} {'DataFrame/proses':>17}")
+    for name, r in report["rounds"].items():
+        workers = r["workers"]
+        print(
+            f"{name:<20} {r['http_calls']:>5} {r['bytes_received'] / 2**20:10.1f}"
+            f" {max(w['seconds'] for w in workers):11.2f} {max(w['peak_rss_mb'] for w in workers):12.0f}"
+            f" {max(w['distinct_frames'] for w in workers):>17}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# Ukuran transfer dan waktu decode get_all_data (sheet ALL): array objek (format lama) dibandingkan
+# format kolom, format kolom + gzip/base64 dan format kolom dengan proyeksi kolom. Jalankan dari root repo:
+#   python -m benchmarks.bench_wire --rows 10000 100000 --json bench_wire.json
+import argparse
+import json
+import time
+
+import api_client
+import loader
+from benchmarks import fake_apps_script, synthetic
+
+# contoh proyeksi: kolom yang dibutuhkan ringkasan per PIC/tanggal
+PROJECTION = ["ID", "BU", "Tanggal Pengerjaan", "PIC", "Kondisi", "Approve"]
+
+
+def columnar(rows, columns=None):
+    headers = columns or api_client.ALL_COLUMNS
+    return {
+        "format": "columnar",
+        "headers": headers,
+        "columns": [[row[name] for row in rows] for name in headers],
+        "row_count": len(rows),
+    }
+
+
+def decode_objects(body):
+    return loader.load_all(json.loads(body))
+
+
+def decode_columnar(body):
+    return loader.load_columns(api_client.decode_columnar(json.loads(body)))
+
+
+def best_of(fn, body, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        df = fn(body)
+        timings.append(time.perf_counter() - start)
+    return min(timings), df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", help="simpan hasil ke file JSON")
+    args = parser.parse_args()
+
+    results = []
+    for n in args.rows:
+        rows = synthetic.all_rows(n)
+        bodies = {
+            "objects": (decode_objects, json.dumps(rows)),
+            "columnar": (decode_columnar, json.dumps(columnar(rows))),
+            "columnar_gzip": (decode_columnar, json.dumps(fake_apps_script.encode_columnar(columnar(rows)))),
+            "columnar_gzip_projection": (
+                decode_columnar, json.dumps(fake_apps_script.encode_columnar(columnar(rows, PROJECTION)))
+            ),
+        }
+        for name, (decode, body) in bodies.items():
+            seconds, df = best_of(decode, body, args.repeat)
+            results.append({
+                "rows": n,
+                "format": name,
+                "bytes": len(body.encode("utf-8")),
+                "decode_seconds": seconds,
+                "frame_columns": len(df.columns),
+            })
+
+    print(f"{'baris':>7} {'format':<26} {'KB':>10} {'decode (s)':>11} {'kolom':>6}")
+    for r in results:
+        print(
+            f"{r['rows']:>7} {r['format']:<26} {r['bytes'] / 1024:10.0f} {r['decode_seconds']:11.3f}"
+            f" {r['frame_columns']:>6}"
+        )
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# Pengganti lokal Apps Script Web App untuk benchmark. Melayani doGet/doPost dari
+# apps_script_login.txt (/login/exec) dan apps_script_add-update_spk.txt (/add_spk/exec, /update_spk/exec)
+# di atas SQLiteBackend, dengan latensi, ukuran payload dan error rate yang bisa diatur:
+#   python -m benchmarks.fake_apps_script --rows 10000 --latency 0.3 --error-rate 0.05
+# --lost-response-rate: POST tetap diproses tetapi klien menerima 503 (respons hilang setelah baris ditulis).
+# lalu jalankan halaman dengan SPK_APPS_SCRIPT_URL=<url yang dicetak> streamlit run login.py.
+# GET /__stats mengembalikan jumlah request dan byte sejak reset (/__stats?reset=1 sekaligus mereset).
+import argparse
+import base64
+import gzip
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import api_client
+from benchmarks import synthetic
+
+# deployment -> profil SQLiteBackend
+SCRIPTS = {"login": "login", "add_spk": "spk", "update_spk": "spk"}
+
+# action doGet/doPost yang ada di masing-masing file Apps Script
+GET_ACTIONS = {
+    "login": ("get_all_data", "get_data"),
+    "spk": ("get_options", "get_data", "get_all_data"),
+}
+POST_ACTIONS = {
+    "login": ("approve_batch",),
+    "spk": ("add_data", "add_data_batch", "update_data"),
+}
+
+# halaman error Google saat script gagal/kuota habis (bukan JSON)
+ERROR_PAGE = b"<html><body>Service invoked too many times for one day</body></html>"
+
+
+def seed_database(path, rows, text_size=0, seed=0):
+    # SPK `rows` baris; ALL berisi SPK yang sudah dipindahkan (ID yang sama), 10% SPK pertama belum masuk ALL
+    # (bisa diedit). ID ALL tidak pernah melewati ID SPK terakhir, jadi SPK baru dari add_data tetap bisa diedit.
+    # text_size menambah panjang kolom teks bebas untuk mengatur ukuran payload
+    api_client.SQLiteBackend(path)
+    filler = " " + "x" * text_size if text_size else ""
+    rng = random.Random(seed)
+
+    options = [("BU", bu, None) for bu in synthetic.BUS]
+    for sheet, values in (
+        ("Line", synthetic.LINES), ("Produk", synthetic.PRODUKS), ("Mesin", synthetic.MESINS), ("PIC", synthetic.PICS)
+    ):
+        options += [(sheet, bu, value) for bu in synthetic.BUS for value in values]
+    options += [("Masalah", mesin, masalah) for mesin in synthetic.MESINS for masalah in synthetic.MASALAHS]
+
+    spk = synthetic.spk_rows(rows, seed)
+    for row in spk:
+        row[7] += filler
+
+    offset = rows // 10
+    all_rows = []
+    for row in synthetic.all_rows(rows - offset, seed + 1):
+        row["ID"] = int(row["ID"]) + offset
+        row["Tindakan Perbaikan"] += filler
+        row["Deskripsi"] += filler
+        all_rows.append([row[col] for col in api_client.ALL_COLUMNS])
+
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany('INSERT INTO "OPTIONS" VALUES (?, ?, ?)', options)
+        conn.executemany(f'INSERT INTO "SPK" VALUES ({", ".join("?" * len(api_client.SPK_COLUMNS))})', spk)
+        conn.executemany(
+            f'INSERT INTO "ALL" VALUES ({", ".join("?" * len(api_client.ALL_COLUMNS))})', all_rows
+        )
+        conn.executemany(
+            'INSERT INTO "PIC_ID" VALUES (?, ?)', [(int(row[0]), rng.choice(synthetic.PICS)) for row in spk]
+        )
+    conn.close()
+
+
+class FakeAppsScript(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, db_path, latency=0.0, error_rate=0.0, seed=0, lost_response_rate=0.0):
+        super().__init__(address, Handler)
+        self.backends = {script: api_client.SQLiteBackend(db_path, script=script) for script in GET_ACTIONS}
+        self.latency = latency
+        self.error_rate = error_rate
+        self.lost_response_rate = lost_response_rate
+        self.rng = random.Random(seed)
+        self.stats_lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self.stats_lock:
+            self.stats = {"requests": 0, "errors": 0, "bytes_in": 0, "bytes_out": 0, "actions": {}}
+
+    def snapshot(self, reset=False):
+        with self.stats_lock:
+            stats = json.loads(json.dumps(self.stats))
+        if reset:
+            self.reset_stats()
+        return stats
+
+    def record(self, action, bytes_in, bytes_out, error):
+        with self.stats_lock:
+            self.stats["requests"] += 1
+            self.stats["errors"] += int(error)
+            self.stats["bytes_in"] += bytes_in
+            self.stats["bytes_out"] += bytes_out
+            self.stats["actions"][action] = self.stats["actions"].get(action, 0) + 1
+
+    def fail_now(self):
+        with self.stats_lock:
+            return self.rng.random() < self.error_rate
+
+    def lose_response(self):
+        with self.stats_lock:
+            return self.rng.random() < self.lost_response_rate
+
+
+def encode_columnar(payload):
+    # seperti jsonOutput di Apps Script: JSON di-gzip lalu base64
+    data = base64.b64encode(gzip.compress(json.dumps(payload).encode("utf-8"))).decode("ascii")
+    return {"format": "columnar", "encoding": "gzip+base64", "data": data}
+
+
+def _get(backend, action, params):
+    first = lambda name, default=None: params.get(name, [default])[0]
+    if action in ("get_data", "get_all_data") and first("format") == "columnar" and not (first("page") or first("since")):
+        columns = first("columns").split(",") if first("columns") else None
+        fetch = backend.get_all_columns if action == "get_all_data" else backend.get_data_columns
+        payload = fetch(columns)
+        return encode_columnar(payload) if first("gzip") == "1" else payload
+    if action in ("get_data", "get_all_data"):
+        if first("page") and backend.script == "login":
+            fetch = backend.get_all_data_page if action == "get_all_data" else backend.get_data_page
+            return fetch(
+                pics=params.get("pic", []), start=first("start"), end=first("end"),
+                page=max(1, int(first("page"))), page_size=max(1, int(first("page_size", 10))),
+            )
+        if first("since"):
+            return getattr(backend, action)(since=first("since"), since_id=int(first("since_id", 0) or 0))
+    return getattr(backend, action)()
+
+
+def _post(backend, action, payload):
+    if action == "add_data_batch":
+        return backend.add_data_batch(payload.get("rows") or [], request_id=payload.get("request_id"))
+    if action == "approve_batch":
+        return backend.approve_batch(
+            payload.get("role"), payload.get("approver"), payload.get("ids") or [], payload.get("approve"),
+            payload.get("reason", ""),
+        )
+    form_data = {key: value for key, value in payload.items() if key != "action"}
+    return getattr(backend, action)(form_data)
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        return len(body)
+
+    def _handle(self, method):
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+        deployment = url.path.strip("/").split("/")[0]
+
+        if deployment == "__stats":
+            self._send(200, json.dumps(self.server.snapshot(reset="reset" in params)).encode("utf-8"))
+            return
+
+        bytes_in = len(self.path) + int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0)) if method == "POST" else b""
+        time.sleep(self.server.latency)
+
+        script = SCRIPTS.get(deployment)
+        if script is None:
+            self.server.record(None, bytes_in, self._send(404, b"Not Found", "text/plain"), True)
+            return
+        if self.server.fail_now():
+            self.server.record(None, bytes_in, self._send(503, ERROR_PAGE, "text/html"), True)
+            return
+
+        backend = self.server.backends[script]
+        try:
+            if method == "GET":
+                action = params.get("action", [None])[0]
+                allowed = action in GET_ACTIONS[script]
+                result = _get(backend, action, params) if allowed else {"error": "Invalid action"}
+            else:
+                payload = json.loads(body)
+                action = payload.get("action")
+                allowed = action in POST_ACTIONS[script]
+                result = _post(backend, action, payload) if allowed else {"error": "Invalid action"}
+        except (ValueError, api_client.BackendError) as e:
+            action, result = None, {"error": str(e)}
+
+        if method == "POST" and self.server.lose_response():
+            self.server.record(action, bytes_in, self._send(503, ERROR_PAGE, "text/html"), True)
+            return
+        bytes_out = self._send(200, json.dumps(result).encode("utf-8"))
+        self.server.record(action, bytes_in, bytes_out, isinstance(result, dict) and "error" in result)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--db", help="database SQLite yang sudah ada; jika kosong dibuat dari --rows")
+    parser.add_argument("--rows", type=int, default=1000, help="jumlah baris sheet SPK dan ALL")
+    parser.add_argument("--text-size", type=int, default=0, help="karakter tambahan di kolom teks bebas")
+    parser.add_argument("--latency", type=float, default=0.0, help="jeda (detik) setiap request")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="peluang respons 503 (0-1)")
+    parser.add_argument(
+        "--lost-response-rate", type=float, default=0.0, help="peluang POST diproses tetapi dibalas 503 (0-1)"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0, help="0 = pilih port bebas")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = args.db
+        if not db_path:
+            db_path = os.path.join(tmp, "fake_apps_script.db")
+            seed_database(db_path, args.rows, args.text_size, args.seed)
+
+        server = FakeAppsScript(
+            (args.host, args.port), db_path, args.latency, args.error_rate, args.seed, args.lost_response_rate
+        )
+        # baris pertama stdout adalah base URL (dibaca oleh bench_pages)
+        print(f"http://{args.host}:{server.server_address[1]}", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+import random
+from datetime import date, datetime, timedelta
+
+import api_client
+
+BUS = ["BU%d" % i for i in range(1, 6)]
+LINES = ["Line %d" % i for i in range(1, 21)]
+PRODUKS = ["Produk %d" % i for i in range(1, 31)]
+MESINS = ["Mesin %d" % i for i in range(1, 41)]
+PICS = ["PIC %d" % i for i in range(1, 51)]
+MASALAHS = ["Bocor", "Aus", "Macet", "Overheat", "Getaran", "Korsleting", "Baut longgar", "Sensor error"]
+TINDAKANS = ["Ganti seal", "Ganti bearing", "Pelumasan", "Kalibrasi sensor", "Kencangkan baut", "Bersihkan filter"]
+KONDISIS = ["OK", "NG"]
+APPROVES = ["", "Approved", "Rejected"]
+
+
+def _timestamp(rng, start):
+    return (start + timedelta(seconds=rng.randrange(0, 3 * 365 * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def all_rows(n, seed=0):
+    # baris sheet ALL seperti hasil get_all_data (dict, semua nilai teks)
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    rows = []
+    for i in range(1, n + 1):
+        tanggal = date(2023, 1, 1) + timedelta(days=rng.randrange(0, 3 * 365))
+        mulai = rng.randrange(7 * 60, 20 * 60)
+        rows.append({
+            "ID": str(i),
+            "BU": rng.choice(BUS),
+            "Line": rng.choice(LINES),
+            "Produk": rng.choice(PRODUKS),
+            "Nomor Mesin": "NM-%04d" % rng.randrange(1, 2000),
+            "Mesin": rng.choice(MESINS),
+            "Tanggal Pengerjaan": tanggal.strftime("%d-%b-%y"),
+            "Mulai": "%02d:%02d" % divmod(mulai, 60),
+            "Selesai": "%02d:%02d" % divmod(mulai + rng.randrange(10, 240), 60),
+            "Masalah": rng.choice(MASALAHS),
+            "Tindakan Perbaikan": rng.choice(TINDAKANS),
+            "Deskripsi": "Sparepart %d" % rng.randrange(1, 500),
+            "Quantity": str(rng.randrange(1, 10)),
+            "PIC": rng.choice(PICS),
+            "Kondisi": rng.choice(KONDISIS),
+            "Alasan": "",
+            "SPV": "supervisor",
+            "Last Update SPV": _timestamp(rng, start),
+            "Approve": rng.choice(APPROVES),
+            "Reason": "",
+            "SM": "manager",
+            "Last Update SM": _timestamp(rng, start),
+        })
+    return rows
+
+
+def spk_rows(n, seed=0):
+    # baris sheet SPK dalam urutan kolom api_client.SPK_COLUMNS (semua nilai teks)
+    rng = random.Random(seed)
+    start = datetime(2023, 1, 1)
+    rows = []
+    for i in range(1, n + 1):
+        tanggal = date(2023, 1, 1) + timedelta(days=rng.randrange(0, 3 * 365))
+        rows.append([
+            str(i), rng.choice(BUS), rng.choice(LINES), rng.choice(PRODUKS), "NM-%04d" % rng.randrange(1, 2000),
+            rng.choice(MESINS), rng.choice(MASALAHS), rng.choice(TINDAKANS), tanggal.strftime("%d-%b-%y"),
+            rng.choice(PICS), _timestamp(rng, start),
+        ])
+    return rows
+
+
+def spk_records(n, seed=0):
+    return [dict(zip(api_client.SPK_COLUMNS, row)) for row in spk_rows(n, seed)]
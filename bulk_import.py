@@ -0,0 +1,113 @@
+import hashlib
+
+import pandas as pd
+import streamlit as st
+
+import api_client
+import loader
+
+# kolom file import, sama dengan kolom overview di form Tambah SPK
+TEMPLATE_COLUMNS = ["BU", "Line", "Produk", "Nomor", "Mesin", "Masalah", "Tindakan", "Tanggal", "PIC"]
+REQUIRED_COLUMNS = ["BU", "Line", "Produk", "Mesin", "Masalah", "Tindakan", "Tanggal", "PIC"]
+
+# format tanggal yang diterima dari CSV/XLSX
+IMPORT_DATE_FORMATS = ("%Y-%m-%d", "%d-%b-%y", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S")
+
+
+def read_upload(uploaded_file):
+    if uploaded_file.name.lower().endswith(".xlsx"):
+        df = pd.read_excel(uploaded_file, dtype=str)
+    else:
+        df = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+    df.columns = [str(col).strip() for col in df.columns]
+    return df.fillna("")
+
+
+def file_hash(uploaded_file):
+    return hashlib.sha256(uploaded_file.getvalue()).hexdigest()
+
+
+def validate(df, options):
+    # cek setiap baris terhadap option_index; hasil: (baris siap kirim, preview dengan kolom "Error")
+    df = df.reindex(columns=TEMPLATE_COLUMNS, fill_value="").astype(str).apply(lambda col: col.str.strip())
+    tanggal = loader.parse_dates(df["Tanggal"].reset_index(drop=True), IMPORT_DATE_FORMATS)
+
+    rows, errors = [], []
+    for i, row in enumerate(df.to_dict("records")):
+        problems = [f"{col} kosong" for col in REQUIRED_COLUMNS if not row[col]]
+        bu, mesin = row["BU"], row["Mesin"]
+        pics = [pic.strip() for pic in row["PIC"].split(",") if pic.strip()]
+
+        if bu and bu not in options.bu:
+            problems.append("BU tidak dikenal")
+        elif bu:
+            for col in ("Produk", "Line", "Mesin"):
+                if row[col] and row[col] not in options.for_bu(bu, col):
+                    problems.append(f"{col} tidak ada di BU {bu}")
+            unknown = [pic for pic in pics if pic not in options.for_bu(bu, "PIC")]
+            if unknown:
+                problems.append(f"PIC tidak ada di BU {bu}: {', '.join(unknown)}")
+
+        if mesin and row["Masalah"] and row["Masalah"] not in options.masalah(mesin):
+            problems.append(f"Masalah tidak ada untuk mesin {mesin}")
+        if row["Tanggal"] and pd.isna(tanggal[i]):
+            problems.append("Tanggal tidak valid")
+
+        errors.append(", ".join(problems))
+        if not problems:
+            rows.append({**row, "Tanggal": tanggal[i].strftime("%Y-%m-%d"), "PIC": ", ".join(pics)})
+
+    return rows, df.assign(Error=errors)
+
+
+def run(backend, options):
+    st.subheader("Import Massal SPK")
+    st.caption(f"Kolom file: {', '.join(TEMPLATE_COLUMNS)}. PIC lebih dari satu dipisahkan koma.")
+    st.download_button(
+        "⬇️ Download Template CSV", ",".join(TEMPLATE_COLUMNS) + "\n",
+        file_name="template_spk.csv", mime="text/csv"
+    )
+
+    uploaded = st.file_uploader("Upload file CSV/XLSX", type=["csv", "xlsx"])
+    if uploaded is None:
+        return
+
+    try:
+        df = read_upload(uploaded)
+    except Exception as e:
+        # file rusak atau bukan CSV/XLSX (BadZipFile, InvalidFileException, KeyError dari openpyxl, ParserError, ...)
+        st.error(f"❌ File tidak bisa dibaca: {e}")
+        return
+
+    if df.empty:
+        st.warning("File tidak berisi data.")
+        return
+
+    rows, preview = validate(df, options)
+    invalid = int((preview["Error"] != "").sum())
+
+    st.subheader("🔍 **Preview Data yang Akan Dikirim**")
+    st.dataframe(preview, use_container_width=True)
+
+    if invalid:
+        st.error(f"❌ {invalid} dari {len(preview)} baris tidak valid. Perbaiki file lalu upload ulang.")
+        return
+
+    # file yang sama tidak boleh terkirim dua kali; ID dari isi file, jadi upload ulang file yang sama tetap dikenali
+    file_id = file_hash(uploaded)
+    already_sent = st.session_state.get("bulk_import_sent") == file_id
+
+    if st.button(f"✅ Kirim {len(rows)} SPK", disabled=already_sent):
+        try:
+            # kirim ulang file yang sama (mis. setelah timeout) tidak menambah baris dua kali di server
+            result = backend.add_data_batch(rows, request_id=f"bulk-{file_id}")
+        except api_client.BackendError as e:
+            result = {"status": "error", "error": str(e)}
+
+        if result.get("status") == "success":
+            st.session_state.bulk_import_sent = file_id
+            st.success(f"✅ {len(rows)} SPK berhasil ditambahkan (ID {result['first_id']} - {result['last_id']}).")
+        else:
+            st.error(f"❌ Gagal menambahkan data: {result.get('error', 'Tidak diketahui')}")
+    elif already_sent:
+        st.info("✅ File ini sudah dikirim.")
@@ -0,0 +1,83 @@
+import streamlit as st
+import api_client
+import kpi
+import profiling
+
+# dimensi yang bisa dipilih untuk pengelompokan dan drill-down
+GROUPS = ["BU", "Line", "Mesin", "PIC", "Bulan", "Kondisi"]
+CHART_MEASURES = ["Jumlah", "Downtime (jam)", "Rata-rata Downtime (menit)", "Approval Rate (%)"]
+ALL = "(semua)"
+
+def run():
+    st.markdown(
+        """
+        <h1 style='text-align: center; color: white; background-color: #85C1E9; padding: 15px; border-radius: 10px;'>
+            📊 Dashboard KPI Preventive
+        </h1>
+        """,
+        unsafe_allow_html=True
+    )
+
+    # agregat sheet ALL dipakai bersama semua sesi; hanya baris yang berubah sejak versi terakhir yang dihitung
+    backend = api_client.get_backend("login")
+    try:
+        cube = kpi.get_cube(backend)
+    except api_client.BackendError as e:
+        st.error(f"Gagal mengambil data dari API: {e}")
+        return
+
+    # === Filter ===
+    col_bu, col_bulan = st.columns(2)
+    with col_bu:
+        bu = st.multiselect("BU", cube.options("BU"), key="kpi_bu")
+    months = [m for m in cube.options("Bulan") if m != kpi.EMPTY]
+    filters = {"BU": bu}
+    if len(months) > 1:
+        with col_bulan:
+            start, end = st.select_slider("Rentang Bulan", months, value=(months[0], months[-1]), key="kpi_bulan")
+        if (start, end) != (months[0], months[-1]):
+            filters["Bulan"] = [m for m in months if start <= m <= end]
+
+    # === Ringkasan ===
+    total = cube.summary([], filters)
+    if total is None or total.empty or not total["Jumlah"].iloc[0]:
+        st.warning("Data tidak tersedia atau kosong dari API.")
+        return
+    total = total.iloc[0]
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Jumlah Preventive", f"{int(total['Jumlah']):,}")
+    col2.metric("Total Downtime (jam)", f"{total['Downtime (jam)']:,}")
+    col3.metric("Rata-rata Downtime (menit)", total["Rata-rata Downtime (menit)"])
+    col4.metric("Approval Rate (%)", total["Approval Rate (%)"])
+
+    # === Per dimensi ===
+    col_group, col_measure = st.columns(2)
+    with col_group:
+        group = st.selectbox("Kelompokkan per", GROUPS, key="kpi_group")
+    with col_measure:
+        measure = st.selectbox("Grafik", CHART_MEASURES, key="kpi_measure")
+
+    summary = cube.summary([group], filters)
+    with profiling.span("render:kpi", rows=len(summary)):
+        st.bar_chart(summary[measure])
+        st.dataframe(summary, use_container_width=True)
+
+    # === Drill-down: satu nilai dimensi dipecah per dimensi lain ===
+    st.markdown("---")
+    col_value, col_sub = st.columns(2)
+    with col_value:
+        value = st.selectbox(f"Drill-down {group}", [ALL] + [str(v) for v in summary.index], key="kpi_drill")
+    if value != ALL:
+        with col_sub:
+            sub = st.selectbox("Pecah per", [g for g in GROUPS if g != group], key="kpi_sub")
+        detail = cube.summary([sub], {**filters, group: [value]})
+        st.subheader(f"{group} {value} per {sub}")
+        st.dataframe(detail, use_container_width=True)
+
+    st.caption(
+        f"{cube.last_changed} baris dihitung pada pembaruan terakhir "
+        f"({cube.full_builds} hitung penuh, {cube.incremental_updates} inkremental)."
+    )
+
+if __name__ == "__main__":
+    run()
@@ -0,0 +1,241 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+import loader
+import profiling
+
+# dimensi KPI; kubus agregat menyimpan satu baris per kombinasi nilai dimensi
+DIMENSIONS = ["BU", "Line", "Mesin", "PIC", "Bulan", "Kondisi", "Status"]
+# ukuran yang bisa dijumlahkan, sehingga kubus bisa ditambah/dikurangi per baris yang berubah
+MEASURES = ["Jumlah", "Downtime (menit)", "Downtime Tercatat", "Quantity"]
+
+# kolom sheet ALL yang dipakai; hanya perubahan di kolom ini yang memicu pembaruan kubus
+SOURCE_COLUMNS = ["BU", "Line", "Mesin", "PIC", "Tanggal Pengerjaan", "Mulai", "Selesai", "Kondisi", "Approve", "Quantity"]
+
+EMPTY = "-"
+STATUSES = ["Approved", "Rejected", "Pending"]
+
+# hasil drill-down yang diingat per versi data
+MAX_QUERIES = 64
+
+
+def _per_unique(values, fn, missing):
+    # fn dijalankan pada nilai unik saja (tanggal, jam, kategori berulang ribuan kali)
+    codes, uniques = pd.factorize(values)
+    mapped = np.asarray(fn(pd.Series(uniques)), dtype=object)
+    return pd.Series(np.where(codes >= 0, mapped[codes], missing), index=values.index)
+
+
+def _minutes(values):
+    # "07:30", "07:30:00" atau tanggal-waktu dari Sheets -> menit sejak 00:00
+    def parse(uniques):
+        parts = uniques.astype(str).str.extract(r"(\d{1,2}):(\d{2})").astype(float)
+        return parts[0] * 60 + parts[1]
+    return _per_unique(values, parse, np.nan).astype(float)
+
+
+def _text(values):
+    return _per_unique(values, lambda u: u.astype(str).str.strip().replace("", EMPTY), EMPTY)
+
+
+def _status(values):
+    def classify(uniques):
+        approve = uniques.astype(str).str.strip().str.lower()
+        return np.select(
+            [approve.str.match(r"approve|yes|setuju|ok"), approve.str.match(r"reject|no|tolak")],
+            ["Approved", "Rejected"], "Pending",
+        )
+    return _per_unique(values, classify, "Pending")
+
+
+def to_facts(frame):
+    # frame: sheet ALL bertipe (loader), index ID -> satu baris fakta per SPK (dimensi teks + ukuran)
+    downtime = (_minutes(frame["Selesai"]) - _minutes(frame["Mulai"])) % (24 * 60)  # lewat tengah malam
+    facts = pd.DataFrame({
+        "BU": _text(frame["BU"]),
+        "Line": _text(frame["Line"]),
+        "Mesin": _text(frame["Mesin"]),
+        "PIC": _text(frame["PIC"]),
+        "Bulan": _per_unique(frame["Tanggal Pengerjaan"], lambda u: u.dt.strftime("%Y-%m"), EMPTY),
+        "Kondisi": _text(frame["Kondisi"]),
+        "Status": _status(frame["Approve"]),
+        "Jumlah": 1,
+        "Downtime (menit)": downtime.fillna(0),
+        "Downtime Tercatat": downtime.notna().astype(int),
+        "Quantity": frame["Quantity"].fillna(0).astype(float),
+    }, index=frame.index)
+    return facts
+
+
+def _group(facts):
+    return facts.groupby(DIMENSIONS, sort=False)[MEASURES].sum()
+
+
+class KpiCube:
+    # agregat KPI sheet ALL per versi data. Versi baru dibandingkan per ID (hash isi baris) dengan versi
+    # sebelumnya; hanya baris baru/berubah/terhapus yang dihitung lalu ditambahkan/dikurangkan dari kubus.
+    # Kubus disimpan sebagai array: kode nilai per dimensi + ukuran, dengan dict kombinasi -> posisi baris
+    def __init__(self):
+        self.version = None
+        self.full_builds = 0
+        self.incremental_updates = 0
+        self.last_changed = 0
+        self._lock = threading.Lock()
+        self._hashes = None
+        self._facts = None
+        self._categories = [[] for _ in DIMENSIONS]
+        self._codes = [{} for _ in DIMENSIONS]
+        self._positions = {}
+        self._dims = np.empty((0, len(DIMENSIONS)), dtype=np.int32)
+        self._measures = np.empty((0, len(MEASURES)))
+        self._size = 0
+        self._table = None
+        self._queries = {}
+
+    def _code(self, i, value):
+        code = self._codes[i].get(value)
+        if code is None:
+            code = self._codes[i][value] = len(self._categories[i])
+            self._categories[i].append(value)
+        return code
+
+    def _apply(self, delta):
+        # delta: hasil _group (positif untuk baris masuk, negatif untuk baris keluar)
+        if delta.empty:
+            return
+        index = delta.index
+        # nilai dimensi -> kode kubus; loop hanya atas nilai unik per level
+        dims = np.column_stack([
+            np.array([self._code(i, value) for value in level], dtype=np.int32)[codes]
+            for i, (level, codes) in enumerate(zip(index.levels, index.codes))
+        ])
+        positions = np.empty(len(delta), dtype=np.int64)
+        for n, key in enumerate(map(tuple, dims.tolist())):
+            position = self._positions.get(key)
+            if position is None:
+                position = self._positions[key] = self._size
+                self._size += 1
+            positions[n] = position
+
+        if self._size > len(self._dims):
+            capacity = max(1024, 2 * self._size)
+            self._dims = np.resize(self._dims, (capacity, len(DIMENSIONS)))
+            self._measures = np.concatenate([self._measures, np.zeros((capacity - len(self._measures), len(MEASURES)))])
+        self._dims[positions] = dims
+        np.add.at(self._measures, positions, delta.to_numpy(dtype=float))
+
+    def _build_table(self):
+        size = self._size
+        live = self._measures[:size, 0] != 0  # kombinasi yang semua barisnya sudah hilang
+        table = pd.DataFrame({
+            dim: pd.Categorical.from_codes(
+                self._dims[:size, i][live], categories=self._categories[i]
+            ).reorder_categories(sorted(self._categories[i]))
+            for i, dim in enumerate(DIMENSIONS)
+        })
+        for j, measure in enumerate(MEASURES):
+            table[measure] = self._measures[:size, j][live]
+        return table
+
+    def update(self, version, df):
+        # version None (snapshot mati): selalu dibandingkan dengan hash, tetap tanpa hitung ulang penuh
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            frame, hashes = loader.row_hashes(df, SOURCE_COLUMNS)
+
+            if self._hashes is None:
+                with profiling.span("kpi:full", rows=len(frame)):
+                    facts = to_facts(frame)
+                    self._apply(_group(facts))
+                self.full_builds += 1
+                self.last_changed = len(frame)
+            else:
+                modified, added, removed = loader.changed_rows(self._hashes, hashes)
+                self.last_changed = len(modified) + len(added) + len(removed)
+                if self.last_changed == 0:
+                    self.version = version
+                    return
+
+                with profiling.span("kpi:incremental", rows=self.last_changed):
+                    outgoing = self._facts.loc[modified.append(removed)]
+                    incoming = to_facts(frame.loc[modified.append(added)])
+                    self._apply(_group(incoming).sub(_group(outgoing), fill_value=0))
+                    facts = pd.concat([self._facts.drop(outgoing.index), incoming])
+                self.incremental_updates += 1
+
+            self._hashes = hashes
+            self._facts = facts
+            self._table = self._build_table()
+            self._queries = {}
+            self.version = version
+
+    def options(self, dimension):
+        with self._lock:
+            table = self._table
+        return sorted(table[dimension].unique()) if table is not None else []
+
+    def summary(self, by, filters=None):
+        # rollup kubus per dimensi `by` (list) dengan filter {dimensi: [nilai, ...]}; hasil dipakai bersama
+        filters = {dim: tuple(values) for dim, values in (filters or {}).items() if values}
+        key = (tuple(by), tuple(sorted(filters.items())))
+        with self._lock:
+            table = self._table
+            result = self._queries.get(key)
+        if result is not None or table is None:
+            return result
+
+        with profiling.span("kpi:summary", by=",".join(by)):
+            mask = np.ones(len(table), dtype=bool)
+            for dim, values in filters.items():
+                mask &= table[dim].isin(values).to_numpy()
+            selected = table[mask]
+            if by:
+                totals = selected.groupby(by, observed=True)[MEASURES].sum()
+                status = selected.groupby(by + ["Status"], observed=True)["Jumlah"].sum().unstack(fill_value=0)
+            else:
+                totals = selected[MEASURES].sum().to_frame().T
+                status = selected.groupby("Status", observed=True)["Jumlah"].sum().to_frame().T.reset_index(drop=True)
+            status = status.reindex(index=totals.index, columns=STATUSES, fill_value=0)
+            result = _with_rates(totals, status)
+
+        with self._lock:
+            # update() di tengah perhitungan: hasil dari tabel lama tidak disimpan untuk versi baru
+            if self._table is not table:
+                return result
+            if len(self._queries) >= MAX_QUERIES:
+                self._queries.pop(next(iter(self._queries)))
+            self._queries[key] = result
+        return result
+
+
+def _with_rates(totals, status):
+    decided = status["Approved"] + status["Rejected"]
+    result = pd.DataFrame({
+        "Jumlah": totals["Jumlah"].astype(int),
+        "Approved": status["Approved"].astype(int),
+        "Rejected": status["Rejected"].astype(int),
+        "Pending": status["Pending"].astype(int),
+        "Approval Rate (%)": (100 * status["Approved"] / decided.where(decided > 0)).round(1),
+        "Downtime (jam)": (totals["Downtime (menit)"] / 60).round(1),
+        "Rata-rata Downtime (menit)": (
+            totals["Downtime (menit)"] / totals["Downtime Tercatat"].where(totals["Downtime Tercatat"] > 0)
+        ).round(1),
+        "Quantity": totals["Quantity"].astype(int),
+    }, index=totals.index)
+    return result
+
+
+_cubes = {}
+_cubes_lock = threading.Lock()
+
+
+def get_cube(backend):
+    # satu kubus per backend untuk semua sesi; diperbarui dari snapshot ALL terbaru
+    key, table = backend.get_all_table()
+    with _cubes_lock:
+        cube = _cubes.setdefault(backend.name, KpiCube())
+    cube.update(key, loader.snapshot_frame(key, table))
+    return cube
@@ -0,0 +1,180 @@
+import threading
+from operator import itemgetter
+
+import numpy as np
+import pandas as pd
+
+import api_client
+
+CATEGORY = "category"
+INTEGER = "integer"
+DATE = "date"
+DATETIME = "datetime"
+
+# tipe kolom (berlaku untuk sheet SPK dan ALL); kolom lain tetap teks
+COLUMN_TYPES = {
+    "ID": INTEGER,
+    "Quantity": INTEGER,
+    "BU": CATEGORY,
+    "Line": CATEGORY,
+    "Produk": CATEGORY,
+    "Mesin": CATEGORY,
+    "PIC": CATEGORY,
+    "Kondisi": CATEGORY,
+    "Approve": CATEGORY,
+    "Tanggal Pengerjaan": DATE,
+    "Tanggal": DATE,
+    "Last Update": DATETIME,
+    "Last Update SPV": DATETIME,
+    "Last Update SM": DATETIME,
+}
+
+# format tanggal dari Apps Script, dicoba berurutan (format pertama adalah yang paling umum)
+DATE_FORMATS = ("%d-%b-%y", "%Y-%m-%d", "%d/%m/%Y")
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# kolom baris get_data (list) yang dipakai halaman Update SPK
+SPK_ROW_COLUMNS = [
+    "ID", "BU", "Line", "Produk", "Nomor Mesin", "Mesin", "Masalah", "Tindakan", "Tanggal", "PIC", "Last Update"
+]
+
+
+def _object_array(values):
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    return array
+
+
+def parse_dates(values, formats=DATE_FORMATS):
+    # parsing vektor dengan format eksplisit; sisa yang gagal dicoba dengan format berikutnya
+    text = pd.Series(values)
+    result = pd.to_datetime(text, format=formats[0], errors="coerce")
+    for fmt in formats[1:]:
+        missing = result.isna() & text.astype(bool)
+        if not missing.any():
+            break
+        result[missing] = pd.to_datetime(text[missing], format=fmt, errors="coerce")
+    return result
+
+
+def _convert(values, column_type):
+    values = _object_array(values)
+    if column_type == CATEGORY:
+        return pd.Categorical(values)
+    if column_type == INTEGER:
+        numbers = pd.to_numeric(values, errors="coerce")
+        return pd.Series(numbers).where(numbers % 1 == 0).astype("Int64")
+    if column_type == DATE:
+        return parse_dates(values)
+    if column_type == DATETIME:
+        return pd.to_datetime(values, format=DATETIME_FORMAT, errors="coerce")
+    return values
+
+
+def load_frame(rows, columns):
+    # rows: list of dict (get_all_data, get_data halaman login) atau list of list (get_data SPK)
+    is_dict = bool(rows) and isinstance(rows[0], dict)
+    if is_dict:
+        columns = [col for col in columns if col in rows[0]]
+
+    values = {col: () for col in columns}
+    if columns and rows:
+        # transpose baris -> kolom sekaligus dengan itemgetter (lebih cepat dari satu list per kolom)
+        keys = columns if is_dict else range(len(columns))
+        getter = itemgetter(*keys) if len(columns) > 1 else (lambda row: (row[keys[0]],))
+        try:
+            values = dict(zip(columns, zip(*map(getter, rows))))
+        except (KeyError, IndexError):
+            # ada baris yang tidak lengkap: kolom yang hilang diisi ""
+            if is_dict:
+                getter = lambda row: tuple(row.get(col, "") for col in columns)
+            else:
+                getter = lambda row: tuple(row[:len(columns)]) + ("",) * (len(columns) - len(row))
+            values = dict(zip(columns, zip(*map(getter, rows))))
+
+    return pd.DataFrame({col: _convert(values[col], COLUMN_TYPES.get(col)) for col in columns})
+
+
+def load_columns(payload):
+    # format kolom (get_all_columns/get_data_columns): setiap array langsung dikonversi, tanpa transpose baris
+    return pd.DataFrame({
+        name: _convert(values, COLUMN_TYPES.get(name)) for name, values in zip(payload["headers"], payload["columns"])
+    })
+
+
+def load_table(table):
+    # tabel Arrow (snapshot) -> DataFrame bertipe
+    return pd.DataFrame({
+        name: _convert(table.column(name).to_numpy(zero_copy_only=False), COLUMN_TYPES.get(name))
+        for name in table.column_names
+    })
+
+
+def _load_snapshot(table):
+    # kolom yang tidak bisa dikonversi dilaporkan seperti error backend lain
+    try:
+        return load_table(table)
+    except (KeyError, TypeError, ValueError) as e:
+        raise api_client.BackendError(f"Data snapshot tidak valid: {e}") from e
+
+
+_frames = {}
+_frame_locks = {}
+_frames_lock = threading.Lock()
+
+
+def snapshot_frame(key, table, columns=None):
+    # satu DataFrame per versi snapshot untuk semua sesi di proses ini; hasil dipakai bersama, jangan diubah
+    if key is None:
+        df = _load_snapshot(table)
+    else:
+        with _frames_lock:
+            lock = _frame_locks.setdefault(key[0], threading.Lock())
+        # sesi lain yang meminta versi yang sama menunggu konversi ini, bukan mengonversi ulang
+        with lock:
+            entry = _frames.get(key[0])
+            if entry is not None and entry[0] == key[1]:
+                df = entry[1]
+            else:
+                df = _load_snapshot(table)
+                _frames[key[0]] = (key[1], df)
+    return df if columns is None else df[[col for col in columns if col in df.columns]]
+
+
+def all_frame(backend, columns=None):
+    # sheet ALL lengkap dari snapshot (backend.get_all_table)
+    return snapshot_frame(*backend.get_all_table(), columns)
+
+
+def spk_frame(backend, columns=None):
+    # sheet SPK lengkap dari snapshot (backend.get_data_table)
+    return snapshot_frame(*backend.get_data_table(), columns)
+
+
+def row_hashes(df, columns):
+    # hash isi kolom per ID untuk mendeteksi baris yang berubah antar versi data.
+    # baris tanpa ID dilewati, ID ganda memakai baris terakhir; hasil: (frame per ID, hash per ID)
+    frame = df.dropna(subset=["ID"]).drop_duplicates("ID", keep="last").set_index("ID").reindex(columns=columns)
+    return frame, pd.util.hash_pandas_object(frame, index=False)
+
+
+def changed_rows(old, new):
+    # dua hasil row_hashes -> (ID yang isinya berubah, ID baru, ID yang hilang)
+    common = new.index.intersection(old.index)
+    modified = common[new.loc[common].to_numpy() != old.loc[common].to_numpy()]
+    return modified, new.index.difference(old.index), old.index.difference(new.index)
+
+
+def load_all(rows):
+    # data Preventive (sheet ALL)
+    return load_frame(rows, api_client.ALL_COLUMNS)
+
+
+def load_spk(rows):
+    # data SPK dalam bentuk dict (apps_script_login)
+    return load_frame(rows, api_client.SPK_COLUMNS)
+
+
+def load_spk_rows(rows):
+    # data SPK dalam bentuk baris (apps_script_add-update_spk)
+    return load_frame(rows, SPK_ROW_COLUMNS)
@@ -1,9 +1,15 @@
 import streamlit as st
-import requests
-import pandas as pd
+import functools
+import importlib
+from datetime import date
+import api_client
+import loader
+import profiling
+import search_index
 
 # Konfigurasi halaman utama
 st.set_page_config(page_title="Login", page_icon="🔐", layout="wide")
+profiling.start_rerun()
 
 # Dummy database (bisa diganti dengan database nyata)
 USER = {
@@ -35,6 +41,7 @@ with st.sidebar:
         if st.button("🔓 Logout", use_container_width=True):
             st.session_state.logged_in = False
             st.session_state.role = None
+            st.session_state.pop("username", None)
             st.rerun()
 
 # Header dengan tampilan lebih profesional
@@ -87,89 +94,120 @@ if not st.session_state.logged_in:
             unsafe_allow_html=True
         )
 
-# URL dari Apps Script Web App
-API_URL = "https://script.google.com/macros/s/AKfycbxvwyWXOiVC812g2ZO-Uzr6HtYujXnx7nu75YW26KVH1kCHWUUvh_uXSA65Hc4W-zknpQ/exec"
-
-# Pilihan sheet yang bisa ditampilkan
-option = st.selectbox("📂 Pilih Data yang Ingin Dilihat:", ["Data Preventive", "Data SPK"])
-
-# Ambil data sesuai pilihan
-if option == "Data Preventive":
-    response = requests.get(f"{API_URL}?action=get_all_data")
-    expected_columns = [
-        "ID", "BU", "Line", "Produk", "Nomor Mesin", "Mesin", "Tanggal Pengerjaan",
-        "Mulai", "Selesai", "Masalah", "Tindakan Perbaikan", "Deskripsi",
-        "Quantity", "PIC", "Kondisi", "Alasan", "SPV", "Last Update SPV", 
-        "Approve", "Reason", "SM", "Last Update SM"
-    ]
-elif option == "Data SPK":
-    response = requests.get(f"{API_URL}?action=get_data")
-    expected_columns = [
-        "ID", "BU", "Line", "Produk", "Nomor Mesin", "Mesin",
-        "Masalah", "Tindakan Perbaikan", "Tanggal Pengerjaan", "PIC", "Last Update"
-    ]
-
-# Cek apakah API berhasil mendapatkan data
-if response.status_code == 200:
-    all_data = response.json()
-    
-    if isinstance(all_data, list) and len(all_data) > 0:
-        df = pd.DataFrame(all_data)
-        df = df[[col for col in expected_columns if col in df.columns]]
+# sumber data (Apps Script Web App atau SQLite lokal)
+backend = api_client.get_backend("login")
+
+def reset_filter():
+    # filter dan halaman sheet sebelumnya tidak berlaku untuk sheet lain
+    for key in ("filter_pic", "filter_dates", "filter_bounds", "page_number", "search_query"):
+        st.session_state.pop(key, None)
+
+def reset_page():
+    st.session_state.pop("page_number", None)
+
+# Tabel data sebagai fragment: ganti sheet, filter dan pagination hanya menjalankan ulang bagian ini
+# (fragment tidak bisa menulis ke sidebar, jadi filter ditampilkan di atas tabel)
+@st.fragment
+@profiling.fragment("data_browser")
+def data_browser():
+    # Pilihan sheet yang bisa ditampilkan
+    option = st.selectbox("📂 Pilih Data yang Ingin Dilihat:", ["Data Preventive", "Data SPK"], on_change=reset_filter)
+
+    # Ambil data sesuai pilihan
+    if option == "Data Preventive":
+        sheet = "ALL"
+        fetch_page = backend.get_all_data_page
+        load_page = loader.load_all  # kolom & tipe sesuai sheet ALL
+    elif option == "Data SPK":
+        sheet = "SPK"
+        fetch_page = backend.get_data_page
+        load_page = loader.load_spk  # kolom & tipe sesuai sheet SPK
+
+    # pencarian teks memakai inverted index lokal (search_index.py) atas snapshot sheet;
+    # tanpa kata kunci, filter dan pagination tetap dikerjakan Apps Script
+    query = st.session_state.get("search_query", "").strip()
+    if query:
+        fetch_page = functools.partial(search_index.search_page, backend, sheet, query)
+        load_page = lambda rows: rows  # sudah DataFrame bertipe, diurutkan berdasarkan relevansi
+
+    # === Filter & Pagination di server ===
+    # Apps Script hanya mengirim satu halaman + total; nilai filter diambil dari widget rerun sebelumnya
+    items_per_page = 10
+    selected_pic = st.session_state.get("filter_pic", [])
+    date_range = tuple(st.session_state.get("filter_dates", ()))
+    page_number = st.session_state.get("page_number", 1)
+
+    # rentang tanggal penuh (nilai awal widget) berarti tidak ada filter tanggal
+    if len(date_range) == 2 and date_range != st.session_state.get("filter_bounds"):
+        start_date, end_date = (d.isoformat() for d in date_range)
+    else:
+        start_date, end_date = None, None
+
+    def fetch(page):
+        return fetch_page(pics=selected_pic, start=start_date, end=end_date, page=page, page_size=items_per_page)
+
+    try:
+        result = fetch(page_number)
+        if isinstance(result, dict) and "rows" in result:
+            total_pages = max(1, -(-result["total"] // items_per_page))
+            if page_number > total_pages:
+                # halaman lama melebihi jumlah halaman setelah data/filter berubah
+                page_number = total_pages
+                result = fetch(page_number)
+    except api_client.BackendError as e:
+        st.error(f"Gagal mengambil data dari API: {e}")
+        return
+
+    # Cek apakah API berhasil mendapatkan data
+    if not (isinstance(result, dict) and "rows" in result):
+        st.warning("Data tidak tersedia atau kosong dari API.")
+        return
+
+    # === Filter (opsi dihitung server dari seluruh data) ===
+    st.markdown("**Filter Data (Opsional)**")
+    st.text_input(
+        "🔎 Cari di Masalah, Tindakan Perbaikan, Deskripsi, Alasan", key="search_query", on_change=reset_page
+    )
+    col_pic, col_date, col_page = st.columns([2, 2, 1])
+    with col_pic:
+        st.multiselect("Pilih PIC", result["pic_options"], key="filter_pic", on_change=reset_page)
+
+    if result["min_date"] and result["max_date"]:
+        min_date, max_date = date.fromisoformat(result["min_date"]), date.fromisoformat(result["max_date"])
+        st.session_state.filter_bounds = (min_date, max_date)
+        with col_date:
+            st.date_input(
+                "Pilih Rentang Tanggal", [min_date, max_date], min_value=min_date, max_value=max_date,
+                key="filter_dates", on_change=reset_page
+            )
+
+    # === Pagination ===
+    st.session_state.page_number = page_number
+    with col_page:
+        st.number_input("Pilih Halaman", min_value=1, max_value=total_pages, step=1, key="page_number")
+
+    with profiling.span("frame:load_page", rows=len(result["rows"])):
+        df = load_page(result["rows"])
 
         # Pastikan nama kolom tanggal sesuai
         if "Tanggal Pengerjaan" in df.columns:
-            df["Tanggal Pengerjaan"] = pd.to_datetime(df["Tanggal Pengerjaan"], errors='coerce').dt.date
+            df["Tanggal Pengerjaan"] = df["Tanggal Pengerjaan"].dt.date
             df = df.rename(columns={"Tanggal Pengerjaan": "Tanggal"})
         else:
             st.error("Kolom 'Tanggal Pengerjaan' tidak ditemukan dalam data API!")
 
-        # === Fungsi untuk Filter ===
-        def filter_data(df):
-            st.sidebar.header("Filter Data (Opsional)")
-            
-            # Filter berdasarkan PIC
-            pic_options = df["PIC"].dropna().unique().tolist()
-            selected_pic = st.sidebar.multiselect("Pilih PIC", pic_options)
-            
-            # Filter berdasarkan rentang tanggal
-            min_date, max_date = df["Tanggal"].min(), df["Tanggal"].max()
-            date_range = st.sidebar.date_input("Pilih Rentang Tanggal", [min_date, max_date], min_value=min_date, max_value=max_date)
-            
-            # Terapkan filter
-            df_filtered = df.copy()
-            if selected_pic:
-                df_filtered = df_filtered[df_filtered["PIC"].isin(selected_pic)]
-            if len(date_range) == 2:
-                start_date, end_date = date_range
-                df_filtered = df_filtered[(df_filtered["Tanggal"] >= start_date) & (df_filtered["Tanggal"] <= end_date)]
-            
-            return df_filtered
-        
-        df_filtered = filter_data(df)
-
-        # === Pagination ===
-        items_per_page = 10
-        total_pages = max(1, -(-len(df_filtered) // items_per_page))
-        page_number = st.sidebar.number_input("Pilih Halaman", min_value=1, max_value=total_pages, value=1, step=1)
-        
-        start_idx = (page_number - 1) * items_per_page
-        end_idx = start_idx + items_per_page
-        df_paginated = df_filtered.iloc[start_idx:end_idx]
-        
-        # === Tampilkan Data ===
-        st.subheader(f"{option} (Menampilkan Halaman {page_number} dari {total_pages})")
-        st.dataframe(df_paginated, use_container_width=True)
-        st.caption(f"Menampilkan {len(df_paginated)} dari {len(df_filtered)} data yang tersedia.")
-    
-    else:
-        st.warning("Data tidak tersedia atau kosong dari API.")
-else:
-    st.error(f"Gagal mengambil data dari API. Status code: {response.status_code}")
-    
+    # === Tampilkan Data ===
+    st.subheader(f"{option} (Menampilkan Halaman {page_number} dari {total_pages})")
+    with profiling.span("render:dataframe"):
+        st.dataframe(df, use_container_width=True)
+    st.caption(f"Menampilkan {len(df)} dari {result['total']} data yang tersedia.")
 
-# Form login jika role sudah dipilih
-if st.session_state.role and not st.session_state.logged_in:
+data_browser()
+
+# Form login sebagai fragment: login gagal tidak menjalankan ulang seluruh halaman
+@st.fragment
+@profiling.fragment("login_form")
+def login_form():
     st.markdown(
         f"""
         <div style="background-color: #D5DBDB; padding: 15px; border-radius: 8px; text-align: center; margin-top: 20px;">
@@ -188,27 +226,48 @@ if st.session_state.role and not st.session_state.logged_in:
         creds = USER.get(st.session_state.role, {})
         if username == creds.get("username") and password == creds.get("password"):
             st.session_state.logged_in = True
+            st.session_state.username = username  # dicatat di kolom SPV/SM saat approval
             st.success("✅ Login berhasil! Redirecting...")
-            st.rerun()
+            st.rerun()  # seluruh halaman (header, sidebar, halaman role); tabel data diambil dari cache
         else:
             st.error("❌ Username atau password salah!")
 
+# Form login jika role sudah dipilih
+if st.session_state.role and not st.session_state.logged_in:
+    login_form()
+
+# Halaman per role -> modul; modul baru diimpor saat halamannya dibuka
+ROLE_PAGES = {
+    "SPV": {
+        "Tambah SPK": "add_spk_spv", "Update SPK": "update_spk_spv", "Approval Preventive Form": "approval",
+        "Dashboard KPI": "dashboard",
+    },
+    "SM": {"Approval Preventive Form": "approval", "Dashboard KPI": "dashboard"},
+}
+
+# Halaman role sebagai fragment: interaksi form di dalamnya tidak menjalankan ulang tabel data
+@st.fragment
+@profiling.fragment("role_page")
+def role_page(module_name):
+    try:
+        module = importlib.import_module(module_name)
+    except ModuleNotFoundError as e:
+        if e.name != module_name:
+            raise
+        st.error(f"Halaman belum tersedia (modul {module_name} tidak ditemukan).")
+        return
+    module.run()
+
 # Navigasi halaman setelah login
 if st.session_state.logged_in:
-    
-    if st.session_state.role == "SPV":
-        page = st.sidebar.selectbox("📌 Pilih Halaman:", ["Tambah SPK", "Update SPK", "Approval Preventive Form"], index=0)
-
-        if page == "Tambah SPK":
-            import add_spk_spv
-            add_spk_spv.run()
-        elif page == "Update SPK":
-            import update_spk_spv
-            update_spk_spv.run()
-        elif page == "Approval Preventive Form":
-            import try_SPV
-            try_SPV.run()
-
-    elif st.session_state.role == "SM":
-        import try_SM
-        try_SM.run()
+    pages = ROLE_PAGES.get(st.session_state.role, {})
+    if len(pages) > 1:
+        page = st.sidebar.selectbox("📌 Pilih Halaman:", list(pages), index=0)
+    else:
+        page = next(iter(pages), None)
+
+    if page:
+        role_page(pages[page])
+
+# rincian waktu rerun ini (opsional, lewat toggle di sidebar)
+profiling.panel()
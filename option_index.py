@@ -0,0 +1,65 @@
+import hashlib
+import json
+import threading
+
+# sheet referensi yang kolom pertamanya BU
+BU_SHEETS = ["Produk", "Line", "Mesin", "PIC"]
+
+# jumlah payload get_options berbeda (per deployment) yang diingat berdasarkan identitas objek
+MAX_PAYLOADS = 8
+
+
+def options_version(options):
+    # hash isi get_options; index hanya dibangun ulang jika sheet referensi berubah
+    payload = json.dumps(options, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(payload).hexdigest()
+
+
+class OptionIndex:
+    # index dropdown bertingkat: BU -> {Produk, Line, Mesin, PIC} dan Mesin -> Masalah
+    def __init__(self, options, version):
+        self.version = version
+        self.bu = [item[0] for item in options.get("BU", []) if isinstance(item, list) and item]
+        self.by_bu = {}
+        self.masalah_by_mesin = {}
+
+        for sheet in BU_SHEETS:
+            for item in options.get(sheet, []):
+                if isinstance(item, list) and len(item) > 1:
+                    self.by_bu.setdefault(item[0], {}).setdefault(sheet, []).append(item[1])
+
+        for item in options.get("Masalah", []):
+            if isinstance(item, list) and len(item) > 1:
+                self.masalah_by_mesin.setdefault(item[0], []).append(item[1])
+
+    # list yang dikembalikan dipakai bersama, jangan diubah langsung
+    def for_bu(self, bu, sheet):
+        return self.by_bu.get(bu, {}).get(sheet, [])
+
+    def masalah(self, mesin):
+        return self.masalah_by_mesin.get(mesin, [])
+
+
+_lock = threading.Lock()
+_by_payload = {}
+_by_version = {}
+
+
+def get_index(options):
+    # payload yang sama (objek dari read_cache) langsung memakai index yang sudah ada tanpa hashing
+    with _lock:
+        entry = _by_payload.get(id(options))
+        if entry is not None and entry[0] is options:
+            return entry[1]
+
+    version = options_version(options)
+    with _lock:
+        index = _by_version.get(version)
+        if index is None:
+            index = OptionIndex(options, version)
+            _by_version.clear()  # versi lama tidak dipakai lagi
+            _by_version[version] = index
+        if len(_by_payload) >= MAX_PAYLOADS:
+            _by_payload.pop(next(iter(_by_payload)))
+        _by_payload[id(options)] = (options, index)
+        return index
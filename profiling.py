@@ -0,0 +1,200 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+# batas bucket histogram durasi (detik)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+# SPK_METRICS_FILE=metrics.prom (format Prometheus) atau metrics.jsonl (JSON lines);
+# file ditulis ulang paling sering setiap EXPORT_INTERVAL detik
+EXPORT_INTERVAL = 10
+
+
+class Histogram:
+    def __init__(self):
+        self.buckets = [0] * len(BUCKETS)
+        self.count = 0
+        self.sum = 0.0
+        self.bytes = 0
+
+    def observe(self, seconds, nbytes):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+        self.count += 1
+        self.sum += seconds
+        self.bytes += nbytes
+
+
+class Registry:
+    # histogram durasi per (span, status), dipakai bersama oleh semua sesi
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._last_export = 0.0
+
+    def observe(self, name, status, seconds, nbytes):
+        with self._lock:
+            histogram = self._histograms.get((name, status))
+            if histogram is None:
+                histogram = self._histograms[(name, status)] = Histogram()
+            histogram.observe(seconds, nbytes)
+
+    def snapshot(self):
+        with self._lock:
+            return [
+                {
+                    "span": name,
+                    "status": status,
+                    "count": h.count,
+                    "sum_seconds": h.sum,
+                    "bytes": h.bytes,
+                    "buckets": dict(zip(map(str, BUCKETS), h.buckets)),
+                }
+                for (name, status), h in sorted(self._histograms.items())
+            ]
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP spk_span_duration_seconds Durasi span (backend, HTTP, DataFrame, render).",
+            "# TYPE spk_span_duration_seconds histogram",
+        ]
+        byte_lines = [
+            "# HELP spk_span_bytes_total Byte respons yang diterima per span.",
+            "# TYPE spk_span_bytes_total counter",
+        ]
+        for item in self.snapshot():
+            labels = f'span="{item["span"]}",status="{item["status"]}"'
+            for bound, count in item["buckets"].items():
+                lines.append(f'spk_span_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'spk_span_duration_seconds_bucket{{{labels},le="+Inf"}} {item["count"]}')
+            lines.append(f"spk_span_duration_seconds_sum{{{labels}}} {item['sum_seconds']}")
+            lines.append(f"spk_span_duration_seconds_count{{{labels}}} {item['count']}")
+            byte_lines.append(f"spk_span_bytes_total{{{labels}}} {item['bytes']}")
+        return "\n".join(lines + byte_lines) + "\n"
+
+    def export(self, path):
+        if path.endswith(".jsonl"):
+            timestamp = time.time()
+            text = "".join(json.dumps({"timestamp": timestamp, **item}) + "\n" for item in self.snapshot())
+        else:
+            text = self.prometheus_text()
+        # tulis ke file sementara lalu ganti, agar scraper tidak membaca file setengah jadi
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(text)
+        os.replace(tmp_path, path)
+
+    def maybe_export(self):
+        path = os.environ.get("SPK_METRICS_FILE")
+        if not path:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_export < EXPORT_INTERVAL:
+                return
+            self._last_export = now
+        try:
+            self.export(path)
+        except OSError:
+            pass  # monitoring tidak boleh mengganggu halaman
+
+
+registry = Registry()
+
+# span milik rerun yang sedang berjalan; fetch_all menyalin context ini ke thread pool
+_rerun = contextvars.ContextVar("profiling_rerun", default=None)
+_depth = contextvars.ContextVar("profiling_depth", default=0)
+
+
+def start_rerun():
+    # dipanggil di awal script halaman
+    _rerun.set({"start": time.perf_counter(), "spans": []})
+
+
+@contextmanager
+def span(name, **attrs):
+    # catat durasi sebuah langkah; status/bytes bisa diisi lewat dict yang di-yield
+    record = {"name": name, "status": "ok", "bytes": None, "depth": _depth.get(), **attrs}
+    token = _depth.set(record["depth"] + 1)
+    start = record["start"] = time.perf_counter()
+    try:
+        yield record
+    except BaseException:
+        if record["status"] in ("ok", "miss", "hit"):
+            record["status"] = "error"
+        raise
+    finally:
+        record["seconds"] = time.perf_counter() - start
+        _depth.reset(token)
+        registry.observe(name, record["status"], record["seconds"], record["bytes"] or 0)
+        rerun = _rerun.get()
+        if rerun is not None:
+            rerun["spans"].append(record)
+        registry.maybe_export()
+
+
+def _fragment_run():
+    # True jika rerun ini hanya menjalankan fragment (bagian lain halaman tidak dijalankan ulang)
+    ctx = get_script_run_ctx()
+    return bool(ctx and ctx.fragment_ids_this_run)
+
+
+def fragment(name):
+    # dipasang di bawah @st.fragment: pada rerun fragment saja, span dicatat sebagai rerun tersendiri dan
+    # rinciannya ditampilkan di akhir fragment (fragment tidak bisa menulis ke sidebar)
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _fragment_run():
+                return fn(*args, **kwargs)
+            rerun = {"start": time.perf_counter(), "spans": []}
+            token = _rerun.set(rerun)
+            try:
+                result = fn(*args, **kwargs)
+                if st.session_state.get("profiling_enabled"):
+                    with st.expander(f"⏱️ Profiling fragment {name}"):
+                        _breakdown(st, rerun)
+                return result
+            finally:
+                _rerun.reset(token)
+        return wrapper
+    return decorate
+
+
+def _breakdown(container, rerun):
+    total = time.perf_counter() - rerun["start"]
+    spans = sorted(rerun["spans"], key=lambda s: s["start"])
+    tracked = sum(s["seconds"] for s in spans if s["depth"] == 0)
+    container.dataframe(
+        [
+            {
+                "Langkah": "↳ " * s["depth"] + s["name"],
+                "Status": s["status"],
+                "Bytes": s["bytes"],
+                "ms": round(s["seconds"] * 1000, 1),
+            }
+            for s in spans
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+    container.caption(f"Total rerun {total * 1000:.0f} ms, di luar span {(total - tracked) * 1000:.0f} ms.")
+
+
+def panel():
+    # panel opsional di sidebar: rincian waktu rerun penuh terakhir (dipanggil di akhir script);
+    # rerun fragment ditampilkan di dalam fragment masing-masing (lihat fragment())
+    if not st.sidebar.toggle("⏱️ Profiling", key="profiling_enabled"):
+        return
+    rerun = _rerun.get()
+    if rerun is None:
+        return
+    _breakdown(st.sidebar, rerun)
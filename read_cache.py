@@ -0,0 +1,67 @@
+import threading
+import time
+
+# TTL (detik) per dataset: sheet referensi jarang berubah, SPK/ALL sering berubah
+DATASET_TTLS = {
+    "OPTIONS": 600,
+    "SPK": 30,
+    "ALL": 30,
+}
+DEFAULT_TTL = 30
+
+
+class ReadCache:
+    # cache hasil baca per (backend, action, parameter), dipakai bersama oleh semua sesi.
+    # nilai yang dikembalikan adalah objek yang sama untuk semua pemanggil, jadi jangan diubah langsung
+    def __init__(self, ttls=None, clock=time.monotonic):
+        self.ttls = dict(DATASET_TTLS if ttls is None else ttls)
+        self.clock = clock
+        self._entries = {}
+        self._generations = {}  # dataset -> jumlah invalidate; kunci None untuk invalidate() semua dataset
+        self._lock = threading.Lock()
+        self._hits = {}
+        self._misses = {}
+
+    def get_or_load(self, key, dataset, loader):
+        now = self.clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > now:
+                self._hits[dataset] = self._hits.get(dataset, 0) + 1
+                return entry[2]
+            self._misses[dataset] = self._misses.get(dataset, 0) + 1
+            generation = self._generation(dataset)
+
+        value = loader()
+
+        # respons error dari Apps Script ({"error": ...}) tidak disimpan, begitu juga hasil yang dibaca
+        # sebelum invalidate() (penulisan selesai saat loader berjalan): pembaca berikutnya memuat ulang
+        if not (isinstance(value, dict) and "error" in value):
+            with self._lock:
+                if self._generation(dataset) == generation:
+                    self._entries[key] = (dataset, now + self.ttls.get(dataset, DEFAULT_TTL), value)
+        return value
+
+    def _generation(self, dataset):
+        return self._generations.get(None, 0), self._generations.get(dataset, 0)
+
+    def invalidate(self, *datasets):
+        with self._lock:
+            for dataset in datasets or (None,):
+                self._generations[dataset] = self._generations.get(dataset, 0) + 1
+            if not datasets:
+                self._entries.clear()
+                return
+            for key in [k for k, entry in self._entries.items() if entry[0] in datasets]:
+                del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            datasets = sorted(set(self._hits) | set(self._misses))
+            return {
+                name: {"hits": self._hits.get(name, 0), "misses": self._misses.get(name, 0)}
+                for name in datasets
+            }
+
+
+cache = ReadCache()
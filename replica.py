@@ -0,0 +1,100 @@
+import threading
+from datetime import datetime, timedelta
+
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# since untuk sinkronisasi penuh (semua baris dianggap berubah)
+FULL_SYNC_SINCE = "1970-01-01 00:00:00"
+
+# since dimundurkan sedikit agar penulisan yang berjalan bersamaan dengan sinkronisasi tidak terlewat;
+# baris yang terkirim dua kali cukup ditimpa berdasarkan ID
+SYNC_OVERLAP = timedelta(minutes=2)
+
+
+def row_id(row):
+    value = row.get("ID") if isinstance(row, dict) else (row[0] if row else None)
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SheetReplica:
+    # salinan lokal satu sheet (SPK atau ALL) yang diperbarui secara delta berdasarkan "Last Update".
+    # fetch(since=..., since_id=...) harus memanggil action get_data/get_all_data dalam mode delta
+    def __init__(self, fetch):
+        self.fetch = fetch
+        self._lock = threading.Lock()
+        self.full_syncs = 0
+        self.delta_syncs = 0
+        self._reset()
+
+    def _reset(self):
+        self._rows = {}
+        self._headers = None
+        self._since = None
+
+    def reset(self):
+        # paksa sinkronisasi penuh pada pemanggilan sync() berikutnya
+        with self._lock:
+            self._reset()
+
+    def _pull(self):
+        full = self._since is None
+        if full:
+            payload = self.fetch(since=FULL_SYNC_SINCE, since_id=0)
+        else:
+            payload = self.fetch(since=self._since, since_id=max(self._rows, default=0))
+        if not isinstance(payload, dict) or "rows" not in payload:
+            return payload, full
+        if not full and payload.get("headers") != self._headers:
+            # skema sheet berubah: buang replika dan ambil ulang semuanya
+            self._reset()
+            return self._pull()
+        return payload, full
+
+    def sync(self):
+        return self._sync()[1]
+
+    def sync_columnar(self):
+        # isi replika dalam format kolom (sama dengan get_data_columns/get_all_columns) atau None jika
+        # backend tidak mendukung mode delta
+        headers, rows = self._sync()
+        if headers is None or not isinstance(rows, list):
+            return None
+        if rows and isinstance(rows[0], dict):
+            columns = [[row.get(name, "") for row in rows] for name in headers]
+        else:
+            columns = [[row[i] if i < len(row) else "" for row in rows] for i in range(len(headers))]
+        return {"format": "columnar", "headers": headers, "columns": columns, "row_count": len(rows)}
+
+    def _sync(self):
+        # hasil: (headers, baris replika urut ID); headers None jika respons bukan mode delta
+        with self._lock:
+            payload, full = self._pull()
+
+            # backend lama tanpa mode delta (atau respons error): kembalikan apa adanya
+            if not isinstance(payload, dict) or "rows" not in payload:
+                return None, payload
+
+            if full:
+                self.full_syncs += 1
+            else:
+                self.delta_syncs += 1
+
+            for row in payload["rows"]:
+                key = row_id(row)
+                if key is not None:
+                    self._rows[key] = row
+
+            # get_data mengirim daftar ID yang masih ada, baris lain dihapus dari replika
+            if "ids" in payload:
+                keep = {int(i) for i in payload["ids"] if str(i).strip().lstrip("-").isdigit()}
+                for key in [k for k in self._rows if k not in keep]:
+                    del self._rows[key]
+
+            self._headers = payload.get("headers")
+            server_time = datetime.strptime(payload["server_time"], TIMESTAMP_FORMAT)
+            self._since = (server_time - SYNC_OVERLAP).strftime(TIMESTAMP_FORMAT)
+
+            return self._headers, [self._rows[key] for key in sorted(self._rows)]
@@ -0,0 +1,247 @@
+import math
+import re
+import threading
+from bisect import bisect_left
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+import loader
+import profiling
+
+# kolom teks bebas yang diindeks (yang tidak ada di sheet dilewati)
+SEARCH_COLUMNS = ["Masalah", "Tindakan Perbaikan", "Deskripsi", "Alasan"]
+
+TOKEN = re.compile(r"\w+")
+
+# parameter BM25
+K1 = 1.2
+B = 0.75
+
+# kata terakhir query dicocokkan sebagai awalan (mis. "bear" -> "bearing") jika minimal sepanjang ini
+MIN_PREFIX = 2
+MAX_EXPANSIONS = 50
+
+
+def tokenize(text):
+    return TOKEN.findall(str(text).lower())
+
+
+def _id_positions(df):
+    # posisi baris per ID di df (ID ganda: baris terakhir)
+    ids = df["ID"]
+    positions = pd.Series(np.arange(len(df)), index=ids)[ids.notna().to_numpy()]
+    return positions[~positions.index.duplicated(keep="last")]
+
+
+def _column_tokens(values):
+    # token per baris; tokenisasi hanya sekali per nilai unik (Masalah/Tindakan banyak berulang)
+    codes, uniques = pd.factorize(values)
+    tokens = [tokenize(value) if value != "" else [] for value in uniques]
+    return [tokens[code] if code >= 0 else [] for code in codes]
+
+
+class SearchIndex:
+    # inverted index (token -> {slot dokumen: frekuensi}) atas kolom teks satu sheet per versi data.
+    # Versi baru dibandingkan per ID (loader.row_hashes); hanya dokumen yang baru/berubah/hilang yang diindeks ulang.
+    # Skor BM25 dihitung dengan numpy atas array posting (dibuat sekali per token sampai token itu berubah)
+    def __init__(self):
+        self.version = None
+        self.full_builds = 0
+        self.incremental_updates = 0
+        self.last_changed = 0
+        self._lock = threading.Lock()
+        self._hashes = None
+        self._postings = {}
+        self._arrays = {}
+        self._doc_terms = {}
+        self._slots = {}
+        self._ids = np.empty(0, dtype=np.int64)
+        self._lengths = np.empty(0)
+        self._size = 0
+        self._count = 0
+        self._total_length = 0
+        self._vocabulary = None
+        self._positions = pd.Series(dtype="int64")
+
+    def _add(self, frame):
+        doc_ids = frame.index.tolist()
+        if self._size + len(doc_ids) > len(self._ids):
+            capacity = max(1024, 2 * (self._size + len(doc_ids)))
+            self._ids = np.resize(self._ids, capacity)
+            self._lengths = np.concatenate([self._lengths, np.zeros(capacity - len(self._lengths))])
+
+        columns = [_column_tokens(frame[col]) for col in frame.columns]
+        for doc_id, *tokens in zip(doc_ids, *columns):
+            # dokumen yang berubah mendapat slot baru; slot lama sudah tidak punya posting
+            slot = self._slots[doc_id] = self._size
+            self._size += 1
+            terms = Counter(token for column in tokens for token in column)
+            self._doc_terms[doc_id] = terms
+            self._ids[slot] = doc_id
+            self._lengths[slot] = sum(terms.values())
+            self._total_length += self._lengths[slot]
+            for term, tf in terms.items():
+                self._postings.setdefault(term, {})[slot] = tf
+                self._arrays.pop(term, None)
+        self._count += len(doc_ids)
+
+    def _remove(self, doc_ids):
+        for doc_id in doc_ids:
+            slot = self._slots.pop(doc_id)
+            self._total_length -= self._lengths[slot]
+            self._count -= 1
+            for term in self._doc_terms.pop(doc_id):
+                postings = self._postings[term]
+                del postings[slot]
+                self._arrays.pop(term, None)
+                if not postings:
+                    del self._postings[term]
+
+    def _array(self, term):
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            postings = self._postings[term]
+            arrays = self._arrays[term] = (
+                np.fromiter(postings.keys(), dtype=np.int64, count=len(postings)),
+                np.fromiter(postings.values(), dtype=float, count=len(postings)),
+            )
+        return arrays
+
+    def update(self, version, df):
+        # version None (snapshot mati): selalu dibandingkan dengan hash, tetap tanpa indeks ulang penuh
+        with self._lock:
+            if version is not None and version == self.version:
+                return
+            columns = [col for col in SEARCH_COLUMNS if col in df.columns]
+            frame, hashes = loader.row_hashes(df, columns)
+            frame = frame.astype(object).where(frame.notna(), "")
+
+            if self._hashes is None:
+                with profiling.span("search:full", rows=len(frame)):
+                    self._add(frame)
+                self.full_builds += 1
+                self.last_changed = len(frame)
+            else:
+                modified, added, removed = loader.changed_rows(self._hashes, hashes)
+                self.last_changed = len(modified) + len(added) + len(removed)
+                if self.last_changed:
+                    with profiling.span("search:incremental", rows=self.last_changed):
+                        self._remove(modified.append(removed).tolist())
+                        self._add(frame.loc[modified.append(added)])
+                    self.incremental_updates += 1
+
+            if self.last_changed:
+                self._vocabulary = None
+            self._hashes = hashes
+            # posisi baris per ID di frame versi ini (untuk mengambil baris hasil pencarian)
+            self._positions = _id_positions(df)
+            self.version = version
+
+    def _expand(self, term):
+        # kata terakhir: kata itu sendiri + kata di indeks yang diawali kata itu
+        if len(term) < MIN_PREFIX:
+            return [term]
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        start = bisect_left(self._vocabulary, term)
+        expansions = []
+        for word in self._vocabulary[start:start + MAX_EXPANSIONS]:
+            if not word.startswith(term):
+                break
+            expansions.append(word)
+        return expansions or [term]
+
+    def search(self, query, candidates=None):
+        # hasil: (array ID, array skor BM25) terurut dari yang paling relevan; semua kata query harus ada (AND).
+        # candidates: array ID yang lolos filter lain (PIC/tanggal), None = semua
+        terms = tokenize(query)
+        empty = np.empty(0, dtype=np.int64), np.empty(0)
+        if not terms or not self._count:
+            return empty
+
+        with self._lock, profiling.span("search:query", terms=len(terms)):
+            size = self._size
+            average = self._total_length / self._count
+            norm = K1 * (1 - B + B * self._lengths[:size] / average)
+            scores = np.zeros(size)
+            matched = np.ones(size, dtype=bool) if candidates is None else np.isin(self._ids[:size], candidates)
+
+            groups = [[term] for term in dict.fromkeys(terms[:-1])] + [self._expand(terms[-1])]
+            for group in groups:
+                in_group = np.zeros(size, dtype=bool)
+                for term in group:
+                    if term not in self._postings:
+                        continue
+                    slots, tfs = self._array(term)
+                    idf = math.log(1 + (self._count - len(slots) + 0.5) / (len(slots) + 0.5))
+                    scores[slots] += idf * tfs * (K1 + 1) / (tfs + norm[slots])
+                    in_group[slots] = True
+                matched &= in_group
+
+            hits = np.flatnonzero(matched)
+            ids, hit_scores = self._ids[hits], scores[hits]
+
+        order = np.lexsort((ids, -hit_scores))
+        return ids[order], hit_scores[order]
+
+    def rows(self, df, version, doc_ids):
+        # baris df untuk ID hasil search, sesuai urutan. Jika index sudah diperbarui sesi lain ke versi yang lebih
+        # baru, posisi dihitung dari df milik pemanggil; ID yang tidak ada di df itu dilewati.
+        # hasil: (DataFrame, mask ID yang ditemukan)
+        with self._lock:
+            positions = self._positions if version is not None and version == self.version else None
+        if positions is None:
+            positions = _id_positions(df)
+        found = positions.reindex(list(doc_ids))
+        mask = found.notna().to_numpy()
+        return df.iloc[found[mask].to_numpy(dtype=np.int64)], mask
+
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(backend, sheet):
+    # satu index per backend dan sheet ("ALL"/"SPK") untuk semua sesi; hasil: (index, versi, DataFrame versi itu)
+    key, table = backend.get_all_table() if sheet == "ALL" else backend.get_data_table()
+    df = loader.snapshot_frame(key, table)
+    with _indexes_lock:
+        index = _indexes.setdefault((backend.name, sheet), SearchIndex())
+    index.update(key, df)
+    return index, key, df
+
+
+def search_page(backend, sheet, query, pics=(), start=None, end=None, page=1, page_size=10):
+    # bentuk hasil sama dengan mode query get_all_data/get_data, tetapi "rows" sudah berupa DataFrame
+    # bertipe (plus kolom "Skor") yang diurutkan berdasarkan relevansi
+    index, version, df = get_index(backend, sheet)
+
+    pic = df["PIC"].astype(object)
+    tanggal = df["Tanggal Pengerjaan"]
+    mask = np.ones(len(df), dtype=bool)
+    if pics:
+        mask &= pic.isin(list(pics)).to_numpy()
+    if start:
+        mask &= (tanggal >= pd.Timestamp(start)).to_numpy()
+    if end:
+        mask &= (tanggal <= pd.Timestamp(end)).to_numpy()
+    candidates = None if mask.all() else df["ID"][mask].dropna().to_numpy(dtype=np.int64)
+
+    ids, scores = index.search(query, candidates)
+    offset = (page - 1) * page_size
+    rows, found = index.rows(df, version, ids[offset:offset + page_size])
+    rows = rows.reset_index(drop=True)
+    rows.insert(0, "Skor", scores[offset:offset + page_size][found].round(2))
+
+    dates = tanggal.dropna()
+    return {
+        "rows": rows,
+        "total": len(ids),
+        "page": page,
+        "page_size": page_size,
+        "pic_options": [p for p in pd.unique(pic.dropna()) if p != ""],
+        "min_date": dates.min().date().isoformat() if len(dates) else "",
+        "max_date": dates.max().date().isoformat() if len(dates) else "",
+    }
@@ -0,0 +1,224 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import pyarrow as pa
+
+import read_cache
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-flight hanya antar-thread dalam satu proses
+    fcntl = None
+
+# kegagalan baca/tulis file snapshot atau payload kolom yang rusak (dibungkus BackendError oleh api_client)
+SNAPSHOT_ERRORS = (OSError, KeyError, TypeError, ValueError, pa.ArrowException)
+
+# jumlah file snapshot lama yang tetap disimpan (mungkin masih dibaca proses lain lewat memory map)
+KEEP_VERSIONS = 2
+
+# fetch diulang jika snapshot diinvalidasi (penulisan berhasil) selama fetch berjalan
+MAX_REFETCH = 3
+
+
+def options_to_table(options):
+    # {"BU": [["BU1"], ...], "Line": [["BU1", "Line 1"], ...]} -> tabel (sheet, key, value)
+    sheets, keys, values = [], [], []
+    for sheet, items in options.items():
+        for item in items:
+            if isinstance(item, list) and item:
+                sheets.append(sheet)
+                keys.append(item[0])
+                values.append(item[1] if len(item) > 1 else None)
+    return pa.table({
+        "sheet": pa.array(sheets, pa.string()),
+        "key": pa.array(keys, pa.string()),
+        "value": pa.array(values, pa.string()),
+    })
+
+
+def table_to_options(table):
+    options = {}
+    for sheet, key, value in zip(*(table.column(name).to_pylist() for name in ("sheet", "key", "value"))):
+        options.setdefault(sheet, []).append([key] if value is None else [key, value])
+    return options
+
+
+def columnar_to_table(payload):
+    # payload format kolom (get_all_columns/get_data_columns) -> tabel Arrow bertipe string
+    return pa.table({
+        name: pa.array(values, pa.string()) for name, values in zip(payload["headers"], payload["columns"])
+    })
+
+
+class SnapshotStore:
+    # snapshot dataset (SPK, ALL, opsi) sebagai file Arrow IPC berversi di satu direktori, dipakai bersama
+    # oleh semua sesi dan proses. File dibaca lewat memory map; pembaruan single-flight: satu fetch ke
+    # backend per dataset walaupun banyak sesi/proses meminta bersamaan
+    def __init__(self, directory, ttls=None, clock=time.time):
+        self.directory = directory
+        self.ttls = dict(read_cache.DATASET_TTLS if ttls is None else ttls)
+        self.clock = clock
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._tables = {}
+        self._decoded = {}
+        self._refreshing = set()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, name, suffix):
+        return os.path.join(self.directory, f"{name}{suffix}")
+
+    def _lock(self, name):
+        with self._locks_lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @contextmanager
+    def _file_lock(self, name, suffix):
+        # lock antar-thread (per nama) dan antar-proses (flock pada file lock)
+        with self._lock(name + suffix):
+            lock_file = open(self._path(name, suffix), "w")
+            try:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX)
+                yield
+            finally:
+                lock_file.close()  # melepas flock
+
+    def _manifest(self, name):
+        try:
+            with open(self._path(name, ".json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_manifest(self, name, manifest):
+        path = self._path(name, ".json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp_path, path)
+
+    def _fresh(self, manifest, dataset):
+        ttl = self.ttls.get(dataset, read_cache.DEFAULT_TTL)
+        return not manifest.get("stale") and self.clock() - manifest["fetched_at"] < ttl
+
+    def _open(self, manifest):
+        # satu memory map per file untuk semua sesi di proses ini. Versi yang dikembalikan memuat identitas file
+        # (inode, mtime): jika direktori snapshot dihapus lalu dibuat ulang, nomor versi mulai lagi dari 1 dengan
+        # nama file yang sama, dan cache tabel/DataFrame per versi tidak boleh memakai data lama
+        path = os.path.join(self.directory, manifest["file"])
+        stat = os.stat(path)
+        version = (manifest["version"], stat.st_ino, stat.st_mtime_ns)
+        with self._locks_lock:
+            entry = self._tables.get(path)
+        if entry is not None and entry[0] == version:
+            return version, entry[1]
+
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        with self._locks_lock:
+            self._tables = {p: e for p, e in self._tables.items() if os.path.exists(p)}
+            self._tables[path] = (version, table)
+        return version, table
+
+    def _refresh(self, name, dataset, fetch):
+        # ".lock": satu fetch per dataset di semua proses. ".manifest.lock" (singkat): manifest hanya diganti
+        # jika tidak ada invalidate() sejak fetch dimulai, agar data sebelum penulisan tidak dianggap segar
+        with self._file_lock(name, ".lock"):
+            # proses/thread lain mungkin sudah memperbarui selama menunggu lock
+            manifest = self._manifest(name)
+            if manifest is not None and self._fresh(manifest, dataset):
+                return self._open(manifest)
+
+            version = (manifest or {}).get("version", 0) + 1
+            file_name = f"{name}-{version}.arrow"
+            for attempt in range(MAX_REFETCH):
+                generation = (manifest or {}).get("generation", 0)
+                table = fetch()
+                tmp_path = os.path.join(self.directory, f"{file_name}.{os.getpid()}.tmp")
+                with pa.OSFile(tmp_path, "wb") as sink:
+                    with pa.ipc.new_file(sink, table.schema) as writer:
+                        writer.write_table(table)
+
+                with self._file_lock(name, ".manifest.lock"):
+                    manifest = self._manifest(name)
+                    invalidated = (manifest or {}).get("generation", 0) != generation
+                    if invalidated and attempt < MAX_REFETCH - 1:
+                        os.remove(tmp_path)
+                        continue
+                    os.replace(tmp_path, os.path.join(self.directory, file_name))
+                    # masih diinvalidasi setelah percobaan terakhir: dipakai sekali, diambil ulang pada pembacaan berikutnya
+                    manifest = {
+                        "version": version, "file": file_name, "fetched_at": self.clock(), "stale": invalidated,
+                        "generation": (manifest or {}).get("generation", 0),
+                    }
+                    self._write_manifest(name, manifest)
+                self._cleanup(name, version)
+                return self._open(manifest)
+
+    def _cleanup(self, name, version):
+        for old in range(version - KEEP_VERSIONS, 0, -1):
+            path = self._path(f"{name}-{old}", ".arrow")
+            if not os.path.exists(path):
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass  # masih dibuka proses lain (Windows)
+
+    def _refresh_async(self, name, dataset, fetch):
+        with self._locks_lock:
+            if name in self._refreshing:
+                return
+            self._refreshing.add(name)
+
+        def run():
+            try:
+                self._refresh(name, dataset, fetch)
+            except Exception:
+                pass  # snapshot lama tetap dipakai; dicoba lagi pada pembacaan berikutnya
+            finally:
+                with self._locks_lock:
+                    self._refreshing.discard(name)
+
+        threading.Thread(target=run, name=f"snapshot-{name}", daemon=True).start()
+
+    def get(self, name, dataset, fetch):
+        # hasil: (versi, pyarrow.Table). fetch() mengembalikan tabel baru dari backend
+        manifest = self._manifest(name)
+        if manifest is None or manifest.get("stale"):
+            # belum ada, atau sudah pasti usang karena penulisan: ambil ulang sekarang
+            return self._refresh(name, dataset, fetch)
+        if not self._fresh(manifest, dataset):
+            # TTL habis: snapshot lama langsung dipakai (halaman dingin tetap dari disk), pembaruan di background
+            self._refresh_async(name, dataset, fetch)
+        return self._open(manifest)
+
+    def load(self, name, dataset, fetch, decode):
+        # decode(tabel) hanya dijalankan sekali per versi snapshot; hasilnya dipakai bersama, jangan diubah
+        version, table = self.get(name, dataset, fetch)
+        with self._locks_lock:
+            entry = self._decoded.get(name)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        value = decode(table)
+        with self._locks_lock:
+            self._decoded[name] = (version, value)
+        return value
+
+    def invalidate(self, *datasets):
+        # tandai snapshot dataset ini kedaluwarsa untuk semua proses (mis. setelah penulisan berhasil).
+        # generation dinaikkan agar fetch yang sedang berjalan (dimulai sebelum penulisan) tidak dipublikasikan
+        # sebagai segar; dataset yang baru pertama kali diambil (belum ada manifest, sudah ada .lock) ikut ditandai
+        names = set()
+        for file_name in os.listdir(self.directory):
+            name, ext = os.path.splitext(file_name)
+            if ext in (".json", ".lock") and name.rsplit("-", 1)[-1] in datasets:
+                names.add(name)
+        for name in names:
+            with self._file_lock(name, ".manifest.lock"):
+                manifest = self._manifest(name) or {}
+                self._write_manifest(name, {**manifest, "stale": True, "generation": manifest.get("generation", 0) + 1})
@@ -0,0 +1,33 @@
+import pytest
+
+import api_client
+from benchmarks.fake_apps_script import seed_database
+
+# SPK 1..ROWS; ALL berisi SPK ROWS // 10 + 1 .. ROWS, jadi SPK 1..ROWS // 10 masih bisa diedit
+ROWS = 200
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "spk.db")
+    seed_database(path, ROWS)
+    return path
+
+
+@pytest.fixture
+def spk_backend(db_path):
+    return api_client.SQLiteBackend(db_path, script="spk")
+
+
+@pytest.fixture
+def login_backend(db_path):
+    return api_client.SQLiteBackend(db_path, script="login")
+
+
+def add_form(**fields):
+    form = {
+        "BU": "BU1", "Line": "Line 1", "Produk": "Produk A", "Nomor": "NM-0001", "Mesin": "Mesin A",
+        "Masalah": "Bocor", "Tindakan": "Ganti seal", "Tanggal": "2024-01-15", "PIC": "Andi",
+    }
+    form.update(fields)
+    return form
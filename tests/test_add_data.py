@@ -0,0 +1,65 @@
+import sqlite3
+import threading
+
+import api_client
+from tests.conftest import ROWS, add_form
+
+
+def query(db_path, sql, params=()):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+
+
+def test_concurrent_adds_get_distinct_consecutive_ids(db_path):
+    # setiap sesi memakai backend (koneksi) sendiri, seperti beberapa proses Streamlit
+    results = []
+    barrier = threading.Barrier(8)
+
+    def session(i):
+        backend = api_client.SQLiteBackend(db_path, script="spk")
+        barrier.wait()
+        for j in range(5):
+            results.append(backend.add_data(add_form(Nomor=f"NM-{i}-{j}", PIC="Andi, Budi"))["new_id"])
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sorted(results) == list(range(ROWS + 1, ROWS + 41))
+    assert query(db_path, 'SELECT COUNT(DISTINCT "Nomor Mesin") FROM "SPK" WHERE "ID" > ?', (ROWS,))[0][0] == 40
+    assert query(db_path, 'SELECT COUNT(*) FROM "PIC_ID" WHERE "ID" > ?', (ROWS,))[0][0] == 80
+
+
+def test_resent_add_returns_the_first_id(db_path, spk_backend):
+    first = spk_backend.add_data(add_form(request_id="req-1"))
+    other = spk_backend.add_data(add_form(request_id="req-2"))
+    again = spk_backend.add_data(add_form(request_id="req-1"))
+
+    assert (first["new_id"], other["new_id"]) == (ROWS + 1, ROWS + 2)
+    assert again == {"status": "success", "new_id": first["new_id"], "duplicate": True}
+    assert query(db_path, 'SELECT COUNT(*) FROM "SPK"')[0][0] == ROWS + 2
+
+
+def test_add_without_request_id_is_not_deduplicated(db_path, spk_backend):
+    spk_backend.add_data(add_form())
+    spk_backend.add_data(add_form())
+    assert query(db_path, 'SELECT COUNT(*) FROM "SPK"')[0][0] == ROWS + 2
+
+
+def test_batch_is_written_in_one_transaction(db_path, spk_backend):
+    rows = [add_form(Nomor="NM-1"), add_form(Nomor="NM-2"), add_form(Nomor="NM-3", Tanggal="bukan tanggal")]
+    assert spk_backend.add_data_batch(rows, request_id="batch-1") == {"error": "Invalid Data pada baris 3"}
+    assert query(db_path, 'SELECT COUNT(*) FROM "SPK"')[0][0] == ROWS
+
+    result = spk_backend.add_data_batch(rows[:2], request_id="batch-1")
+    assert result == {"status": "success", "first_id": ROWS + 1, "last_id": ROWS + 2}
+    assert spk_backend.add_data_batch(rows[:2], request_id="batch-1") == {**result, "duplicate": True}
+    assert query(db_path, 'SELECT "ID", "Nomor Mesin" FROM "SPK" WHERE "ID" > ?', (ROWS,)) == [
+        (ROWS + 1, "NM-1"), (ROWS + 2, "NM-2"),
+    ]
+    assert query(db_path, 'SELECT "first_id", "last_id" FROM "REQUEST_ID"') == [(ROWS + 1, ROWS + 2)]
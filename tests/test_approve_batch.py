@@ -0,0 +1,82 @@
+import sqlite3
+
+import api_client
+import read_cache
+from tests.conftest import ROWS
+
+# ALL berisi ID ROWS // 10 + 1 .. ROWS
+FIRST_ALL = ROWS // 10 + 1
+
+
+def approval(db_path, ids):
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            f'SELECT * FROM "ALL" WHERE "ID" IN ({", ".join("?" * len(ids))}) ORDER BY "ID"', ids
+        ).fetchall()
+        return [dict(row) for row in rows]
+    finally:
+        conn.close()
+
+
+def test_results_are_reported_per_id(db_path, login_backend):
+    before = approval(db_path, [FIRST_ALL + 1])[0]
+    ids = [FIRST_ALL, 1, FIRST_ALL + 2, FIRST_ALL]  # ID 1 hanya ada di SPK; ID ganda dikirim sekali
+    result = login_backend.approve_batch("SPV", "Budi", ids, "Rejected", "Foto kurang jelas")
+
+    assert result["updated"] == 2
+    assert result["results"] == [
+        {"ID": FIRST_ALL, "status": "success"},
+        {"ID": 1, "status": "error", "error": "ID tidak ditemukan di sheet ALL"},
+        {"ID": FIRST_ALL + 2, "status": "success"},
+    ]
+    rows = approval(db_path, [FIRST_ALL, FIRST_ALL + 1, FIRST_ALL + 2])
+    assert {(row["Approve"], row["Reason"], row["SPV"]) for row in rows[::2]} == {
+        ("Rejected", "Foto kurang jelas", "Budi")
+    }
+    assert rows[1] == before  # ID yang tidak dipilih tidak berubah
+
+
+def test_sm_cannot_approve_before_spv(db_path, login_backend):
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('UPDATE "ALL" SET "SPV" = ? WHERE "ID" = ?', ("  ", FIRST_ALL))
+    conn.close()
+
+    result = login_backend.approve_batch("SM", "Sari", [FIRST_ALL, FIRST_ALL + 1], "Approved")
+    assert result["results"] == [
+        {"ID": FIRST_ALL, "status": "error", "error": "Belum diproses SPV"},
+        {"ID": FIRST_ALL + 1, "status": "success"},
+    ]
+    row = approval(db_path, [FIRST_ALL + 1])[0]
+    assert (row["Approve"], row["SM"], row["Reason"]) == ("Approved", "Sari", "")
+    assert row["Last Update SM"]
+
+
+def test_invalid_requests_change_nothing(db_path, login_backend):
+    before = approval(db_path, [FIRST_ALL])
+    assert login_backend.approve_batch("Admin", "x", [FIRST_ALL], "Approved") == {"error": "Role tidak valid"}
+    assert login_backend.approve_batch("SPV", "x", [FIRST_ALL], "Mungkin") == {"error": "Keputusan tidak valid"}
+    assert login_backend.approve_batch("SPV", "x", [], "Approved") == {"error": "Tidak ada data yang dipilih"}
+    assert approval(db_path, [FIRST_ALL]) == before
+
+
+def test_selection_larger_than_one_lookup_chunk(db_path, login_backend):
+    # ID dicari per 500; ID di atas ROWS tidak ada di ALL
+    ids = list(range(FIRST_ALL, 1200))
+    result = login_backend.approve_batch("SPV", "Budi", ids, "Approved")
+    existing = list(range(FIRST_ALL, ROWS + 1))
+    assert result["updated"] == len(existing)
+    assert [r["ID"] for r in result["results"] if r["status"] == "success"] == existing
+    assert {row["Approve"] for row in approval(db_path, existing)} == {"Approved"}
+
+
+def test_approval_invalidates_cached_all_data(login_backend):
+    cached = api_client.CachedBackend(login_backend, "login", cache=read_cache.ReadCache())
+    first = cached.get_all_data_page(page_size=5)
+    assert cached.get_all_data_page(page_size=5) is first
+
+    target = int(first["rows"][0]["ID"])
+    assert cached.approve_batch("SPV", "Budi", [target], "Rejected")["updated"] == 1
+    assert cached.get_all_data_page(page_size=5)["rows"][0]["Approve"] == "Rejected"
@@ -0,0 +1,78 @@
+import io
+import sqlite3
+
+import pandas as pd
+import pytest
+
+import bulk_import
+import option_index
+
+VALID = {
+    "BU": "BU1", "Line": "Line 1", "Produk": "Produk 1", "Nomor": "NM-0001", "Mesin": "Mesin 1",
+    "Masalah": "Bocor", "Tindakan": "Ganti seal", "Tanggal": "15-Jan-24", "PIC": "PIC 1, PIC 2",
+}
+
+
+class Upload(io.BytesIO):
+    # pengganti UploadedFile Streamlit: BytesIO dengan name
+    def __init__(self, data, name):
+        super().__init__(data)
+        self.name = name
+
+
+@pytest.fixture
+def options(spk_backend):
+    return option_index.get_index(spk_backend.get_options())
+
+
+def test_valid_rows_are_normalized(options):
+    rows, preview = bulk_import.validate(pd.DataFrame([VALID]), options)
+    assert preview["Error"].tolist() == [""]
+    assert rows == [{**VALID, "Tanggal": "2024-01-15", "PIC": "PIC 1, PIC 2"}]
+
+
+@pytest.mark.parametrize("changes, error", [
+    ({"BU": "BU9"}, "BU tidak dikenal"),
+    ({"Mesin": "Mesin X"}, "Mesin tidak ada di BU BU1, Masalah tidak ada untuk mesin Mesin X"),
+    ({"PIC": "PIC 1, Orang Lain"}, "PIC tidak ada di BU BU1: Orang Lain"),
+    ({"Masalah": "Meledak"}, "Masalah tidak ada untuk mesin Mesin 1"),
+    ({"Tanggal": "32/13/2024"}, "Tanggal tidak valid"),
+    ({"Tindakan": "  "}, "Tindakan kosong"),
+])
+def test_invalid_rows_are_reported_and_not_sent(options, changes, error):
+    rows, preview = bulk_import.validate(pd.DataFrame([VALID, {**VALID, **changes}]), options)
+    assert len(rows) == 1
+    assert preview["Error"].tolist() == ["", error]
+
+
+def test_csv_upload_is_read_as_text():
+    upload = Upload(b"BU,Nomor,Tanggal\nBU1,0012,2024-01-15\n", "spk.csv")
+    df = bulk_import.read_upload(upload)
+    assert df.to_dict("records") == [{"BU": "BU1", "Nomor": "0012", "Tanggal": "2024-01-15"}]
+
+
+def test_corrupt_xlsx_raises_from_read_upload():
+    # run() menampilkan error apa pun dari read_upload lewat st.error
+    with pytest.raises(Exception):
+        bulk_import.read_upload(Upload(b"bukan file zip", "spk.xlsx"))
+
+
+def test_batch_is_sent_once_per_file_content(db_path, spk_backend, options):
+    data = ",".join(VALID) + "\n" + "\n".join(",".join(f'"{v}"' for v in VALID.values()) for _ in range(3)) + "\n"
+    upload = Upload(data.encode("utf-8"), "spk.csv")
+    rows, _ = bulk_import.validate(bulk_import.read_upload(upload), options)
+    request_id = f"bulk-{bulk_import.file_hash(upload)}"
+
+    first = spk_backend.add_data_batch(rows, request_id=request_id)
+    # nama file lain, isi sama: request_id sama, tidak ada baris baru
+    again = Upload(data.encode("utf-8"), "salinan.csv")
+    second = spk_backend.add_data_batch(rows, request_id=f"bulk-{bulk_import.file_hash(again)}")
+
+    assert (first["last_id"] - first["first_id"], second.get("duplicate")) == (2, True)
+    assert (second["first_id"], second["last_id"]) == (first["first_id"], first["last_id"])
+    conn = sqlite3.connect(db_path)
+    try:
+        pics = conn.execute('SELECT "PIC" FROM "PIC_ID" WHERE "ID" = ?', (first["first_id"],)).fetchall()
+    finally:
+        conn.close()
+    assert sorted(pic for (pic,) in pics) == ["PIC 1", "PIC 2"]
@@ -0,0 +1,45 @@
+import sqlite3
+
+import pandas as pd
+
+import loader
+import update_spk_spv
+
+
+def form_from_row(row):
+    return {field: update_spk_spv._form_value(row[column]) for field, column in update_spk_spv.FORM_COLUMNS.items()}
+
+
+def test_unchanged_form_sends_nothing(spk_backend):
+    row = loader.load_spk_rows(spk_backend.get_data()).iloc[0]
+    assert update_spk_spv.changed_fields(row, {"ID": str(row["ID"]), **form_from_row(row)}) == {}
+
+
+def test_only_changed_fields_are_sent_and_written(db_path, spk_backend):
+    row = loader.load_spk_rows(spk_backend.get_data()).iloc[0]
+    form = {"ID": str(row["ID"]), **form_from_row(row), "Tindakan": "Ganti bearing", "PIC": "Budi"}
+
+    changed = update_spk_spv.changed_fields(row, form)
+    assert changed == {"Tindakan": "Ganti bearing", "PIC": "Budi"}
+
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    try:
+        before = dict(conn.execute('SELECT * FROM "SPK" WHERE "ID" = ?', (int(row["ID"]),)).fetchone())
+        assert spk_backend.update_data({"ID": form["ID"], **changed})["status"] == "success"
+        after = dict(conn.execute('SELECT * FROM "SPK" WHERE "ID" = ?', (int(row["ID"]),)).fetchone())
+        pics = [r[0] for r in conn.execute('SELECT "PIC" FROM "PIC_ID" WHERE "ID" = ?', (int(row["ID"]),))]
+    finally:
+        conn.close()
+
+    differing = {column for column in before if before[column] != after[column]}
+    assert differing == {"Tindakan Perbaikan", "PIC", "Last Update"}
+    assert after["Tindakan Perbaikan"] == "Ganti bearing"
+    assert pics == ["Budi"]
+
+
+def test_date_is_compared_in_form_format(spk_backend):
+    row = loader.load_spk_rows(spk_backend.get_data()).iloc[0]
+    form = {"ID": str(row["ID"]), **form_from_row(row)}
+    form["Tanggal"] = (row["Tanggal"] + pd.Timedelta(days=1)).strftime("%d-%b-%y")
+    assert list(update_spk_spv.changed_fields(row, form)) == ["Tanggal"]
@@ -0,0 +1,76 @@
+import sqlite3
+
+import pandas as pd
+
+import kpi
+import loader
+
+BY = ["BU", "Status"]
+
+
+def all_frame(login_backend):
+    return loader.load_all(login_backend.get_all_data())
+
+
+def summary(df, by=BY, filters=None):
+    cube = kpi.KpiCube()
+    cube.update(None, df)
+    return cube.summary(by, filters)
+
+
+def test_incremental_update_matches_full_rebuild(db_path, login_backend):
+    cube = kpi.KpiCube()
+    cube.update(1, all_frame(login_backend))
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('UPDATE "ALL" SET "Approve" = ?, "Kondisi" = ? WHERE "ID" IN (50, 60, 70)', ("Rejected", "Rusak"))
+        conn.execute('DELETE FROM "ALL" WHERE "ID" = 80')
+        conn.execute('INSERT INTO "ALL" ("ID", "BU", "Approve", "Quantity") VALUES (5000, ?, ?, ?)', ("BU9", "", "3"))
+    conn.close()
+    df = all_frame(login_backend)
+    cube.update(2, df)
+
+    assert (cube.full_builds, cube.incremental_updates, cube.last_changed) == (1, 1, 5)
+    pd.testing.assert_frame_equal(cube.summary(BY), summary(df))
+    pd.testing.assert_frame_equal(cube.summary([]), summary(df, []))
+    assert cube.summary(["BU"], {"BU": ["BU9"]})["Jumlah"].tolist() == [1]
+
+
+def test_same_version_is_not_recomputed(login_backend):
+    cube = kpi.KpiCube()
+    df = all_frame(login_backend)
+    cube.update(1, df)
+    cube.update(1, df.iloc[:10])
+    assert cube.summary([])["Jumlah"].iloc[0] == len(df)
+
+
+def test_summary_cache_is_per_version(login_backend):
+    cube = kpi.KpiCube()
+    df = all_frame(login_backend)
+    cube.update(1, df)
+    first = cube.summary(["BU"])
+    assert cube.summary(["BU"]) is first
+
+    cube.update(2, df.iloc[10:])
+    assert cube.summary(["BU"])["Jumlah"].sum() == len(df) - 10
+
+
+def test_summary_from_superseded_table_is_not_cached(login_backend, monkeypatch):
+    cube = kpi.KpiCube()
+    df = all_frame(login_backend)
+    cube.update(1, df)
+
+    # update() selesai di tengah perhitungan summary() dari tabel versi 1
+    with_rates = kpi._with_rates
+
+    def racing(totals, status):
+        cube.update(2, df.iloc[10:])
+        return with_rates(totals, status)
+
+    monkeypatch.setattr(kpi, "_with_rates", racing)
+    stale = cube.summary([])
+    monkeypatch.undo()
+
+    assert stale["Jumlah"].iloc[0] == len(df)
+    assert cube.summary([])["Jumlah"].iloc[0] == len(df) - 10
@@ -0,0 +1,45 @@
+import option_index
+
+OPTIONS = {
+    "BU": [["BU1"], ["BU2"], []],
+    "Produk": [["BU1", "Produk 1"], ["BU2", "Produk 9"], ["BU1", "Produk 2"]],
+    "Line": [["BU1", "Line 1"]],
+    "Mesin": [["BU1", "Mesin 1"], ["BU2", "Mesin 2"]],
+    "PIC": [["BU1", "Andi"], ["BU1"], ["BU2", "Budi"]],
+    "Masalah": [["Mesin 1", "Bocor"], ["Mesin 1", "Aus"], ["Mesin 2", "Macet"]],
+}
+
+
+def test_options_are_grouped_by_bu_and_mesin():
+    index = option_index.OptionIndex(OPTIONS, "v1")
+    assert index.bu == ["BU1", "BU2"]
+    assert index.for_bu("BU1", "Produk") == ["Produk 1", "Produk 2"]
+    assert index.for_bu("BU1", "PIC") == ["Andi"]  # baris tanpa nilai dilewati
+    assert index.for_bu("BU2", "Line") == []
+    assert index.for_bu("BU9", "Mesin") == []
+    assert index.masalah("Mesin 1") == ["Bocor", "Aus"]
+    assert index.masalah("Mesin X") == []
+
+
+def test_index_is_reused_for_the_same_payload_and_content():
+    first = option_index.get_index(OPTIONS)
+    assert option_index.get_index(OPTIONS) is first
+    # payload baru dari Apps Script dengan isi yang sama: index tidak dibangun ulang
+    copy = {sheet: [list(item) for item in items] for sheet, items in OPTIONS.items()}
+    assert option_index.get_index(copy) is first
+
+
+def test_changed_options_build_a_new_index():
+    first = option_index.get_index(OPTIONS)
+    changed = {**OPTIONS, "Masalah": OPTIONS["Masalah"] + [["Mesin 2", "Patah"]]}
+    index = option_index.get_index(changed)
+    assert index is not first
+    assert index.version == option_index.options_version(changed) != first.version
+    assert index.masalah("Mesin 2") == ["Macet", "Patah"]
+
+
+def test_payload_cache_is_bounded():
+    payloads = [{**OPTIONS, "BU": [[f"BU{i}"]]} for i in range(option_index.MAX_PAYLOADS + 3)]
+    for payload in payloads:
+        option_index.get_index(payload)
+    assert len(option_index._by_payload) <= option_index.MAX_PAYLOADS
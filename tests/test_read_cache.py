@@ -0,0 +1,85 @@
+import api_client
+import read_cache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Loader:
+    # loader untuk get_or_load: hasilnya nomor pemanggilan; during(n) dijalankan di tengah pemanggilan ke-n
+    def __init__(self, during=None):
+        self.calls = 0
+        self.during = during
+
+    def __call__(self):
+        self.calls += 1
+        if self.during is not None:
+            self.during(self.calls)
+        return self.calls
+
+
+def test_entries_expire_per_dataset_ttl():
+    clock = Clock()
+    cache = read_cache.ReadCache(ttls={"OPTIONS": 600, "SPK": 30}, clock=clock)
+    options, spk = Loader(), Loader()
+    cache.get_or_load(("x", "get_options"), "OPTIONS", options)
+    cache.get_or_load(("x", "get_data"), "SPK", spk)
+
+    clock.now += 31
+    assert cache.get_or_load(("x", "get_options"), "OPTIONS", options) == 1
+    assert cache.get_or_load(("x", "get_data"), "SPK", spk) == 2
+    assert cache.stats() == {"OPTIONS": {"hits": 1, "misses": 1}, "SPK": {"hits": 0, "misses": 2}}
+
+
+def test_invalidate_drops_only_the_given_datasets():
+    cache = read_cache.ReadCache()
+    spk, options = Loader(), Loader()
+    cache.get_or_load(("x", "get_data"), "SPK", spk)
+    cache.get_or_load(("x", "get_options"), "OPTIONS", options)
+
+    cache.invalidate("SPK")
+    assert cache.get_or_load(("x", "get_data"), "SPK", spk) == 2
+    assert cache.get_or_load(("x", "get_options"), "OPTIONS", options) == 1
+
+    cache.invalidate()
+    assert cache.get_or_load(("x", "get_options"), "OPTIONS", options) == 2
+
+
+def test_error_response_is_not_cached():
+    cache = read_cache.ReadCache()
+    responses = iter([{"error": "Server sedang sibuk"}, ["baris"]])
+    load = lambda: next(responses)
+    assert cache.get_or_load(("x", "get_data"), "SPK", load) == {"error": "Server sedang sibuk"}
+    assert cache.get_or_load(("x", "get_data"), "SPK", load) == ["baris"]
+
+
+def test_load_that_raced_an_invalidation_is_not_cached():
+    # penulisan berhasil (invalidate) saat pembacaan pertama sedang berjalan: hasilnya data sebelum penulisan
+    cache = read_cache.ReadCache()
+    load = Loader(during=lambda call: call == 1 and cache.invalidate("SPK"))
+    assert cache.get_or_load(("x", "get_data"), "SPK", load) == 1
+    assert cache.get_or_load(("x", "get_data"), "SPK", load) == 2
+    assert cache.get_or_load(("x", "get_data"), "SPK", load) == 2
+
+
+def test_successful_write_invalidates_cached_reads(spk_backend):
+    cached = api_client.CachedBackend(spk_backend, "spk", cache=read_cache.ReadCache())
+    first = cached.get_data_page(page_size=5)
+    assert cached.get_data_page(page_size=5) is first
+
+    assert cached.update_data({"ID": 1, "Tindakan": "Ganti bearing"})["status"] == "success"
+    after = cached.get_data_page(page_size=5)
+    assert after is not first
+    assert after["rows"][0]["Tindakan Perbaikan"] == "Ganti bearing"
+
+
+def test_failed_write_keeps_cached_reads(spk_backend):
+    cached = api_client.CachedBackend(spk_backend, "spk", cache=read_cache.ReadCache())
+    first = cached.get_data_page(page_size=5)
+    assert "error" in cached.update_data({"ID": 999999, "Tindakan": "Ganti bearing"})
+    assert cached.get_data_page(page_size=5) is first
@@ -0,0 +1,63 @@
+import sqlite3
+
+import replica
+from tests.conftest import ROWS, add_form
+
+
+def ids(rows):
+    return [replica.row_id(row) for row in rows]
+
+
+def test_delta_sync_merges_changed_and_new_rows(spk_backend):
+    sheet = replica.SheetReplica(spk_backend.get_data)
+    rows = sheet.sync()
+    assert ids(rows) == list(range(1, ROWS // 10 + 1))
+    assert (sheet.full_syncs, sheet.delta_syncs) == (1, 0)
+
+    assert spk_backend.update_data({"ID": 3, "Tindakan": "Ganti bearing"})["status"] == "success"
+    new_id = spk_backend.add_data(add_form())["new_id"]
+    rows = sheet.sync()
+
+    assert (sheet.full_syncs, sheet.delta_syncs) == (1, 1)
+    assert ids(rows) == list(range(1, ROWS // 10 + 1)) + [new_id]
+    assert rows[2][7] == "Ganti bearing"
+
+
+def test_delta_sync_prunes_rows_moved_to_all(db_path, spk_backend):
+    sheet = replica.SheetReplica(spk_backend.get_data)
+    sheet.sync()
+
+    conn = sqlite3.connect(db_path)
+    with conn:
+        conn.execute('INSERT INTO "ALL" ("ID") VALUES (5)')
+    conn.close()
+
+    assert 5 not in ids(sheet.sync())
+    assert sheet.delta_syncs == 1
+
+
+def test_header_change_forces_full_sync(spk_backend):
+    calls = []
+
+    def fetch(since, since_id):
+        calls.append(since)
+        payload = spk_backend.get_data(since=since, since_id=since_id)
+        if len(calls) == 2:
+            payload["headers"] = payload["headers"] + ["Kolom Baru"]
+        return payload
+
+    sheet = replica.SheetReplica(fetch)
+    sheet.sync()
+    rows = sheet.sync()
+
+    assert calls[0] == calls[2] == replica.FULL_SYNC_SINCE
+    assert sheet.full_syncs == 2
+    assert ids(rows) == list(range(1, ROWS // 10 + 1))
+
+
+def test_reset_forces_full_sync(spk_backend):
+    sheet = replica.SheetReplica(spk_backend.get_data)
+    sheet.sync()
+    sheet.reset()
+    sheet.sync()
+    assert (sheet.full_syncs, sheet.delta_syncs) == (2, 0)
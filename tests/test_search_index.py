@@ -0,0 +1,92 @@
+import numpy as np
+import pandas as pd
+
+import api_client
+import read_cache
+import search_index
+
+
+def frame(rows):
+    # rows: {ID: (Masalah, Tindakan Perbaikan)}
+    return pd.DataFrame([
+        {"ID": doc_id, "Masalah": masalah, "Tindakan Perbaikan": tindakan}
+        for doc_id, (masalah, tindakan) in rows.items()
+    ])
+
+
+ROWS = {
+    1: ("Bearing aus", "Ganti bearing"),
+    2: ("Bocor", "Ganti seal pompa"),
+    3: ("Motor panas, bearing berisik", "Lumasi bearing dan cek motor yang panas sekali"),
+    4: ("Belt putus", "Ganti belt"),
+}
+
+
+def built(rows, version=1):
+    index = search_index.SearchIndex()
+    index.update(version, frame(rows))
+    return index
+
+
+def test_results_are_ranked_by_bm25():
+    ids, scores = built(ROWS).search("bearing")
+    # "bearing" dua kali di dokumen pendek lebih relevan daripada dua kali di dokumen panjang
+    assert ids.tolist() == [1, 3]
+    assert scores[0] > scores[1] > 0
+
+
+def test_all_terms_must_match_and_last_term_is_a_prefix():
+    index = built(ROWS)
+    assert index.search("ganti bear")[0].tolist() == [1]
+    assert sorted(index.search("ganti")[0].tolist()) == [1, 2, 4]
+    assert index.search("motor rantai")[0].size == 0
+    assert index.search("b")[0].size == 0  # awalan terlalu pendek: dicocokkan sebagai kata utuh
+
+
+def test_candidates_restrict_results():
+    ids, _ = built(ROWS).search("ganti", candidates=np.array([2, 4]))
+    assert sorted(ids.tolist()) == [2, 4]
+
+
+def test_incremental_update_matches_full_rebuild():
+    index = built(ROWS)
+    changed = {**ROWS, 2: ("Bearing bocor", "Ganti bearing"), 5: ("Rantai kendor", "Setel rantai")}
+    del changed[4]
+    index.update(2, frame(changed))
+
+    assert (index.full_builds, index.incremental_updates, index.last_changed) == (1, 1, 3)
+    fresh = built(changed)
+    for query in ["bearing", "ganti", "rantai", "belt", "bo"]:
+        ids, scores = index.search(query)
+        fresh_ids, fresh_scores = fresh.search(query)
+        assert ids.tolist() == fresh_ids.tolist()
+        np.testing.assert_allclose(scores, fresh_scores)
+
+
+def test_same_version_is_not_reindexed():
+    index = built(ROWS)
+    index.update(1, frame({1: ("Rantai", "Setel")}))
+    assert index.search("bearing")[0].tolist() == [1, 3]
+    index.update(None, frame(ROWS))  # tanpa snapshot: dibandingkan dengan hash, tidak ada yang berubah
+    assert (index.full_builds, index.incremental_updates, index.last_changed) == (1, 0, 0)
+
+
+def test_rows_follow_the_callers_frame():
+    index = built(ROWS)
+    old = frame(ROWS)
+    index.update(2, frame({**ROWS, 5: ("Bearing", "Ganti bearing")}).iloc[1:])  # ID 1 hilang di versi baru
+    rows, found = index.rows(old, 1, [5, 1, 3])
+    assert rows["ID"].tolist() == [1, 3]
+    assert found.tolist() == [False, True, True]
+
+
+def test_search_page_filters_and_pages(login_backend):
+    backend = api_client.CachedBackend(login_backend, "login", cache=read_cache.ReadCache())
+    everything = search_index.search_page(backend, "ALL", "ganti", page_size=1000)
+    assert everything["total"] > 0
+
+    pic = everything["rows"]["PIC"].iloc[0]
+    page = search_index.search_page(backend, "ALL", "ganti", pics=[pic], page=1, page_size=5)
+    assert set(page["rows"]["PIC"]) == {pic}
+    assert len(page["rows"]) == min(5, page["total"])
+    assert page["rows"]["Skor"].is_monotonic_decreasing
@@ -0,0 +1,161 @@
+import shutil
+import threading
+import time
+
+import pyarrow as pa
+import pytest
+
+import api_client
+import read_cache
+import snapshot
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Source:
+    # fetch() untuk SnapshotStore: tabel berisi nomor pengambilan; during(n) dijalankan di tengah fetch ke-n
+    def __init__(self, during=None, delay=0.0):
+        self.calls = 0
+        self.during = during
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    def __call__(self):
+        with self._lock:
+            self.calls += 1
+            call = self.calls
+        time.sleep(self.delay)
+        if self.during is not None:
+            self.during(call)
+        return pa.table({"fetch": [str(call)]})
+
+
+def fetched(table):
+    return table.column("fetch")[0].as_py()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def store(tmp_path, clock):
+    return snapshot.SnapshotStore(str(tmp_path / "snapshots"), ttls={"ALL": 60}, clock=clock)
+
+
+def test_concurrent_reads_fetch_once(store):
+    source = Source(delay=0.2)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(store.get("login-ALL", "ALL", source))) for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert source.calls == 1
+    assert {version[0] for version, _ in results} == {1}
+
+
+def test_expired_snapshot_is_served_while_refreshing(store, clock):
+    source = Source()
+    store.get("login-ALL", "ALL", source)
+    clock.now += 61
+
+    version, table = store.get("login-ALL", "ALL", source)
+    assert (version[0], fetched(table)) == (1, "1")  # snapshot lama langsung dipakai
+
+    deadline = time.time() + 5
+    while store._manifest("login-ALL")["version"] == 1 and time.time() < deadline:
+        time.sleep(0.01)
+    version, table = store.get("login-ALL", "ALL", source)
+    assert (version[0], fetched(table)) == (2, "2")
+
+
+def test_invalidate_forces_synchronous_refetch(store):
+    source = Source()
+    store.get("login-ALL", "ALL", source)
+    store.get("login-SPK", "SPK", source)
+
+    store.invalidate("ALL")
+    version, table = store.get("login-ALL", "ALL", source)
+
+    assert (version[0], fetched(table)) == (2, "3")
+    assert store._manifest("login-SPK")["stale"] is False
+
+
+def test_fetch_that_started_before_a_write_is_not_published_as_fresh(store):
+    # penulisan berhasil (invalidate) saat fetch pertama sedang berjalan: hasilnya data sebelum penulisan
+    source = Source(during=lambda call: call == 1 and store.invalidate("ALL"))
+    version, table = store.get("login-ALL", "ALL", source)
+
+    assert source.calls == 2
+    assert (version[0], fetched(table)) == (1, "2")
+    assert store._manifest("login-ALL")["stale"] is False
+
+
+def test_snapshot_invalidated_on_every_fetch_stays_stale(store):
+    source = Source(during=lambda call: store.invalidate("ALL"))
+    store.get("login-ALL", "ALL", source)
+
+    assert source.calls == snapshot.MAX_REFETCH
+    assert store._manifest("login-ALL")["stale"] is True
+    store.get("login-ALL", "ALL", source)
+    assert source.calls == 2 * snapshot.MAX_REFETCH
+
+
+def test_load_decodes_once_per_version(store):
+    source = Source()
+    decoded = []
+
+    def decode(table):
+        decoded.append(fetched(table))
+        return fetched(table)
+
+    assert store.load("spk-OPTIONS", "OPTIONS", source, decode) == "1"
+    assert store.load("spk-OPTIONS", "OPTIONS", source, decode) == "1"
+    store.invalidate("OPTIONS")
+    assert store.load("spk-OPTIONS", "OPTIONS", source, decode) == "2"
+    assert decoded == ["1", "2"]
+
+
+def test_recreated_directory_is_not_served_from_the_old_memory_map(tmp_path, store, clock):
+    first = Source()
+    version, _ = store.get("login-ALL", "ALL", first)
+
+    # direktori dihapus dan dibuat ulang: versi mulai lagi dari 1 dengan nama file yang sama
+    shutil.rmtree(store.directory)
+    fresh = snapshot.SnapshotStore(store.directory, ttls={"ALL": 60}, clock=clock)
+    fresh.get("login-ALL", "ALL", lambda: pa.table({"fetch": ["baru"]}))
+
+    new_version, table = store.get("login-ALL", "ALL", first)
+    assert new_version[0] == version[0] == 1
+    assert new_version != version
+    assert fetched(table) == "baru"
+
+
+@pytest.mark.parametrize("script", ["spk", "login"])
+def test_backend_snapshots_are_refreshed_from_the_delta_replica(tmp_path, db_path, script):
+    backend = api_client.SQLiteBackend(db_path, script=script)
+    store = snapshot.SnapshotStore(str(tmp_path / "snapshots"))
+    cached = api_client.CachedBackend(backend, script, cache=read_cache.ReadCache(), snapshots=store)
+    cached.get_data_table()
+    cached.get_all_table()
+
+    assert cached.update_data({"ID": 3, "Tindakan": "Ganti bearing"})["status"] == "success"
+    store.invalidate("ALL")
+    _, spk = cached.get_data_table()
+    _, all_table = cached.get_all_table()
+
+    assert [(r.full_syncs, r.delta_syncs) for r in cached.replicas.values()] == [(1, 1), (1, 1)]
+    assert spk.equals(snapshot.columnar_to_table(backend.get_data_columns()))
+    assert all_table.equals(snapshot.columnar_to_table(backend.get_all_columns()))
+    assert "Ganti bearing" in spk.column("Tindakan Perbaikan").to_pylist()
@@ -0,0 +1,182 @@
+import json
+import sqlite3
+
+import pytest
+
+import api_client
+import write_queue
+from tests.conftest import add_form
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def make_queue(tmp_path, backend, clock):
+    queue = write_queue.WriteQueue(str(tmp_path / "queue.db"), get_backend=lambda page: backend, clock=clock)
+    queue.start = lambda: None  # entri dikirim lewat process_next() di tes, bukan thread worker
+    return queue
+
+
+def spk_count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute('SELECT COUNT(*) FROM "SPK"').fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_pending_updates_for_same_id_are_coalesced(tmp_path, spk_backend, clock):
+    queue = make_queue(tmp_path, spk_backend, clock)
+    first = queue.enqueue("update_spk", "update_data", {"ID": 1, "Tindakan": "Ganti bearing"})
+    second = queue.enqueue("update_spk", "update_data", {"ID": 1, "PIC": "Budi"})
+    other = queue.enqueue("update_spk", "update_data", {"ID": 2, "PIC": "Budi"})
+
+    assert first == second != other
+    entry = queue.status([first])[0]
+    assert entry["coalesced"] == 1
+    # field dari update pertama yang belum terkirim tetap ikut
+    assert json.loads(entry["payload"]) == {"ID": 1, "Tindakan": "Ganti bearing", "PIC": "Budi"}
+
+
+def test_update_after_commit_is_not_coalesced(tmp_path, spk_backend, clock):
+    queue = make_queue(tmp_path, spk_backend, clock)
+    first = queue.enqueue("update_spk", "update_data", {"ID": 1, "PIC": "Andi"})
+    queue.process_next()
+    second = queue.enqueue("update_spk", "update_data", {"ID": 1, "PIC": "Budi"})
+
+    assert first != second
+    assert queue.status([first])[0]["status"] == write_queue.COMMITTED
+
+
+def test_same_request_id_is_enqueued_and_written_once(tmp_path, db_path, spk_backend, clock):
+    queue = make_queue(tmp_path, spk_backend, clock)
+    before = spk_count(db_path)
+    payload = add_form(request_id="req-1")
+
+    first = queue.enqueue("add_spk", "add_data", payload)
+    assert queue.enqueue("add_spk", "add_data", payload) == first
+    queue.process_next()
+
+    entry = queue.status([first])[0]
+    assert entry["status"] == write_queue.COMMITTED
+    assert spk_count(db_path) == before + 1
+    # respons pertama hilang dan dikirim ulang: ID yang sama, tidak ada baris kedua
+    again = spk_backend.add_data(payload)
+    assert again["duplicate"] and again["new_id"] == json.loads(entry["result"])["new_id"]
+    assert spk_count(db_path) == before + 1
+
+
+class FlakyBackend:
+    # gagal `failures` kali (BackendError atau {"retry": True}) sebelum meneruskan ke backend asli
+    def __init__(self, backend, failures):
+        self.backend = backend
+        self.failures = list(failures)
+
+    def add_data(self, form_data):
+        if self.failures:
+            failure = self.failures.pop(0)
+            if isinstance(failure, Exception):
+                raise failure
+            return failure
+        return self.backend.add_data(form_data)
+
+
+def test_unreachable_backend_is_retried_with_backoff(tmp_path, db_path, spk_backend, clock):
+    backend = FlakyBackend(
+        spk_backend, [api_client.BackendError("timeout"), {"error": "Server sedang sibuk", "retry": True}]
+    )
+    queue = make_queue(tmp_path, backend, clock)
+    before = spk_count(db_path)
+    entry_id = queue.enqueue("add_spk", "add_data", add_form(request_id="req-2"))
+
+    queue.process_next()
+    entry = queue.status([entry_id])[0]
+    assert (entry["status"], entry["attempts"], entry["error"]) == (write_queue.PENDING, 1, "timeout")
+    assert entry["next_attempt"] == clock.now + write_queue.RETRY_BASE
+
+    # belum jatuh tempo: tidak dikirim
+    assert queue.process_next() == pytest.approx(write_queue.RETRY_BASE)
+    assert queue.status([entry_id])[0]["attempts"] == 1
+
+    clock.now += write_queue.RETRY_BASE
+    queue.process_next()
+    entry = queue.status([entry_id])[0]
+    assert (entry["status"], entry["attempts"]) == (write_queue.PENDING, 2)
+    assert entry["next_attempt"] == clock.now + 2 * write_queue.RETRY_BASE
+
+    clock.now += 2 * write_queue.RETRY_BASE
+    queue.process_next()
+    assert queue.status([entry_id])[0]["status"] == write_queue.COMMITTED
+    assert spk_count(db_path) == before + 1
+
+
+def test_rejected_write_is_not_retried(tmp_path, spk_backend, clock):
+    queue = make_queue(tmp_path, spk_backend, clock)
+    entry_id = queue.enqueue("add_spk", "add_data", add_form(Tanggal="bukan tanggal"))
+    queue.process_next()
+
+    entry = queue.status([entry_id])[0]
+    assert (entry["status"], entry["error"]) == (write_queue.FAILED, "Invalid Data")
+
+
+def test_sending_entries_are_resent_after_restart(tmp_path, spk_backend, clock):
+    queue = make_queue(tmp_path, spk_backend, clock)
+    entry_id = queue.enqueue("add_spk", "add_data", add_form(request_id="req-3"))
+    assert queue._claim()["id"] == entry_id  # proses berhenti saat entri sedang dikirim
+
+    restarted = make_queue(tmp_path, spk_backend, clock)
+    assert restarted.status([entry_id])[0]["status"] == write_queue.PENDING
+
+
+class RecordingBackend:
+    # update_data dicatat; panggilan pertama gagal setelah sesi lain mengantrekan update baru untuk ID yang sama
+    def __init__(self, backend, on_first_send):
+        self.backend = backend
+        self.on_first_send = on_first_send
+        self.sent = []
+
+    def update_data(self, form_data):
+        self.sent.append(form_data)
+        if len(self.sent) == 1:
+            self.on_first_send()
+            raise api_client.BackendError("timeout")
+        return self.backend.update_data(form_data)
+
+
+def test_failed_update_is_not_resent_after_a_newer_one(tmp_path, db_path, spk_backend, clock):
+    queue = None
+    backend = RecordingBackend(
+        spk_backend, lambda: queue.enqueue("update_spk", "update_data", {"ID": "5", "Tindakan": "baru"})
+    )
+    queue = make_queue(tmp_path, backend, clock)
+    older = queue.enqueue("update_spk", "update_data", {"ID": "5", "Tindakan": "lama"})
+
+    queue.process_next()  # "lama" gagal saat dikirim; "baru" masuk sebagai entri terpisah
+    newer = max(entry["id"] for entry in queue.status([older, older + 1]))
+    assert newer != older
+
+    # "baru" sudah jatuh tempo tetapi menunggu "lama" selesai
+    assert queue.process_next() == pytest.approx(write_queue.RETRY_BASE)
+    assert len(backend.sent) == 1
+
+    clock.now += write_queue.RETRY_BASE
+    queue.process_next()
+    queue.process_next()
+
+    assert [form["Tindakan"] for form in backend.sent] == ["lama", "lama", "baru"]
+    assert [entry["status"] for entry in queue.status([older, newer])] == [write_queue.COMMITTED] * 2
+    conn = sqlite3.connect(db_path)
+    try:
+        assert conn.execute('SELECT "Tindakan Perbaikan" FROM "SPK" WHERE "ID" = 5').fetchone()[0] == "baru"
+    finally:
+        conn.close()
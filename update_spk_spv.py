@@ -1,7 +1,40 @@
 import streamlit as st
-import requests
 import pandas as pd
 from datetime import datetime
+import api_client
+import loader
+import option_index
+import profiling
+import write_queue
+
+# field form update -> kolom baris SPK yang sedang diedit (loader.SPK_ROW_COLUMNS)
+FORM_COLUMNS = {
+    "BU": "BU",
+    "Line": "Line",
+    "Produk": "Produk",
+    "Nomor": "Nomor Mesin",
+    "Mesin": "Mesin",
+    "Masalah": "Masalah",
+    "Tindakan": "Tindakan",
+    "Tanggal": "Tanggal",
+    "PIC": "PIC",
+}
+
+
+def _form_value(value):
+    if pd.isna(value):
+        return ""
+    if isinstance(value, pd.Timestamp):
+        return value.strftime("%d-%b-%y")
+    return str(value)
+
+
+def changed_fields(selected_data, updated_data):
+    # hanya field yang berbeda dari data yang dimuat yang dikirim ke update_data
+    return {
+        field: value for field, value in updated_data.items()
+        if field in FORM_COLUMNS and value != _form_value(selected_data[FORM_COLUMNS[field]])
+    }
 
 def run():
     st.markdown(
@@ -13,76 +46,86 @@ def run():
         unsafe_allow_html=True
     )
 
-    APPS_SCRIPT_URL = "https://script.google.com/macros/s/AKfycbyP8kd-8d5qDtyVMg6kaugaJDuBA3yFF27K-q_pGVksINlLRvCpfnWXeUXIzVdQL8fg/exec"
-
-    def get_all_data():
-        try:
-            response = requests.get(APPS_SCRIPT_URL, params={"action": "get_data"}, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Terjadi kesalahan saat mengambil data: {e}")
-            return []
-
-    def get_options():
-        try:
-            response = requests.get(APPS_SCRIPT_URL, params={"action": "get_options"}, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Terjadi kesalahan saat mengambil opsi: {e}")
-            return {}
-
-    def get_all_ids():
-        try:
-            response = requests.get(APPS_SCRIPT_URL, params={"action": "get_all_ids"}, timeout=10)
-            response.raise_for_status()
-            return response.json()
-        except requests.exceptions.RequestException as e:
-            st.error(f"Terjadi kesalahan saat mengambil ID: {e}")
-            return []
-
-    data = get_all_data()
-    options = get_options()
-    all_ids = get_all_ids()
+    backend = api_client.get_backend("update_spk")
+
+    # normalnya hanya baris yang berubah yang diambil; tombol ini memaksa sinkronisasi penuh
+    if st.button("🔄 Sinkronisasi Ulang Data"):
+        backend.resync()
+
+    # status update yang dikirim dari sesi ini (antrean lokal -> gsheets)
+    write_queue.status_panel("queue_update_spk")
+
+    # ambil data dan opsi secara bersamaan; kegagalan satu request tidak mengosongkan yang lain
+    results, errors = api_client.fetch_all({
+        "data": backend.get_data,
+        "options": backend.get_options,
+    })
+    if "data" in errors:
+        st.error(f"Terjadi kesalahan saat mengambil data: {errors['data']}")
+    if "options" in errors:
+        st.error(f"Terjadi kesalahan saat mengambil opsi: {errors['options']}")
+
+    data = results.get("data", [])
+    with profiling.span("frame:option_index"):
+        options = option_index.get_index(results.get("options", {}))
 
     if isinstance(data, list) and len(data) > 0:
-        df = pd.DataFrame(data, columns=["ID", "BU", "Line", "Produk", "Nomor Mesin", "Mesin", "Masalah", "Tindakan", "Tanggal", "PIC", "Last Update"])
-        df["Tanggal"] = pd.to_datetime(df["Tanggal"]).dt.date  
+        # kolom bertipe (kategori, ID Int64, tanggal dd-Mon-yy sudah di-parse)
+        with profiling.span("frame:load_spk_rows", rows=len(data)):
+            df = loader.load_spk_rows(data)
 
-        # Hapus data yang ID-nya ada di all_ids
-        editable_df = df[~df["ID"].astype(str).isin([str(i) for i in all_ids])]
+            # get_data sudah hanya berisi SPK yang ID-nya belum ada di sheet ALL (anti-join dengan Set di Apps Script),
+            # jadi daftar ID sheet ALL tidak perlu diambil dan dicocokkan lagi di sini
+            editable_df = df.dropna(subset=["ID"])
 
         if not editable_df.empty:
             st.subheader("Pilih Data untuk Diperbarui")
-            selected_id = st.selectbox("Pilih ID", editable_df["ID"].astype(str))
-            selected_data = editable_df[editable_df["ID"].astype(str) == selected_id].iloc[0]
+            with profiling.span("render:pilih_id", rows=len(editable_df)):
+                selected_id = st.selectbox("Pilih ID", editable_df["ID"].astype(str))
+            selected_data = editable_df[editable_df["ID"] == int(selected_id)].iloc[0]
             
             st.subheader("Form Update Data")
-            bu_options = [item[0] for item in options.get("BU", []) if isinstance(item, list)]
+            bu_options = options.bu
             bu = st.selectbox("BU", bu_options, index=bu_options.index(selected_data["BU"]) if selected_data["BU"] in bu_options else 0)
             
-            produk_options = [item[1] for item in options.get("Produk", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu]
+            produk_options = options.for_bu(bu, "Produk")
             produk = st.selectbox("Produk", produk_options, index=produk_options.index(selected_data["Produk"]) if selected_data["Produk"] in produk_options else 0)
             
-            line_options = [item[1] for item in options.get("Line", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu]
+            line_options = options.for_bu(bu, "Line")
             line = st.selectbox("Line", line_options, index=line_options.index(selected_data["Line"]) if selected_data["Line"] in line_options else 0)
             
             nomor = st.text_input("Nomor Mesin", value=selected_data["Nomor Mesin"])
 
-            mesin_options = [item[1] for item in options.get("Mesin", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu]
+            mesin_options = options.for_bu(bu, "Mesin")
             mesin = st.selectbox("Mesin", mesin_options, index=mesin_options.index(selected_data["Mesin"]) if selected_data["Mesin"] in mesin_options else 0)
             
-            masalah_options = [item[1] for item in options.get("Masalah", []) if isinstance(item, list) and len(item) > 1 and item[0] == mesin]
+            masalah_options = options.masalah(mesin)
             masalah = st.selectbox("Masalah", masalah_options, index=masalah_options.index(selected_data["Masalah"]) if selected_data["Masalah"] in masalah_options else 0)
             
             tindakan = st.text_area("Tindakan Perbaikan", value=selected_data["Tindakan"])
 
-            tanggal = st.date_input("Tanggal Pengerjaan", value=pd.to_datetime(selected_data["Tanggal"], format="%d-%b-%y").date())
+            tanggal_awal = selected_data["Tanggal"].date() if pd.notna(selected_data["Tanggal"]) else datetime.today().date()
+            tanggal = st.date_input("Tanggal Pengerjaan", value=tanggal_awal)
             
-            pic_options = [item[1] for item in options.get("PIC", []) if isinstance(item, list) and len(item) > 1 and item[0] == bu]
-            pic = st.multiselect("PIC", pic_options, default=[selected_data["PIC"]] if selected_data["PIC"] in pic_options else [])
+            pic_options = options.for_bu(bu, "PIC")
+            # PIC tersimpan sebagai "A, B"; semua PIC yang masih ada di opsi dipilih agar tidak terhapus saat update
+            selected_pics = [p.strip() for p in _form_value(selected_data["PIC"]).split(",") if p.strip()]
+            pic = st.multiselect("PIC", pic_options, default=[p for p in selected_pics if p in pic_options])
             
+            updated_data = {
+                "ID": selected_id,
+                "BU": bu,
+                "Line": line,
+                "Produk": produk,
+                "Nomor": nomor,
+                "Mesin": mesin,
+                "Masalah": masalah,
+                "Tindakan": tindakan,
+                "Tanggal": tanggal.strftime("%d-%b-%y"),
+                "PIC": ", ".join(pic) if pic else ""
+            }
+            changes = changed_fields(selected_data, updated_data)
+
             if selected_id:
                 st.subheader("🔍 Perbandingan Data Sebelum & Sesudah")
 
@@ -94,49 +137,27 @@ def run():
 
                 with col2:
                     st.markdown("### 🟢 **Setelah Update**")
-                    updated_data = {
-                        "ID": selected_id,
-                        "BU": bu,
-                        "Line": line,
-                        "Produk": produk,
-                        "Nomor": nomor,
-                        "Mesin": mesin,
-                        "Masalah": masalah,
-                        "Tindakan": tindakan,
-                        "Tanggal": tanggal.strftime("%d-%b-%y"),
-                        "PIC": ", ".join(pic) if pic else ""
-                    }
                     st.dataframe(pd.DataFrame([updated_data]))
 
+                if changes:
+                    st.caption(f"Kolom yang berubah: {', '.join(changes)}")
+
                 st.markdown("---")  # Garis pemisah sebelum tombol update
 
             # Tombol Update Data
-            if st.button("Update Data"):
-                update_data = {
-                    "action": "update_data",
-                    "ID": selected_id,
-                    "BU": bu,
-                    "Line": line,                    
-                    "Produk": produk,
-                    "Nomor": nomor,
-                    "Mesin": mesin,
-                    "Masalah": masalah,
-                    "Tindakan": tindakan,
-                    "Tanggal": tanggal.strftime("%d-%b-%y"),
-                    "PIC": ", ".join(pic) if pic else ""
-                }
+            if st.button("Update Data", disabled=not changes):
+                # hanya ID dan field yang berubah; Apps Script menulisnya dengan satu setValues
+                update_data = {"ID": selected_id, **changes}
 
+                # disimpan ke antrean lokal; update berikutnya untuk ID yang sama sebelum terkirim digabung
                 try:
-                    response = requests.post(APPS_SCRIPT_URL, json=update_data, timeout=10)
-                    response.raise_for_status()
-                    result = response.json()
-                    if result.get("status") == "success":
-                        st.success("✅ Data berhasil diperbarui!")
-                        st.rerun()
-                    else:
-                        st.error(f"❌ Gagal memperbarui data: {result.get('error', 'Tidak diketahui')}")
-                except requests.exceptions.RequestException as e:
-                    st.error(f"Terjadi kesalahan saat mengirim data: {e}")
+                    entry_id = write_queue.get_queue().enqueue("update_spk", "update_data", update_data)
+                except api_client.BackendError as e:
+                    st.error(f"Terjadi kesalahan saat menyimpan data: {e}")
+                else:
+                    write_queue.remember("queue_update_spk", entry_id)
+                    st.success("✅ Update masuk antrean pengiriman!")
+                    st.rerun()
 
         else:
             st.warning("Tidak ada data yang bisa diperbarui karena ID sudah ada di sheet ALL.")
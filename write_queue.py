@@ -0,0 +1,303 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import streamlit as st
+
+import api_client
+import profiling
+
+# status entri antrean
+PENDING = "pending"
+SENDING = "sending"
+COMMITTED = "committed"
+FAILED = "failed"
+
+# jeda percobaan ulang saat backend tidak bisa dihubungi: 2, 4, 8, ... detik, maksimal 5 menit.
+# entri tidak pernah dibuang karena gangguan jaringan/kuota; hanya ditolak jika backend membalas {"error": ...}
+RETRY_BASE = 2
+RETRY_MAX = 300
+
+# update yang masih pending untuk ID yang sama digabung (hanya payload terakhir yang dikirim)
+COALESCE_ACTIONS = ("update_data",)
+
+# entri yang boleh dikirim: jatuh tempo dan tidak ada entri lebih lama untuk ID yang sama yang belum selesai
+# (update yang gagal lalu dijadwalkan ulang tidak boleh menimpa update yang lebih baru)
+READY = (
+    '"status" = ? AND "next_attempt" <= ? AND NOT EXISTS (SELECT 1 FROM "queue" AS "older" '
+    'WHERE "older"."target_id" = "queue"."target_id" AND "older"."page" = "queue"."page" '
+    'AND "older"."action" = "queue"."action" AND "older"."id" < "queue"."id" AND "older"."status" IN (?, ?))'
+)
+
+# worker tetap memeriksa antrean secara berkala walaupun tidak dibangunkan
+IDLE_WAIT = 60
+
+# interval refresh panel status selama masih ada entri yang belum selesai
+STATUS_POLL_SECONDS = 2
+MAX_SHOWN = 5
+
+ACTION_LABELS = {"add_data": "Tambah SPK", "update_data": "Update SPK"}
+
+
+class WriteQueue:
+    # antrean penulisan tahan restart di SQLite (WAL) yang dikirim ke backend oleh satu thread worker
+    def __init__(self, path, get_backend=api_client.get_backend, clock=time.time):
+        self.path = path
+        self.get_backend = get_backend
+        self.clock = clock
+        self._wake = threading.Event()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS "queue" ('
+                '"id" INTEGER PRIMARY KEY AUTOINCREMENT, "page" TEXT, "action" TEXT, "payload" TEXT, '
+                '"target_id" TEXT, "status" TEXT, "attempts" INTEGER DEFAULT 0, "coalesced" INTEGER DEFAULT 0, '
+                '"next_attempt" REAL, "created" REAL, "updated" REAL, "result" TEXT, "error" TEXT)'
+            )
+            # antrean lama (sebelum ada request_id) ditambah kolomnya
+            columns = [row["name"] for row in conn.execute('PRAGMA table_info("queue")')]
+            if "request_id" not in columns:
+                conn.execute('ALTER TABLE "queue" ADD COLUMN "request_id" TEXT')
+            conn.execute('CREATE INDEX IF NOT EXISTS "queue_status" ON "queue" ("status", "next_attempt")')
+            conn.execute('CREATE INDEX IF NOT EXISTS "queue_request" ON "queue" ("request_id")')
+            # entri yang sedang dikirim saat proses berhenti dikirim ulang
+            conn.execute('UPDATE "queue" SET "status" = ? WHERE "status" = ?', (PENDING, SENDING))
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=FULL")  # entri yang sudah di-commit tidak hilang walau listrik mati
+        return conn
+
+    def _transaction(self, fn):
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        except sqlite3.Error as e:
+            raise api_client.BackendError(f"Antrean lokal gagal: {e}") from e
+        finally:
+            conn.close()
+
+    def enqueue(self, page, action, payload):
+        # simpan penulisan (ms) lalu bangunkan worker; hasil: ID entri antrean
+        now = self.clock()
+        target = str(payload["ID"]) if action in COALESCE_ACTIONS and payload.get("ID") else None
+        request_id = payload.get("request_id")
+        data = json.dumps(payload)
+
+        def write(conn):
+            if request_id:
+                # kunci idempotensi yang sama (klik ganda, rerun) tidak membuat entri kedua
+                row = conn.execute('SELECT "id" FROM "queue" WHERE "request_id" = ?', (request_id,)).fetchone()
+                if row:
+                    return row["id"]
+            if target is not None:
+                row = conn.execute(
+                    'SELECT "id", "payload" FROM "queue" WHERE "page" = ? AND "action" = ? AND "target_id" = ? AND "status" = ? '
+                    'ORDER BY "id" DESC LIMIT 1',
+                    (page, action, target, PENDING),
+                ).fetchone()
+                if row:
+                    # payload update berisi diff: field dari update sebelumnya yang belum terkirim tetap ikut
+                    merged = json.dumps({**json.loads(row["payload"]), **payload})
+                    conn.execute(
+                        'UPDATE "queue" SET "payload" = ?, "coalesced" = "coalesced" + 1, "updated" = ? WHERE "id" = ?',
+                        (merged, now, row["id"]),
+                    )
+                    return row["id"]
+            return conn.execute(
+                'INSERT INTO "queue" ("page", "action", "payload", "target_id", "request_id", "status", '
+                '"next_attempt", "created", "updated") VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (page, action, data, target, request_id, PENDING, now, now, now),
+            ).lastrowid
+
+        with profiling.span(f"queue:enqueue:{action}"):
+            entry_id = self._transaction(write)
+        self.start()
+        self._wake.set()
+        return entry_id
+
+    def status(self, ids):
+        if not ids:
+            return []
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                f'SELECT * FROM "queue" WHERE "id" IN ({", ".join("?" * len(ids))}) ORDER BY "id" DESC', list(ids)
+            ).fetchall()
+        finally:
+            conn.close()
+        return [dict(row) for row in rows]
+
+    def _claim(self):
+        def claim(conn):
+            row = conn.execute(
+                f'SELECT * FROM "queue" WHERE {READY} ORDER BY "id" LIMIT 1', (PENDING, self.clock(), PENDING, SENDING)
+            ).fetchone()
+            if row:
+                conn.execute('UPDATE "queue" SET "status" = ? WHERE "id" = ?', (SENDING, row["id"]))
+            return row
+
+        return self._transaction(claim)
+
+    def _finish(self, entry, status, result=None, error=None, retry_at=None):
+        def finish(conn):
+            conn.execute(
+                'UPDATE "queue" SET "status" = ?, "attempts" = "attempts" + 1, "next_attempt" = ?, '
+                '"result" = ?, "error" = ?, "updated" = ? WHERE "id" = ?',
+                (
+                    status, retry_at, None if result is None else json.dumps(result), error, self.clock(),
+                    entry["id"],
+                ),
+            )
+
+        self._transaction(finish)
+
+    def process_next(self):
+        # kirim satu entri yang sudah jatuh tempo; hasil: detik menunggu sebelum pemeriksaan berikutnya
+        entry = self._claim()
+        if entry is None:
+            return self._next_delay()
+
+        action = entry["action"]
+        try:
+            with profiling.span(f"queue:{action}"):
+                result = getattr(self.get_backend(entry["page"]), action)(json.loads(entry["payload"]))
+        except Exception as e:
+            # backend tidak bisa dihubungi (atau error tak terduga): coba lagi nanti, entri tidak dibuang.
+            # Aman untuk add_data: request_id yang sama tidak menambah baris kedua di server
+            self._retry(entry, str(e))
+            return 0
+
+        if isinstance(result, dict) and result.get("status") == "success":
+            self._finish(entry, COMMITTED, result=result)
+        elif isinstance(result, dict) and result.get("retry"):
+            # server sibuk (script lock tidak didapat): belum ada yang ditulis, kirim ulang nanti
+            self._retry(entry, result.get("error", "Server sibuk"))
+        else:
+            error = result.get("error", "Tidak diketahui") if isinstance(result, dict) else "Respons tidak valid"
+            self._finish(entry, FAILED, result=result, error=error)
+        return 0
+
+    def _retry(self, entry, error):
+        delay = min(RETRY_MAX, RETRY_BASE * 2 ** entry["attempts"])
+        self._finish(entry, PENDING, error=error, retry_at=self.clock() + delay)
+
+    def _next_delay(self):
+        conn = self._connect()
+        try:
+            # entri yang tertahan entri lebih lama tidak dihitung (tanpa itu worker berputar tanpa jeda)
+            next_attempt = conn.execute(
+                f'SELECT MIN("next_attempt") FROM "queue" WHERE {READY}', (PENDING, float("inf"), PENDING, SENDING)
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        if next_attempt is None:
+            return IDLE_WAIT
+        return min(IDLE_WAIT, max(0.05, next_attempt - self.clock()))
+
+    def _run(self):
+        while True:
+            try:
+                delay = self.process_next()
+            except api_client.BackendError:
+                delay = RETRY_BASE  # file antrean terkunci/bermasalah sementara
+            if delay:
+                self._wake.wait(delay)
+                self._wake.clear()
+
+    def start(self):
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="write_queue", daemon=True)
+                self._worker.start()
+
+
+_queue = None
+_queue_lock = threading.Lock()
+
+
+def get_queue():
+    # satu antrean per proses di SPK_QUEUE_PATH; worker langsung mengirim entri yang tertinggal dari proses lama
+    global _queue
+    with _queue_lock:
+        if _queue is None:
+            _queue = WriteQueue(os.environ.get("SPK_QUEUE_PATH", "spk_queue.db"))
+            _queue.start()
+    return _queue
+
+
+def remember(session_key, entry_id):
+    # simpan ID entri milik sesi ini untuk ditampilkan di status_panel
+    ids = [i for i in st.session_state.get(session_key, []) if i != entry_id]
+    st.session_state[session_key] = (ids + [entry_id])[-MAX_SHOWN:]
+
+
+def _describe(entry):
+    label = ACTION_LABELS.get(entry["action"], entry["action"])
+    if entry["target_id"]:
+        label += f" ID {entry['target_id']}"
+    if entry["coalesced"]:
+        label += f" (digabung {entry['coalesced'] + 1}x)"
+
+    if entry["status"] == COMMITTED:
+        result = json.loads(entry["result"] or "{}")
+        new_id = f" sebagai ID {result['new_id']}" if "new_id" in result else ""
+        # kiriman ulang setelah respons pertama hilang: baris sudah ada di server, tidak ditambah lagi
+        duplicate = " (kiriman ulang, tidak digandakan)" if result.get("duplicate") else ""
+        return f"✅ {label}: tersimpan{new_id}{duplicate}"
+    if entry["status"] == FAILED:
+        return f"❌ {label}: ditolak, {entry['error']}"
+    if entry["status"] == SENDING:
+        return f"📤 {label}: sedang dikirim"
+    if entry["attempts"]:
+        return f"⏳ {label}: menunggu dikirim ulang (percobaan ke-{entry['attempts']} gagal: {entry['error']})"
+    return f"⏳ {label}: menunggu dikirim"
+
+
+def status_panel(session_key):
+    # status pengiriman milik sesi ini; diperbarui otomatis selama masih ada yang belum selesai
+    queue = get_queue()
+    ids = st.session_state.get(session_key, [])
+    if not ids:
+        return
+
+    entries = queue.status(ids)
+    if not _pending(entries):
+        _render_entries(entries)
+        return
+
+    # fragment dengan polling hanya selama masih ada entri yang belum selesai
+    def render():
+        entries = queue.status(ids)
+        _render_entries(entries)
+        if not _pending(entries):
+            # semua sudah selesai: satu rerun penuh agar panel dirender ulang tanpa run_every
+            st.rerun()
+
+    st.fragment(render, run_every=STATUS_POLL_SECONDS)()
+
+
+def _pending(entries):
+    return any(entry["status"] in (PENDING, SENDING) for entry in entries)
+
+
+def _render_entries(entries):
+    st.markdown("**Status Pengiriman**")
+    for entry in entries:
+        st.caption(_describe(entry))